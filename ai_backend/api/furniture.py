@@ -1,9 +1,15 @@
 # ai_backend/api/furniture.py - FULL REPLACE
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from ai_backend.models import FurnitureItem, PriceRange
-from ai_backend.services.furniture import search_furniture
+from ai_backend.services.furniture import get_mock_furniture, search_furniture_async
+from ai_backend.services.furniture_catalog import get_furniture_catalog
+from ai_backend.services.metrics import record_error, stage_timer
+from ai_backend.services.response_cache import (
+    bucket_price_range, cached_response, get_response_cache, make_key
+)
+from ai_backend.services.scraper_engine import unique_domains
 import logging
 
 router = APIRouter()
@@ -17,18 +23,54 @@ class FurnitureRequest(BaseModel):
     price_range: PriceRange
 
 
-@router.post("/search")
-async def search_furnitures(request: FurnitureRequest):
+STATIC_MAX_AGE = 3600
+
+# Each cached search holds every item in the bucketed price range; requests
+# filter them to their exact range before keeping the first SEARCH_RESULT_LIMIT
+SEARCH_RESULT_LIMIT = 10
+
+
+@router.get("/catalog")
+def furniture_catalog(request: Request):
     """
-    Search furniture from theme websites
+    Room type -> furniture type -> subtypes with standard dimensions
     
-    Args:
-        request: Furniture search parameters
-    
-    Returns:
-        List of furniture items with links and prices
+    Serialized once at startup; clients revalidate with If-None-Match.
     """
+    catalog = get_furniture_catalog()
+    return cached_response(request, catalog.payload, max_age=STATIC_MAX_AGE, stale_seconds=0, etag=catalog.etag)
+
+
+@router.get("/themes")
+def list_themes(request: Request):
+    """Available themes with the shops each one searches"""
+    from ai_backend.config import THEMES
     
+    def build():
+        return {
+            "themes": [
+                {"name": name, "sites": unique_domains(sites)}
+                for name, sites in THEMES.items()
+            ]
+        }
+    
+    body, state = get_response_cache().get_or_build("static:themes", build)
+    return cached_response(request, body, max_age=STATIC_MAX_AGE, stale_seconds=0, state=state)
+
+
+def _search_cache_key(request: FurnitureRequest, bucketed: PriceRange) -> str:
+    """Normalized search parameters (type order, case and spacing ignored)"""
+    return make_key(
+        "search",
+        theme=request.theme.strip().upper(),
+        room_type=" ".join(request.room_type.lower().split()),
+        types=sorted({" ".join(t.split()) for t in request.furniture_types if t.strip()}),
+        price=[bucketed.min, bucketed.max]
+    )
+
+
+async def _search(request: FurnitureRequest, http_request: Request, conditional: bool):
+    """Cached search shared by the GET and POST endpoints"""
     try:
         # Validate theme
         from ai_backend.config import THEMES
@@ -40,36 +82,104 @@ async def search_furnitures(request: FurnitureRequest):
         
         logger.info(f"Searching furniture: theme={request.theme}, types={request.furniture_types}")
         
-        # Search furniture
-        results = search_furniture(
-            request.theme, 
-            request.room_type, 
-            request.furniture_types, 
-            request.price_range
-        )
+        # Search furniture (concurrent fan-out across theme sites), cached
+        price_range = request.price_range
+        low, high = bucket_price_range(price_range.min, price_range.max)
+        bucketed = PriceRange(min=low, max=high)
+        
+        cache = get_response_cache()
+        
+        async def scrape():
+            with stage_timer("search", "scrape"):
+                return await search_furniture_async(
+                    request.theme,
+                    request.room_type,
+                    request.furniture_types,
+                    bucketed,
+                    limit=None,
+                    mock_fallback=False
+                )
+        
+        with stage_timer("search", "fetch"):
+            candidates, state = await cache.get_or_compute(_search_cache_key(request, bucketed), scrape)
+        if not candidates:
+            # Placeholders are priced for the exact range, never the cached bucket
+            candidates = get_mock_furniture(request.furniture_types, price_range)
+        results = [
+            item for item in candidates
+            if price_range.min <= item.price <= price_range.max
+        ][:SEARCH_RESULT_LIMIT]
         
         if not results:
-            return {
+            payload = {
                 "success": True,
                 "results": [],
                 "message": "No furniture found. Try adjusting your price range or theme.",
                 "count": 0
             }
+        else:
+            logger.info(f"Found {len(results)} furniture items (cache: {state})")
+            payload = {
+                "success": True,
+                "results": results,
+                "message": f"Found {len(results)} items",
+                "count": len(results)
+            }
         
-        logger.info(f"Found {len(results)} furniture items")
-        
-        return {
-            "success": True,
-            "results": results,
-            "message": f"Found {len(results)} items",
-            "count": len(results)
-        }
+        with stage_timer("search", "serialize"):
+            return cached_response(
+                http_request, payload,
+                max_age=cache.ttl_seconds, stale_seconds=cache.stale_seconds,
+                state=state, conditional=conditional
+            )
         
     except HTTPException:
         raise
     except Exception as e:
+        record_error("search")
         logger.error(f"Furniture search error: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Furniture search failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/search")
+async def search_furnitures(request: FurnitureRequest, http_request: Request):
+    """
+    Search furniture from theme websites
+    
+    Results are cached per normalized query with the price range widened
+    to bucket edges, then filtered to the exact range of each request.
+    
+    Args:
+        request: Furniture search parameters
+    
+    Returns:
+        List of furniture items with links and prices
+    """
+    return await _search(request, http_request, conditional=False)
+
+
+@router.get("/search")
+async def search_furnitures_get(
+    http_request: Request,
+    theme: str,
+    room_type: str,
+    furniture_types: str,
+    min_price: float,
+    max_price: float
+):
+    """
+    Cacheable GET form of /furniture/search (browsers and CDNs can reuse it)
+    
+    Args:
+        furniture_types: Comma-separated, e.g. "Sofa,Coffee Table"
+    """
+    request = FurnitureRequest(
+        theme=theme,
+        room_type=room_type,
+        furniture_types=[t.strip() for t in furniture_types.split(",") if t.strip()],
+        price_range=PriceRange(min=min_price, max=max_price)
+    )
+    return await _search(request, http_request, conditional=True)
@@ -1,91 +1,684 @@
 # ai_backend/api/generation.py - FULL REPLACE
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
+from typing import Callable, List, Optional
 from ai_backend.services.ai_generator import generate_room_image
-from ai_backend.services.storage import upload_to_s3
+from ai_backend.services.storage import (
+    create_direct_upload, delivery_url, derivative_urls, get_s3_files_info_async, is_upload_key,
+    upload_from_url
+)
+from ai_backend.services.aws_service import get_aws_service, get_async_aws_service
+from ai_backend.services.jobs import (
+    get_job_manager, Job, QueueFullError, COMPLETED, FAILED, FINISHED_STATES
+)
+from ai_backend.services.generation_cache import get_generation_cache, compute_cache_key
+from ai_backend.services.image_preprocess import get_image_preprocessor, sniff_image_format
+from ai_backend.services.metrics import observe_stage, stage_timer
+from ai_backend.utils.uploads import (
+    MAX_IMAGE_UPLOAD_BYTES, IngestedUpload, UploadTooLargeError, ingest_upload
+)
+import os
+import json
+import time
+import asyncio
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Upper bound on variants per batch request (each is one prediction)
+GENERATION_BATCH_MAX_VARIANTS = int(os.getenv("GENERATION_BATCH_MAX_VARIANTS", "10"))
+
+# Image files per batch request (all variants share the one room photo)
+GENERATION_BATCH_MAX_FILES = 1
+
+# Upper bound on URLs per asset metadata request (one HEAD each)
+ASSET_INFO_MAX_URLS = int(os.getenv("ASSET_INFO_MAX_URLS", "200"))
+
+# Seconds between SSE keep-alive comments (keeps proxies from closing idle streams)
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+
+
+class DirectUploadRequest(BaseModel):
+    content_type: str  # image/jpeg, image/png or image/webp
+    size: Optional[int] = None  # bytes; required for PUT
+    method: str = "POST"
+
+
+class AssetInfoRequest(BaseModel):
+    urls: List[str]  # generated image / derivative URLs (S3, presigned or CDN)
+
+
+class GenerationVariant(BaseModel):
+    theme: str
+    prompt: str
+    furniture_links: List[str]
+
+
+def _generation_result(s3_url: str, links: list[str], cached: bool) -> dict:
+    # The cache keeps the object URL; clients get a CDN / presigned URL
+    # (plus the stored derivatives, smallest first). Blocking: call from
+    # worker threads.
+    return {
+        "success": True,
+        "generated_image_url": delivery_url(s3_url),
+        "derivatives": derivative_urls(s3_url),
+        "message": "Image generated successfully",
+        "furniture_count": len(links),
+        "cached": cached
+    }
+
+
+def _generate_and_store(
+    job: Job,
+    prepare: Callable[[], bytes],
+    prompt: str,
+    theme: str,
+    links: list[str],
+    cache_key: str
+) -> dict:
+    """
+    Replicate inference -> copy output into S3, de-duplicated by cache key
+    
+    Args:
+        prepare: Returns the model input image (run only on a cache miss)
+    """
+    manager = get_job_manager()
+    observe_stage("generation", "queue_wait", job.started_at - job.created_at)
+    
+    def on_progress(update: dict):
+        # Replicate status (starting/processing/...) becomes the job stage
+        if update["status"] != job.stage:
+            manager.set_stage(job, update["status"], progress=update["progress"])
+        if update["logs"]:
+            job.emit("log", lines=update["logs"], progress=update["progress"])
+    
+    def generate() -> str:
+        model_input = prepare()
+        
+        manager.set_stage(job, "generating")
+        with stage_timer("generation", "inference"):
+            output_url = generate_room_image(model_input, prompt, theme, links, on_progress=on_progress)
+        
+        # Resized WebP / JPEG variants are rendered and stored alongside
+        manager.set_stage(job, "uploading")
+        with stage_timer("generation", "upload"):
+            s3_url = upload_from_url(output_url, folder="generated", derivatives=True)
+        
+        logger.info(f"✅ Image uploaded: {s3_url}")
+        return s3_url
+    
+    # The endpoint already counted this request's cache lookup
+    s3_url, cached = get_generation_cache().get_or_compute(cache_key, generate, counted=True)
+    return _generation_result(s3_url, links, cached)
+
+
+def _preprocess(job: Job, data: bytes) -> bytes:
+    """Downscale/re-encode the photo on the process pool"""
+    get_job_manager().set_stage(job, "preprocessing")
+    with stage_timer("generation", "preprocess"):
+        model_input, info = get_image_preprocessor().preprocess(data)
+    job.metadata["image"] = info
+    return model_input
+
+
+def _run_generation(
+    job: Job,
+    upload: IngestedUpload,
+    prompt: str,
+    theme: str,
+    links: list[str],
+    cache_key: str
+) -> dict:
+    """
+    Generation pipeline executed on the job worker pool
+    
+    Stages: downscale/re-encode the photo (process pool) -> Replicate
+    inference -> copy output into S3. Concurrent jobs with the same
+    cache key share a single prediction. The spooled upload is released
+    when the job ends.
+    """
+    try:
+        return _generate_and_store(
+            job, lambda: _preprocess(job, upload.read_bytes()), prompt, theme, links, cache_key
+        )
+    finally:
+        upload.close()
+
+
+def _run_generation_from_key(
+    job: Job,
+    image_key: str,
+    prompt: str,
+    theme: str,
+    links: list[str],
+    cache_key: str
+) -> dict:
+    """Generation pipeline for a photo uploaded directly to S3"""
+    def prepare() -> bytes:
+        get_job_manager().set_stage(job, "fetching")
+        with stage_timer("generation", "fetch_upload"):
+            data = get_aws_service().get_object_bytes(image_key)
+        if data is None:
+            raise Exception("Uploaded image not found")
+        return _preprocess(job, data)
+    
+    return _generate_and_store(job, prepare, prompt, theme, links, cache_key)
+
+
+def _run_variant(
+    job: Job,
+    model_input: bytes,
+    prompt: str,
+    theme: str,
+    links: list[str],
+    cache_key: str
+) -> dict:
+    """Batch variant pipeline (image already preprocessed once for the batch)"""
+    return _generate_and_store(job, lambda: model_input, prompt, theme, links, cache_key)
+
+
+async def _ingest_room_image(room_image: UploadFile) -> IngestedUpload:
+    """Stream a multipart room photo into a spool (400/413 on bad input)"""
+    # Validate image file
+    if not room_image.content_type.startswith("image/"):
+        raise HTTPException(
+            status_code=400, 
+            detail="Invalid file type. Please upload an image (JPEG/PNG/WebP)"
+        )
+    
+    # Stream the upload in chunks (hashing as we go, stopping at 10MB)
+    logger.info(f"Reading room image: {room_image.filename}")
+    try:
+        with stage_timer("generation", "file_read"):
+            upload = await ingest_upload(room_image)
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=413, 
+            detail="Image too large. Maximum size is 10MB"
+        )
+    
+    # Trust the file header, not the client's content type
+    if sniff_image_format(upload.head) is None:
+        upload.close()
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file type. Please upload an image (JPEG/PNG/WebP)"
+        )
+    return upload
+
+
+async def _uploaded_image_hash(image_key: str) -> str:
+    """
+    HEAD a directly uploaded photo and return its content hash
+    
+    The S3 ETag (MD5 for single-part uploads) stands in for the SHA-256
+    of multipart uploads, so the API never reads the bytes.
+    """
+    if not is_upload_key(image_key):
+        raise HTTPException(status_code=400, detail="Invalid image_key. Use a key issued by /generation/uploads")
+    
+    head = await get_async_aws_service().head(image_key)
+    if head is None:
+        raise HTTPException(status_code=404, detail="Uploaded image not found")
+    if head["ContentLength"] > MAX_IMAGE_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Image too large. Maximum size is 10MB")
+    return "s3:" + head["ETag"].strip('"')
+
+
+@router.post("/uploads")
+async def create_upload_url(request: DirectUploadRequest):
+    """
+    Presigned URL for uploading a room photo straight to S3
+    
+    Upload with the returned url/fields (POST) or url/headers (PUT), then
+    call /generation/generate with ``image_key`` instead of ``room_image``.
+    S3 enforces the content type and the size limit.
+    """
+    try:
+        return await run_in_threadpool(
+            create_direct_upload,
+            request.content_type,
+            MAX_IMAGE_UPLOAD_BYTES,
+            request.method,
+            request.size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Direct upload error: {e}")
+        raise HTTPException(status_code=500, detail=f"Could not create upload URL: {str(e)}")
+
+
+@router.post("/assets/info")
+async def get_assets_info(request: AssetInfoRequest):
+    """
+    Metadata of generated images (e.g. to validate a gallery)
+    
+    Every URL is checked with a single HEAD and all of them run
+    concurrently, so the whole list costs one parallel S3 round.
+    
+    Returns:
+        Per-URL exists, size, content_type, etag and last_modified (in
+        request order) plus found / missing counts
+    """
+    if len(request.urls) > ASSET_INFO_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"At most {ASSET_INFO_MAX_URLS} URLs per request")
+    try:
+        get_async_aws_service()
+    except RuntimeError:
+        raise HTTPException(status_code=503, detail="Storage not configured")
+    
+    infos = await get_s3_files_info_async(request.urls, folder="generated")
+    results = [
+        info if info is not None else {"url": url, "exists": False, "error": "Not a generated image URL (or the S3 check failed)"}
+        for url, info in zip(request.urls, infos)
+    ]
+    found = sum(1 for info in results if info["exists"])
+    return {
+        "count": len(results),
+        "found": found,
+        "missing": len(results) - found,
+        "results": results
+    }
+
 
 @router.post("/generate")
 async def generate_image(
-    room_image: UploadFile = File(...),
+    room_image: Optional[UploadFile] = File(None),
     prompt: str = Form(...),
     theme: str = Form(...),
-    furniture_links: str = Form(...)  # Comma-separated links
+    furniture_links: str = Form(...),  # Comma-separated links
+    image_key: Optional[str] = Form(None)
 ):
     """
     Generate interior design image
     
     Args:
-        room_image: Room photo (JPEG/PNG)
+        room_image: Room photo (JPEG/PNG/WebP)
         prompt: Placement instructions (e.g., "sofa on left wall")
         theme: Design theme
         furniture_links: Comma-separated furniture URLs
+        image_key: Key of a photo uploaded via /generation/uploads
+                   (instead of room_image)
     
     Returns:
-        Generated image URL from S3
+        Job id and status URLs (202 Accepted), or the stored result
+        directly when an identical request was generated before
     """
     
+    if (room_image is None) == (image_key is None):
+        raise HTTPException(status_code=400, detail="Provide either room_image or image_key")
+    
+    upload: Optional[IngestedUpload] = None
+    
+    def release():
+        if upload is not None:
+            upload.close()
+    
     try:
-        # Validate image file
-        if not room_image.content_type.startswith("image/"):
-            raise HTTPException(
-                status_code=400, 
-                detail="Invalid file type. Please upload an image (JPEG/PNG)"
-            )
-        
-        # Read image bytes
-        logger.info(f"Reading room image: {room_image.filename}")
-        image_bytes = await room_image.read()
-        
-        # Check file size (max 10MB)
-        if len(image_bytes) > 10 * 1024 * 1024:
-            raise HTTPException(
-                status_code=400, 
-                detail="Image too large. Maximum size is 10MB"
-            )
+        if room_image is not None:
+            upload = await _ingest_room_image(room_image)
+            image_hash = upload.sha256
+        else:
+            image_hash = await _uploaded_image_hash(image_key)
         
         # Split furniture links
         links = [link.strip() for link in furniture_links.split(",") if link.strip()]
         
         if not links:
+            release()
             raise HTTPException(
                 status_code=400, 
                 detail="Please provide at least one furniture link"
             )
         
-        logger.info(f"Generating image with theme: {theme}, furniture count: {len(links)}")
-        
-        # Generate image using Replicate
-        generated_image_path = generate_room_image(
-            image_bytes, 
-            prompt, 
-            theme, 
-            links
-        )
+        # Identical request already generated? Return the stored image at once
+        cache_key = compute_cache_key(image_hash, prompt, theme, links)
+        cache = get_generation_cache()
+        cached_url = await run_in_threadpool(cache.lookup, cache_key)
+        if cached_url:
+            release()
+            logger.info(f"♻️  Returning cached generation: {cached_url}")
+            return await run_in_threadpool(_generation_result, cached_url, links, True)
         
-        logger.info("Image generation complete, uploading to S3...")
+        # Identical request already queued? Hand out that job instead of a
+        # second one that would hold a worker thread while it waits
+        job = cache.join_inflight(cache_key)
+        if job is not None:
+            release()
+            logger.info(f"♻️  Joining queued generation: {job.id}")
+            return _job_accepted(job, "Joined identical generation in progress")
         
-        # Upload to S3
-        s3_url = upload_to_s3(generated_image_path, folder="generated")
+        logger.info(f"Queueing generation with theme: {theme}, furniture count: {len(links)}")
         
-        logger.info(f"✅ Image uploaded: {s3_url}")
+        # Enqueue generation (runs on the bounded worker pool)
+        if upload is not None:
+            pipeline, source = _run_generation, upload
+        else:
+            pipeline, source = _run_generation_from_key, image_key
+        try:
+            job = get_job_manager().submit(
+                "generation",
+                pipeline,
+                source,
+                prompt,
+                theme,
+                links,
+                cache_key,
+                metadata={"theme": theme, "furniture_count": len(links)}
+            )
+        except QueueFullError as e:
+            release()
+            logger.warning(f"Generation queue full: {e}")
+            raise HTTPException(
+                status_code=503,
+                detail="Generation queue is full. Please retry shortly."
+            )
+        cache.track_job(cache_key, job)
         
-        return {
-            "success": True,
-            "generated_image_url": s3_url,
-            "message": "Image generated successfully",
-            "furniture_count": len(links)
-        }
+        return _job_accepted(job, "Image generation queued")
         
     except HTTPException:
         raise
     except Exception as e:
+        release()
         logger.error(f"Generation endpoint error: {e}")
         raise HTTPException(
             status_code=500, 
             detail=f"Image generation failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+def _job_accepted(job: Job, message: str) -> JSONResponse:
+    """202 with the job's status URLs"""
+    return JSONResponse(
+        status_code=202,
+        content={
+            "success": True,
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/generation/jobs/{job.id}",
+            "result_url": f"/generation/jobs/{job.id}/result",
+            "events_url": f"/generation/jobs/{job.id}/events",
+            "message": message
+        }
+    )
+
+
+def _parse_variants(raw: str) -> List[GenerationVariant]:
+    try:
+        items = json.loads(raw)
+        if not isinstance(items, list):
+            raise ValueError("variants must be a JSON array")
+        variants = [GenerationVariant(**item) for item in items]
+    except (ValueError, TypeError, ValidationError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid variants: {e}")
+    
+    if not variants:
+        raise HTTPException(status_code=400, detail="Please provide at least one variant")
+    if len(variants) > GENERATION_BATCH_MAX_VARIANTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many variants. Maximum is {GENERATION_BATCH_MAX_VARIANTS}"
+        )
+    for variant in variants:
+        variant.furniture_links = [link.strip() for link in variant.furniture_links if link.strip()]
+        if not variant.furniture_links:
+            raise HTTPException(status_code=400, detail="Each variant needs at least one furniture link")
+    return variants
+
+
+def _variant_entry(index: int, variant: GenerationVariant) -> dict:
+    return {"index": index, "theme": variant.theme, "prompt": variant.prompt}
+
+
+async def _stream_batch(entries: List[dict], jobs: dict):
+    """NDJSON lines in completion order, then a summary line"""
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    finished: asyncio.Queue = asyncio.Queue()
+    
+    for entry in entries:
+        if entry["index"] not in jobs:
+            # Cache hits and rejected variants are final already
+            yield json.dumps(entry) + "\n"
+    
+    for index, job in jobs.items():
+        job.add_done_callback(
+            lambda done, index=index: loop.call_soon_threadsafe(finished.put_nowait, (index, done))
+        )
+    
+    for _ in range(len(jobs)):
+        index, job = await finished.get()
+        entry = {**entries[index], "job_id": job.id, "status": job.status}
+        if job.status == COMPLETED:
+            entry["result"] = job.result
+        else:
+            entry["error"] = job.error
+        yield json.dumps(entry) + "\n"
+    
+    statuses = [entry.get("status") for entry in entries if entry["index"] not in jobs]
+    statuses += [job.status for job in jobs.values()]
+    yield json.dumps({
+        "done": True,
+        "completed": statuses.count(COMPLETED),
+        "failed": len(statuses) - statuses.count(COMPLETED),
+        "elapsed": round(time.perf_counter() - started, 3)
+    }) + "\n"
+
+
+@router.post("/batch")
+async def generate_batch(
+    room_image: UploadFile = File(...),
+    variants: str = Form(...),  # JSON: [{"theme", "prompt", "furniture_links": [...]}, ...]
+    stream: bool = Form(False)
+):
+    """
+    Generate several theme/prompt variants of one room photo
+    
+    The photo is uploaded and preprocessed once; every variant becomes a
+    generation job, so predictions run concurrently on the worker pool
+    and total time tracks the slowest variant.
+    
+    Args:
+        room_image: Room photo (JPEG/PNG/WebP)
+        variants: JSON array of {theme, prompt, furniture_links}
+        stream: Stream NDJSON results as each variant finishes
+    
+    Returns:
+        202 with one job per variant (cached variants carry their result),
+        or an application/x-ndjson stream when stream is true
+    """
+    parsed = _parse_variants(variants)
+    
+    # Same content-type, size and header checks as /generate; the photo stays
+    # in its spool and is only read if a variant needs preprocessing
+    upload = await _ingest_room_image(room_image)
+    image_hash = upload.sha256
+    
+    entries: List[dict] = []
+    jobs: dict = {}
+    model_input = None
+    cache = get_generation_cache()
+    
+    try:
+        for index, variant in enumerate(parsed):
+            entry = _variant_entry(index, variant)
+            entries.append(entry)
+            links = variant.furniture_links
+            cache_key = compute_cache_key(image_hash, variant.prompt, variant.theme, links)
+            
+            cached_url = await run_in_threadpool(cache.lookup, cache_key)
+            if cached_url:
+                result = await run_in_threadpool(_generation_result, cached_url, links, True)
+                entry.update(status=COMPLETED, result=result)
+                continue
+            
+            # Same key already queued (earlier request or variant): share its job
+            job = cache.join_inflight(cache_key)
+            
+            if job is None and model_input is None:
+                # Decode/downscale once for every variant
+                try:
+                    image_bytes = await run_in_threadpool(upload.read_bytes)
+                    model_input, info = await get_image_preprocessor().preprocess_async(image_bytes)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                finally:
+                    upload.close()
+            
+            try:
+                job = job or get_job_manager().submit(
+                    "generation",
+                    _run_variant,
+                    model_input,
+                    variant.prompt,
+                    variant.theme,
+                    links,
+                    cache_key,
+                    metadata={"theme": variant.theme, "furniture_count": len(links), "batch_index": index, "image": info}
+                )
+            except QueueFullError as e:
+                logger.warning(f"Generation queue full during batch: {e}")
+                entry.update(status=FAILED, error="Generation queue is full. Please retry shortly.")
+                continue
+            cache.track_job(cache_key, job)
+            
+            jobs[index] = job
+            entry.update(
+                job_id=job.id,
+                status=job.status,
+                status_url=f"/generation/jobs/{job.id}",
+                result_url=f"/generation/jobs/{job.id}/result",
+                events_url=f"/generation/jobs/{job.id}/events"
+            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch generation error: {e}")
+        raise HTTPException(status_code=500, detail=f"Image generation failed: {str(e)}")
+    finally:
+        upload.close()
+    
+    if not jobs and all(entry["status"] == FAILED for entry in entries):
+        raise HTTPException(status_code=503, detail="Generation queue is full. Please retry shortly.")
+    
+    logger.info(f"Batch queued: {len(jobs)} jobs, {len(entries) - len(jobs)} served without a job")
+    
+    if stream:
+        return StreamingResponse(_stream_batch(entries, jobs), media_type="application/x-ndjson")
+    
+    return JSONResponse(
+        status_code=202 if jobs else 200,
+        content={
+            "success": True,
+            "variants": entries,
+            "message": f"{len(jobs)} variants queued"
+        }
+    )
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """
+    Get generation job status
+    
+    Args:
+        job_id: Id returned by /generation/generate
+    
+    Returns:
+        Job status and current pipeline stage
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+def _sse_message(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+def _is_final(event: dict) -> bool:
+    return event["event"] == "status" and event["data"]["status"] in FINISHED_STATES
+
+
+async def _stream_job_events(job: Job, last_id: int):
+    """Replay events after last_id, then follow the job until it finishes"""
+    loop = asyncio.get_running_loop()
+    wakeup = asyncio.Event()
+    
+    def listener(event: dict):
+        loop.call_soon_threadsafe(wakeup.set)
+    
+    job.subscribe(listener)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            wakeup.clear()
+            for event in job.events_since(last_id):
+                last_id = event["id"]
+                yield _sse_message(event)
+                if _is_final(event):
+                    return
+            try:
+                await asyncio.wait_for(wakeup.wait(), SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+    finally:
+        job.unsubscribe(listener)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """
+    Live job progress as Server-Sent Events
+    
+    Events: ``status`` (queued/running/completed/failed), ``stage``
+    (preprocessing, generating, starting, processing, uploading) and
+    ``log`` (model step logs with progress). The stream ends after the
+    final status event, which carries the result (S3 URL) or the error.
+    Reconnecting clients resume via the Last-Event-ID header.
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    try:
+        last_id = int(request.headers.get("last-event-id", "0"))
+    except ValueError:
+        last_id = 0
+    
+    return StreamingResponse(
+        _stream_job_events(job, last_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Get generation job result
+    
+    Returns:
+        Generated image URL once complete; 202 with status while pending
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if job.status == COMPLETED:
+        return job.result
+    
+    if job.status == FAILED:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Image generation failed: {job.error}"
+        )
+    
+    return JSONResponse(status_code=202, content=job.to_dict())
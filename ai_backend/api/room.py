@@ -1,11 +1,22 @@
 # ai_backend/api/room.py
+import os
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from ai_backend.models import RoomDimensions, FurnitureSelection
-from ai_backend.services.dimension import calculate_room_area, check_furniture_fit
+from pydantic import BaseModel, Field
+from typing import Annotated, Optional
+from ai_backend.models import RoomDimensions, FurnitureSelection, PlacedFurniture
+from ai_backend.services.dimension import (
+    EXHAUSTIVE_REMOVAL_LIMIT, MIN_CLEARANCE_FT, calculate_room_area, check_furniture_fit,
+    check_furniture_fit_batch, check_layout
+)
+from ai_backend.services.furniture_catalog import resolve_selections
+from ai_backend.services.metrics import stage_timer
 
 router = APIRouter()
 
+# Candidate sets per batch fit check; each set is capped at the size whose
+# removal options are still enumerated exhaustively
+FIT_CHECK_BATCH_MAX_SETS = int(os.getenv("FIT_CHECK_BATCH_MAX_SETS", "100"))
+
 class RoomRequest(BaseModel):
     length: float
     width: float
@@ -14,6 +25,28 @@ class RoomRequest(BaseModel):
 class FitCheckRequest(BaseModel):
     room: RoomDimensions
     furnitures: list[FurnitureSelection]
+    room_type: Optional[str] = None  # narrows catalog lookups, e.g. "Living Room Furniture"
+
+class BatchFitCheckRequest(BaseModel):
+    room: RoomDimensions
+    sets: list[
+        Annotated[list[FurnitureSelection], Field(max_length=EXHAUSTIVE_REMOVAL_LIMIT)]
+    ] = Field(max_length=FIT_CHECK_BATCH_MAX_SETS)
+    room_type: Optional[str] = None
+
+class LayoutCheckRequest(BaseModel):
+    room: RoomDimensions
+    furnitures: list[PlacedFurniture]
+    clearance_ft: float = MIN_CLEARANCE_FT
+    room_type: Optional[str] = None
+
+def _resolve(furnitures: list, room_type: Optional[str], pipeline: str = "fit_check") -> list:
+    """Server-side dimensions for items sent without width/depth"""
+    try:
+        with stage_timer(pipeline, "resolve"):
+            return resolve_selections(furnitures, room_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/dimensions")
 def set_room_dimensions(room: RoomRequest):
@@ -22,7 +55,27 @@ def set_room_dimensions(room: RoomRequest):
 
 @router.post("/fit-check")
 def check_fit(request: FitCheckRequest):
-    fits, message = check_furniture_fit(request.room, request.furnitures)
+    furnitures = _resolve(request.furnitures, request.room_type)
+    with stage_timer("fit_check", "check"):
+        fits, message = check_furniture_fit(request.room, furnitures)
     if not fits:
         raise HTTPException(status_code=400, detail=message)
-    return {"fits": fits, "message": message}
\ No newline at end of file
+    return {"fits": fits, "message": message}
+
+@router.post("/fit-check/batch")
+def check_fit_batch(request: BatchFitCheckRequest):
+    """Fit verdicts plus smallest removal sets for many candidate sets"""
+    sets = [_resolve(furnitures, request.room_type, "fit_check_batch") for furnitures in request.sets]
+    with stage_timer("fit_check_batch", "check"):
+        results = check_furniture_fit_batch(request.room, sets)
+    return {
+        "room_sqft": calculate_room_area(request.room.length, request.room.width),
+        "results": results,
+    }
+
+@router.post("/layout-check")
+def check_room_layout(request: LayoutCheckRequest):
+    """Overlap, wall containment and walkway clearance for placed furniture"""
+    furnitures = _resolve(request.furnitures, request.room_type, "layout_check")
+    with stage_timer("layout_check", "check"):
+        return check_layout(request.room, furnitures, request.clearance_ft)
@@ -4,6 +4,14 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+REQUIRED_ENV_VARIABLES = (
+    "REPLICATE_API_TOKEN",
+    "AWS_ACCESS_KEY_ID",
+    "AWS_SECRET_ACCESS_KEY",
+    "AWS_S3_BUCKET",
+    "AWS_REGION",
+)
+
 # Validate environment variables
 def get_env_variable(var_name: str) -> str:
     value = os.getenv(var_name)
@@ -11,17 +19,16 @@ def get_env_variable(var_name: str) -> str:
         raise ValueError(f"❌ Missing environment variable: {var_name}")
     return value
 
-# Get all required variables
-try:
-    REPLICATE_API_TOKEN = get_env_variable("REPLICATE_API_TOKEN")
-    AWS_ACCESS_KEY_ID = get_env_variable("AWS_ACCESS_KEY_ID")
-    AWS_SECRET_ACCESS_KEY = get_env_variable("AWS_SECRET_ACCESS_KEY")
-    AWS_S3_BUCKET = get_env_variable("AWS_S3_BUCKET")
-    AWS_REGION = get_env_variable("AWS_REGION")
-    print("✅ All environment variables loaded successfully")
-except ValueError as e:
-    print(str(e))
-    exit(1)
+def missing_env_variables() -> list[str]:
+    """Required variables that are not set (checked at startup, not import)"""
+    return [name for name in REQUIRED_ENV_VARIABLES if not os.getenv(name)]
+
+# Missing values are None here; importing this module never exits
+REPLICATE_API_TOKEN = os.getenv("REPLICATE_API_TOKEN")
+AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
+AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
+AWS_S3_BUCKET = os.getenv("AWS_S3_BUCKET")
+AWS_REGION = os.getenv("AWS_REGION")
 
 THEMES = {
     "MINIMAL SCANDINAVIAN": [
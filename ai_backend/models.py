@@ -1,19 +1,24 @@
 # ai_backend/models.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 class RoomDimensions(BaseModel):
-    length: float
-    width: float
+    length: float = Field(gt=0)  # feet
+    width: float = Field(gt=0)  # feet
     height: Optional[float] = None
 
 class FurnitureSelection(BaseModel):
     type: str
     subtype: str
-    width: float
-    depth: float
+    width: Optional[float] = None  # inches; looked up from the catalog when omitted
+    depth: Optional[float] = None
     height: Optional[float] = None
 
+class PlacedFurniture(FurnitureSelection):
+    x: float  # footprint center, feet from the room's left wall
+    y: float  # footprint center, feet from the room's back wall
+    rotation: float = 0  # degrees, counter-clockwise
+
 class PriceRange(BaseModel):
     min: float
     max: float
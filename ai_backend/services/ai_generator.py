@@ -1,11 +1,16 @@
 # ai_backend/services/ai_generator.py - FIXED VERSION
 
-import replicate
+import io
 import os
-import tempfile
-import requests
+import time
 import logging
+from typing import Callable, Optional
 from dotenv import load_dotenv
+from ai_backend.services.metrics import record_error
+from ai_backend.services.registry import lazy_import
+
+# Loaded on first prediction (or at warm-up); importing it costs ~0.3s
+replicate = lazy_import("replicate")
 
 # Load environment variables
 load_dotenv()
@@ -19,36 +24,123 @@ if not REPLICATE_API_TOKEN:
     logger.info("Add this line to your .env file:")
     logger.info("REPLICATE_API_TOKEN=your_token_here")
 
+# SDXL img2img model and inference settings (also part of the result cache key)
+SDXL_MODEL = "stability-ai/sdxl:39ed52f2a78e934b3ba6e2a89f5b1c712de7dfea535525255b1aa35c5565e08b"
+
+NEGATIVE_PROMPT = "blurry, distorted, cartoon, unrealistic, low quality, bad lighting"
+
+INFERENCE_PARAMS = {
+    "num_inference_steps": 30,
+    "guidance_scale": 7.5,
+    "strength": 0.6,  # Keep 40% of original image
+    "num_outputs": 1
+}
+
+# Prediction polling
+REPLICATE_POLL_INTERVAL = float(os.getenv("REPLICATE_POLL_INTERVAL", "0.5"))
+REPLICATE_PREDICTION_TIMEOUT = float(os.getenv("REPLICATE_PREDICTION_TIMEOUT", "600"))
+
+TERMINAL_STATUSES = ("succeeded", "failed", "canceled")
+
+
+def _new_log_lines(logs: Optional[str], seen: int) -> tuple[list[str], int]:
+    """Log lines added since the last poll, and the new offset"""
+    if not logs or len(logs) <= seen:
+        return [], seen
+    fresh = logs[seen:]
+    return [line for line in fresh.splitlines() if line.strip()], len(logs)
+
+
+def run_prediction(
+    model_input: dict,
+    on_progress: Optional[Callable[[dict], None]] = None,
+    poll_interval: Optional[float] = None,
+    timeout: Optional[float] = None
+):
+    """
+    Create a Replicate prediction and poll it to completion
+    
+    Args:
+        model_input: Model input parameters
+        on_progress: Called with {"status", "logs", "progress"} whenever
+                     the status changes or new log lines arrive
+        poll_interval: Seconds between polls (default REPLICATE_POLL_INTERVAL)
+        timeout: Cancel the prediction after this many seconds
+                 (default REPLICATE_PREDICTION_TIMEOUT)
+    
+    Returns:
+        Prediction output
+    
+    Raises:
+        Exception: If the prediction fails, is canceled or times out
+    """
+    poll_interval = REPLICATE_POLL_INTERVAL if poll_interval is None else poll_interval
+    timeout = REPLICATE_PREDICTION_TIMEOUT if timeout is None else timeout
+    
+    version = SDXL_MODEL.split(":", 1)[1]
+    prediction = replicate.predictions.create(version=version, input=model_input)
+    logger.info(f"Prediction created: {prediction.id}")
+    
+    deadline = time.monotonic() + timeout
+    last_status = None
+    log_offset = 0
+    while True:
+        lines, log_offset = _new_log_lines(prediction.logs, log_offset)
+        if on_progress and (prediction.status != last_status or lines):
+            progress = prediction.progress
+            on_progress({
+                "status": prediction.status,
+                "logs": lines,
+                "progress": round(progress.percentage, 3) if progress else None,
+            })
+        last_status = prediction.status
+        
+        if prediction.status in TERMINAL_STATUSES:
+            break
+        if time.monotonic() > deadline:
+            prediction.cancel()
+            raise Exception(f"Prediction {prediction.id} timed out after {timeout:.0f}s")
+        
+        time.sleep(poll_interval)
+        prediction.reload()
+    
+    if prediction.status != "succeeded":
+        raise Exception(prediction.error or f"Prediction {prediction.status}")
+    return prediction.output
+
 
 def generate_room_image(
     room_image_bytes: bytes, 
     prompt: str, 
     theme: str, 
-    furniture_links: list[str]
+    furniture_links: list[str],
+    on_progress: Optional[Callable[[dict], None]] = None
 ) -> str:
     """
     Generate room image using Replicate Stable Diffusion
     
+    The room photo is handed to Replicate as an in-memory file object and
+    the result is returned as a URL, so nothing touches the local disk.
+    Use ``upload_from_url`` to copy the result into S3.
+    
     Args:
         room_image_bytes: Original room photo bytes
         prompt: User placement instructions
         theme: Design theme
         furniture_links: List of furniture URLs
+        on_progress: Prediction status / log callback (see run_prediction)
     
     Returns:
-        Path to generated image file
+        URL of the generated image (hosted by Replicate)
     """
     
     # Check if token exists
     if not REPLICATE_API_TOKEN:
         raise Exception("REPLICATE_API_TOKEN not configured. Check your .env file.")
     
-    # Save room image to temp file
-    with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as temp_room:
-        temp_room.write(room_image_bytes)
-        room_image_path = temp_room.name
-    
-    logger.info(f"Room image saved to: {room_image_path}")
+    # In-memory file handle (name is used by replicate for the mime type)
+    room_image = io.BytesIO(room_image_bytes)
+    room_image.name = "room.jpg"
     
     try:
         # Prepare prompt
@@ -59,52 +151,28 @@ def generate_room_image(
         Furniture placement: {', '.join([link.split('/')[-1] for link in furniture_links[:3]])}
         """
         
-        negative_prompt = "blurry, distorted, cartoon, unrealistic, low quality, bad lighting"
-        
         logger.info(f"Generating image with prompt: {full_prompt[:100]}...")
         
-        # Use SDXL with img2img
-        output = replicate.run(
-            "stability-ai/sdxl:39ed52f2a78e934b3ba6e2a89f5b1c712de7dfea535525255b1aa35c5565e08b",
-            input={
-                "image": open(room_image_path, "rb"),
+        # Use SDXL with img2img (create + poll, so progress can be reported)
+        output = run_prediction(
+            {
+                "image": room_image,
                 "prompt": full_prompt,
-                "negative_prompt": negative_prompt,
-                "num_inference_steps": 30,
-                "guidance_scale": 7.5,
-                "strength": 0.6,  # Keep 40% of original image
-                "num_outputs": 1
-            }
+                "negative_prompt": NEGATIVE_PROMPT,
+                **INFERENCE_PARAMS
+            },
+            on_progress=on_progress
         )
         
         # Output is a list of URLs
         output_url = output[0] if isinstance(output, list) else output
         
         logger.info(f"Image generated: {output_url}")
-        
-        # Download generated image
-        response = requests.get(output_url, timeout=60)
-        response.raise_for_status()
-        
-        # Save to temp file
-        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as temp_gen:
-            temp_gen.write(response.content)
-            generated_path = temp_gen.name
-        
-        # Cleanup original room image
-        try:
-            os.remove(room_image_path)
-        except:
-            pass
-        
-        logger.info(f"Generated image saved: {generated_path}")
-        return generated_path
+        return output_url
         
     except Exception as e:
+        record_error("replicate")
         logger.error(f"Image generation failed: {e}")
-        # Cleanup
-        try:
-            os.remove(room_image_path)
-        except:
-            pass
-        raise Exception(f"Failed to generate image: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Failed to generate image: {str(e)}")
+    finally:
+        room_image.close()
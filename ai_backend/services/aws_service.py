@@ -4,14 +4,109 @@ AWS S3 Service Handler
 Manages all AWS S3 operations for the Room Designer application
 """
 
-import boto3
+import io
 import os
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
 from botocore.exceptions import ClientError, NoCredentialsError
-from typing import Optional, List
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, Optional, List
 import logging
+from ai_backend.services.registry import lazy_import
+
+if TYPE_CHECKING:
+    from boto3.s3.transfer import TransferConfig
+
+# boto3 costs ~0.2s to import; it is loaded when the first client is built
+boto3 = lazy_import("boto3")
 
 logger = logging.getLogger(__name__)
 
+MB = 1024 * 1024
+
+# Max concurrent S3 calls (async layer) == botocore connection pool size
+AWS_S3_MAX_CONCURRENCY = int(os.getenv("AWS_S3_MAX_CONCURRENCY", "32"))
+
+# Multipart transfer tuning
+AWS_S3_MULTIPART_THRESHOLD_MB = int(os.getenv("AWS_S3_MULTIPART_THRESHOLD_MB", "8"))
+AWS_S3_MULTIPART_CHUNKSIZE_MB = int(os.getenv("AWS_S3_MULTIPART_CHUNKSIZE_MB", "8"))
+AWS_S3_TRANSFER_CONCURRENCY = int(os.getenv("AWS_S3_TRANSFER_CONCURRENCY", "10"))
+AWS_S3_TRANSFER_USE_THREADS = os.getenv("AWS_S3_TRANSFER_USE_THREADS", "true").lower() == "true"
+
+# S3 DeleteObjects accepts at most 1000 keys per call
+DELETE_BATCH_SIZE = 1000
+AWS_S3_DELETE_WORKERS = int(os.getenv("AWS_S3_DELETE_WORKERS", "4"))
+
+# Progress callback: (bytes transferred so far, total bytes or None)
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+
+def build_transfer_config(
+    multipart_threshold_mb: int = AWS_S3_MULTIPART_THRESHOLD_MB,
+    multipart_chunksize_mb: int = AWS_S3_MULTIPART_CHUNKSIZE_MB,
+    max_concurrency: int = AWS_S3_TRANSFER_CONCURRENCY,
+    use_threads: bool = AWS_S3_TRANSFER_USE_THREADS
+) -> "TransferConfig":
+    """
+    Build a boto3 TransferConfig
+    
+    Args:
+        multipart_threshold_mb: Objects at least this large use multipart
+        multipart_chunksize_mb: Part size (S3 minimum is 5MB)
+        max_concurrency: Parts transferred in parallel per transfer
+        use_threads: Disable to transfer parts sequentially in the caller
+    """
+    from boto3.s3.transfer import TransferConfig
+    
+    return TransferConfig(
+        multipart_threshold=multipart_threshold_mb * MB,
+        multipart_chunksize=multipart_chunksize_mb * MB,
+        max_concurrency=max_concurrency,
+        use_threads=use_threads
+    )
+
+
+class TransferTracker:
+    """
+    Byte counter passed to boto3 as Callback
+    
+    boto3 calls it from its transfer threads with byte increments; the
+    tracker accumulates them and forwards running totals to an optional
+    user progress callback.
+    """
+    
+    def __init__(self, total: Optional[int] = None, progress_callback: Optional[ProgressCallback] = None):
+        self.total = total
+        self.transferred = 0
+        self.progress_callback = progress_callback
+        self.started_at = time.perf_counter()
+        self._lock = threading.Lock()
+    
+    def __call__(self, bytes_amount: int):
+        with self._lock:
+            self.transferred += bytes_amount
+            transferred = self.transferred
+        if self.progress_callback is not None:
+            try:
+                self.progress_callback(transferred, self.total)
+            except Exception as e:
+                logger.warning(f"Progress callback failed: {e}")
+    
+    def finish(self, direction: str, object_name: str) -> dict:
+        """Summary record for this transfer"""
+        seconds = max(time.perf_counter() - self.started_at, 1e-6)
+        return {
+            "direction": direction,
+            "object_name": object_name,
+            "bytes": self.transferred,
+            "seconds": round(seconds, 4),
+            "throughput_mbps": round(self.transferred / MB / seconds, 2),
+            "finished_at": time.time(),
+        }
+
 
 class AWSService:
     """
@@ -29,7 +124,9 @@ class AWSService:
         access_key: str,
         secret_key: str,
         bucket_name: str,
-        region: str = "us-east-1"
+        region: str = "us-east-1",
+        max_pool_connections: int = AWS_S3_MAX_CONCURRENCY,
+        transfer_config: Optional["TransferConfig"] = None
     ):
         """
         Initialize AWS S3 service
@@ -39,26 +136,44 @@ class AWSService:
             secret_key: AWS secret access key
             bucket_name: S3 bucket name
             region: AWS region (default: us-east-1)
+            max_pool_connections: botocore connection pool size
+            transfer_config: Multipart settings (default: build_transfer_config())
         """
         self.bucket_name = bucket_name
         self.region = region
+        self.max_pool_connections = max_pool_connections
+        self.transfer_config = transfer_config or build_transfer_config()
+        self.transfer_history = deque(maxlen=100)
+        self._transfer_totals = {"count": 0, "bytes": 0, "seconds": 0.0}
+        self._transfer_lock = threading.Lock()
+        self._usage_tracker = None
         
         try:
+            from botocore.config import Config
+            
+            # SigV4 everywhere, so presigned PUTs can sign Content-Length
+            client_config = Config(
+                max_pool_connections=max_pool_connections,
+                signature_version="s3v4"
+            )
+            
             # Initialize S3 client
             self.s3_client = boto3.client(
                 's3',
                 aws_access_key_id=access_key,
                 aws_secret_access_key=secret_key,
-                region_name=region
+                region_name=region,
+                config=client_config
             )
             
-            # Initialize S3 resource (for higher-level operations)
-            self.s3_resource = boto3.resource(
-                's3',
+            # S3 resource (higher-level operations) is built on first use
+            self._resource_options = dict(
                 aws_access_key_id=access_key,
                 aws_secret_access_key=secret_key,
-                region_name=region
+                region_name=region,
+                config=client_config
             )
+            self._s3_resource = None
             
             logger.info(f"AWS S3 client initialized for bucket: {bucket_name} (region: {region})")
             
@@ -66,6 +181,13 @@ class AWSService:
             logger.error(f"Failed to initialize AWS client: {e}")
             raise
     
+    @property
+    def s3_resource(self):
+        """boto3 S3 resource, built on first access"""
+        if self._s3_resource is None:
+            self._s3_resource = boto3.resource('s3', **self._resource_options)
+        return self._s3_resource
+    
     def test_connection(self) -> bool:
         """Test if AWS credentials are valid and bucket is accessible"""
         try:
@@ -148,9 +270,11 @@ class AWSService:
         self,
         file_path: str,
         object_name: Optional[str] = None,
-        make_public: bool = True
+        make_public: bool = True,
+        progress_callback: Optional[ProgressCallback] = None,
+        transfer_config: Optional["TransferConfig"] = None
     ) -> Optional[str]:
-        """Upload file to S3 bucket"""
+        """Upload file to S3 bucket (multipart + parallel parts for large files)"""
         if object_name is None:
             object_name = os.path.basename(file_path)
         
@@ -165,12 +289,18 @@ class AWSService:
             if make_public:
                 extra_args['ACL'] = 'public-read'
             
+            size = os.path.getsize(file_path)
+            tracker = TransferTracker(size, progress_callback)
             self.s3_client.upload_file(
                 file_path,
                 self.bucket_name,
                 object_name,
-                ExtraArgs=extra_args
+                ExtraArgs=extra_args,
+                Callback=tracker,
+                Config=transfer_config or self.transfer_config
             )
+            self._record_transfer(tracker.finish("upload", object_name))
+            self._record_usage(object_name, size)
             
             url = f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{object_name}"
             logger.info(f"File uploaded: {url}")
@@ -189,6 +319,98 @@ class AWSService:
             logger.error(f"Unexpected error during upload: {e}")
             return None
     
+    def upload_fileobj(
+        self,
+        fileobj,
+        object_name: str,
+        content_type: str = 'image/jpeg',
+        make_public: bool = True,
+        progress_callback: Optional[ProgressCallback] = None,
+        transfer_config: Optional["TransferConfig"] = None,
+        size: Optional[int] = None,
+        cache_control: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Upload a file-like object (in-memory buffer or HTTP stream) to S3
+        
+        boto3 reads the object in chunks and switches to a multipart
+        upload for large bodies, so this call adds no full copy of its own
+        (storage.upload_fileobj_to_s3 spools and hashes the body first).
+        ``size`` (if known) is only used for progress reporting.
+        ``cache_control`` is stored as the object's Cache-Control header.
+        """
+        try:
+            extra_args = {'ContentType': content_type}
+            if make_public:
+                extra_args['ACL'] = 'public-read'
+            if cache_control:
+                extra_args['CacheControl'] = cache_control
+            
+            if size is None and isinstance(fileobj, io.BytesIO):
+                size = fileobj.getbuffer().nbytes
+            tracker = TransferTracker(size, progress_callback)
+            self.s3_client.upload_fileobj(
+                fileobj,
+                self.bucket_name,
+                object_name,
+                ExtraArgs=extra_args,
+                Callback=tracker,
+                Config=transfer_config or self.transfer_config
+            )
+            record = tracker.finish("upload", object_name)
+            self._record_transfer(record)
+            self._record_usage(object_name, size if size is not None else record["bytes"])
+            
+            url = self.get_file_url(object_name)
+            logger.info(f"File object uploaded: {url}")
+            return url
+            
+        except NoCredentialsError:
+            logger.error("AWS credentials not available")
+            return None
+        except ClientError as e:
+            logger.error(f"Upload failed: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error during upload: {e}")
+            return None
+    
+    def put_object(
+        self,
+        object_name: str,
+        body: bytes,
+        content_type: str = 'application/octet-stream',
+        make_public: bool = False
+    ) -> bool:
+        """Write a small in-memory object (JSON index entries, manifests)"""
+        try:
+            extra_args = {}
+            if make_public:
+                extra_args['ACL'] = 'public-read'
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=object_name,
+                Body=body,
+                ContentType=content_type,
+                **extra_args
+            )
+            self._record_usage(object_name, len(body))
+            return True
+        except ClientError as e:
+            logger.error(f"Put object failed: {e}")
+            return False
+    
+    def get_object_bytes(self, object_name: str) -> Optional[bytes]:
+        """Read a small object into memory (None if missing)"""
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name,
+                Key=object_name
+            )
+            return response['Body'].read()
+        except ClientError:
+            return None
+    
     def delete_file(self, object_name: str) -> bool:
         """Delete file from S3 bucket"""
         try:
@@ -196,6 +418,7 @@ class AWSService:
                 Bucket=self.bucket_name,
                 Key=object_name
             )
+            self._invalidate_usage(object_name)
             logger.info(f"File deleted: {object_name}")
             return True
         except ClientError as e:
@@ -205,22 +428,60 @@ class AWSService:
             logger.error(f"Unexpected error during deletion: {e}")
             return False
     
-    def list_files(self, prefix: str = "", max_keys: int = 1000) -> List[str]:
-        """List files in bucket with optional prefix filter"""
-        try:
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=prefix,
-                MaxKeys=max_keys
+    def iter_objects(self, prefix: str = "", page_size: int = 1000) -> Iterator[Dict]:
+        """
+        Stream every object under a prefix, page by page
+        
+        Yields:
+            Dicts with "key", "size" and "last_modified" (aware datetime)
+        """
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        pages = paginator.paginate(
+            Bucket=self.bucket_name,
+            Prefix=prefix,
+            PaginationConfig={'PageSize': page_size}
+        )
+        for page in pages:
+            for obj in page.get('Contents', []):
+                yield {
+                    "key": obj['Key'],
+                    "size": obj['Size'],
+                    "last_modified": obj['LastModified'],
+                }
+    
+    def list_prefixes(self, prefix: str = "", delimiter: str = "/"):
+        """
+        One level of a delimited listing
+        
+        Returns:
+            Tuple of (child prefixes, objects directly under prefix) where
+            objects have the same shape as iter_objects items
+        """
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        pages = paginator.paginate(Bucket=self.bucket_name, Prefix=prefix, Delimiter=delimiter)
+        prefixes, objects = [], []
+        for page in pages:
+            prefixes.extend(p['Prefix'] for p in page.get('CommonPrefixes', []))
+            objects.extend(
+                {"key": obj['Key'], "size": obj['Size'], "last_modified": obj['LastModified']}
+                for obj in page.get('Contents', [])
             )
+        return prefixes, objects
+    
+    def list_files(self, prefix: str = "", max_keys: Optional[int] = None) -> List[str]:
+        """List files in bucket with optional prefix filter (all pages unless max_keys)"""
+        try:
+            files = []
+            for obj in self.iter_objects(prefix):
+                files.append(obj["key"])
+                if max_keys is not None and len(files) >= max_keys:
+                    break
             
-            if 'Contents' in response:
-                files = [obj['Key'] for obj in response['Contents']]
+            if files:
                 logger.info(f"Listed {len(files)} files with prefix '{prefix}'")
-                return files
             else:
                 logger.info(f"No files found with prefix '{prefix}'")
-                return []
+            return files
         except ClientError as e:
             logger.error(f"List failed: {e}")
             return []
@@ -228,14 +489,24 @@ class AWSService:
             logger.error(f"Unexpected error during listing: {e}")
             return []
     
-    def download_file(self, object_name: str, local_path: str) -> bool:
-        """Download file from S3 to local path"""
+    def download_file(
+        self,
+        object_name: str,
+        local_path: str,
+        progress_callback: Optional[ProgressCallback] = None,
+        transfer_config: Optional["TransferConfig"] = None
+    ) -> bool:
+        """Download file from S3 to local path (ranged parallel GETs for large files)"""
         try:
+            tracker = TransferTracker(None, progress_callback)
             self.s3_client.download_file(
                 self.bucket_name,
                 object_name,
-                local_path
+                local_path,
+                Callback=tracker,
+                Config=transfer_config or self.transfer_config
             )
+            self._record_transfer(tracker.finish("download", object_name))
             logger.info(f"File downloaded: {object_name} -> {local_path}")
             return True
         except ClientError as e:
@@ -245,6 +516,132 @@ class AWSService:
             logger.error(f"Unexpected error during download: {e}")
             return False
     
+    def download_fileobj(
+        self,
+        object_name: str,
+        fileobj,
+        progress_callback: Optional[ProgressCallback] = None,
+        transfer_config: Optional["TransferConfig"] = None
+    ) -> bool:
+        """Download an object into a writable file-like object (e.g. BytesIO)"""
+        try:
+            tracker = TransferTracker(None, progress_callback)
+            self.s3_client.download_fileobj(
+                self.bucket_name,
+                object_name,
+                fileobj,
+                Callback=tracker,
+                Config=transfer_config or self.transfer_config
+            )
+            self._record_transfer(tracker.finish("download", object_name))
+            return True
+        except ClientError as e:
+            logger.error(f"Download failed: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Unexpected error during download: {e}")
+            return False
+    
+    def _record_transfer(self, record: dict):
+        with self._transfer_lock:
+            self.transfer_history.append(record)
+            self._transfer_totals["count"] += 1
+            self._transfer_totals["bytes"] += record["bytes"]
+            self._transfer_totals["seconds"] += record["seconds"]
+        logger.info(
+            f"S3 {record['direction']}: {record['object_name']} "
+            f"{record['bytes'] / MB:.2f}MB in {record['seconds']:.2f}s "
+            f"({record['throughput_mbps']} MB/s)"
+        )
+    
+    def transfer_stats(self) -> dict:
+        """Aggregate and recent per-transfer throughput"""
+        with self._transfer_lock:
+            totals = dict(self._transfer_totals)
+            recent = list(self.transfer_history)[-10:]
+        seconds = totals["seconds"] or 1e-6
+        return {
+            "transfers": totals["count"],
+            "bytes": totals["bytes"],
+            "avg_throughput_mbps": round(totals["bytes"] / MB / seconds, 2),
+            "multipart_threshold_mb": self.transfer_config.multipart_threshold / MB,
+            "multipart_chunksize_mb": self.transfer_config.multipart_chunksize / MB,
+            "max_concurrency": self.transfer_config.max_concurrency,
+            "recent": recent,
+        }
+    
+    def generate_presigned_get(self, object_name: str, expires_in: int = 3600) -> Optional[str]:
+        """Time-limited download URL (works without a public-read ACL)"""
+        try:
+            return self.s3_client.generate_presigned_url(
+                "get_object",
+                Params={"Bucket": self.bucket_name, "Key": object_name},
+                ExpiresIn=expires_in
+            )
+        except ClientError as e:
+            logger.error(f"Presigned GET failed: {e}")
+            return None
+    
+    def generate_presigned_post(
+        self,
+        object_name: str,
+        content_type: str,
+        max_bytes: int,
+        expires_in: int = 900
+    ) -> Optional[dict]:
+        """
+        Presigned browser POST for a single object
+        
+        S3 itself enforces the policy: the key, the exact Content-Type and a
+        1..max_bytes content-length range.
+        
+        Returns:
+            {"url": ..., "fields": {...}} to send as multipart form data
+            (file field last), or None on error
+        """
+        try:
+            return self.s3_client.generate_presigned_post(
+                Bucket=self.bucket_name,
+                Key=object_name,
+                Fields={"Content-Type": content_type},
+                Conditions=[
+                    {"Content-Type": content_type},
+                    ["content-length-range", 1, max_bytes],
+                ],
+                ExpiresIn=expires_in
+            )
+        except ClientError as e:
+            logger.error(f"Presigned POST failed: {e}")
+            return None
+    
+    def generate_presigned_put(
+        self,
+        object_name: str,
+        content_type: str,
+        content_length: int,
+        expires_in: int = 900
+    ) -> Optional[str]:
+        """
+        Presigned PUT URL for a single object
+        
+        Content-Type and Content-Length are part of the signature, so the
+        client must send exactly the declared type and size.
+        """
+        try:
+            return self.s3_client.generate_presigned_url(
+                "put_object",
+                Params={
+                    "Bucket": self.bucket_name,
+                    "Key": object_name,
+                    "ContentType": content_type,
+                    "ContentLength": content_length,
+                },
+                ExpiresIn=expires_in
+            )
+        except ClientError as e:
+            logger.error(f"Presigned PUT failed: {e}")
+            return None
+    
     def get_file_url(self, object_name: str) -> str:
         """Get public URL for an object"""
         return f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{object_name}"
@@ -260,6 +657,18 @@ class AWSService:
         except ClientError:
             return False
     
+    def head_file(self, object_name: str) -> Optional[dict]:
+        """HEAD an object; returns the response dict, or None if missing"""
+        try:
+            response = self.s3_client.head_object(
+                Bucket=self.bucket_name,
+                Key=object_name
+            )
+            response.pop('ResponseMetadata', None)
+            return response
+        except ClientError:
+            return None
+    
     def get_file_size(self, object_name: str) -> Optional[int]:
         """Get file size in bytes"""
         try:
@@ -289,47 +698,153 @@ class AWSService:
             logger.error(f"Copy failed: {e}")
             return False
     
+    def delete_keys(self, keys: Iterable[str], workers: int = AWS_S3_DELETE_WORKERS) -> Dict[str, int]:
+        """
+        Delete keys in DeleteObjects batches of 1000, several batches in parallel
+        
+        ``keys`` may be a generator; at most ``workers * 2`` batches are
+        buffered, so memory stays flat for millions of keys.
+        
+        Returns:
+            Dict with "deleted" and "errors" counts
+        """
+        result = {"deleted": 0, "errors": 0}
+        
+        def delete_batch(batch: List[str]) -> Dict[str, int]:
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={
+                    'Objects': [{'Key': key} for key in batch],
+                    'Quiet': True
+                }
+            )
+            errors = response.get('Errors', [])
+            for error in errors[:5]:
+                logger.error(f"Delete failed for {error.get('Key')}: {error.get('Message')}")
+            return {"deleted": len(batch) - len(errors), "errors": len(errors)}
+        
+        def collect(done):
+            for future in done:
+                batch_result = future.result()
+                result["deleted"] += batch_result["deleted"]
+                result["errors"] += batch_result["errors"]
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-delete") as executor:
+            in_flight = set()
+            batch = []
+            for key in keys:
+                batch.append(key)
+                if len(batch) == DELETE_BATCH_SIZE:
+                    in_flight.add(executor.submit(delete_batch, batch))
+                    batch = []
+                    if len(in_flight) >= workers * 2:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+            if batch:
+                in_flight.add(executor.submit(delete_batch, batch))
+            collect(in_flight)
+        
+        return result
+    
+    def delete_older_than(
+        self,
+        prefix: str,
+        cutoff: datetime,
+        dry_run: bool = False,
+        workers: int = AWS_S3_DELETE_WORKERS
+    ) -> Dict:
+        """
+        Lifecycle sweep: delete objects under prefix last modified before cutoff
+        
+        Args:
+            prefix: Key prefix to sweep (e.g. "generated/")
+            cutoff: Timezone-aware datetime; older objects are deleted
+            dry_run: Only count what would be deleted
+            workers: Parallel DeleteObjects batches
+        
+        Returns:
+            Sweep report (scanned, matched, deleted, errors, bytes, seconds,
+            objects_per_second)
+        """
+        started = time.perf_counter()
+        report = {"scanned": 0, "matched": 0, "deleted": 0, "errors": 0, "bytes": 0, "dry_run": dry_run}
+        
+        def expired_keys():
+            for obj in self.iter_objects(prefix):
+                report["scanned"] += 1
+                if obj["last_modified"] < cutoff:
+                    report["matched"] += 1
+                    report["bytes"] += obj["size"]
+                    yield obj["key"]
+        
+        if dry_run:
+            for _ in expired_keys():
+                pass
+        else:
+            result = self.delete_keys(expired_keys(), workers=workers)
+            report["deleted"] = result["deleted"]
+            report["errors"] = result["errors"]
+        
+        if report["deleted"]:
+            self._invalidate_usage(prefix)
+        
+        seconds = time.perf_counter() - started
+        report["seconds"] = round(seconds, 3)
+        report["objects_per_second"] = round(report["scanned"] / seconds, 1) if seconds else 0
+        
+        logger.info(
+            f"Sweep '{prefix}' (cutoff {cutoff.isoformat()}{', dry run' if dry_run else ''}): "
+            f"scanned {report['scanned']}, matched {report['matched']}, "
+            f"deleted {report['deleted']} in {report['seconds']}s"
+        )
+        return report
+    
     def delete_folder(self, prefix: str) -> bool:
         """Delete all files with given prefix (simulates folder deletion)"""
         try:
-            objects = self.list_files(prefix=prefix)
-            if not objects:
+            keys = (obj["key"] for obj in self.iter_objects(prefix))
+            result = self.delete_keys(keys)
+            if result["deleted"]:
+                self._invalidate_usage(prefix)
+            
+            if not result["deleted"] and not result["errors"]:
                 logger.info(f"No files to delete with prefix '{prefix}'")
                 return True
             
-            for i in range(0, len(objects), 1000):
-                batch = objects[i:i+1000]
-                delete_dict = {
-                    'Objects': [{'Key': key} for key in batch],
-                    'Quiet': True
-                }
-                self.s3_client.delete_objects(
-                    Bucket=self.bucket_name,
-                    Delete=delete_dict
-                )
-            
-            logger.info(f"Deleted {len(objects)} files with prefix '{prefix}'")
-            return True
+            logger.info(f"Deleted {result['deleted']} files with prefix '{prefix}'")
+            return result["errors"] == 0
         except ClientError as e:
             logger.error(f"Folder deletion failed: {e}")
             return False
     
+    @property
+    def usage_tracker(self):
+        """Incremental per-prefix usage statistics (see storage_stats)"""
+        if self._usage_tracker is None:
+            from ai_backend.services.storage_stats import StorageUsageTracker
+            self._usage_tracker = StorageUsageTracker(self)
+        return self._usage_tracker
+    
+    def _invalidate_usage(self, prefix: str):
+        if self._usage_tracker is not None:
+            self._usage_tracker.invalidate(prefix)
+    
+    def _record_usage(self, object_name: str, size: int):
+        if self._usage_tracker is not None:
+            self._usage_tracker.record_upload(object_name, size)
+    
     def get_bucket_size(self) -> dict:
-        """Get bucket statistics (file count and total size)"""
+        """
+        Get bucket statistics (file count and total size)
+        
+        Served from the incremental usage tracker: sealed past-day
+        partitions are cached, only new/current ones are re-listed.
+        """
         try:
-            total_size = 0
-            file_count = 0
-            paginator = self.s3_client.get_paginator('list_objects_v2')
-            pages = paginator.paginate(Bucket=self.bucket_name)
-            
-            for page in pages:
-                if 'Contents' in page:
-                    for obj in page['Contents']:
-                        total_size += obj['Size']
-                        file_count += 1
-            
+            total = self.usage_tracker.usage()["total"]
+            total_size = total["size_bytes"]
             return {
-                'count': file_count,
+                'count': total["count"],
                 'size_bytes': total_size,
                 'size_mb': round(total_size / (1024 * 1024), 2),
                 'size_gb': round(total_size / (1024 * 1024 * 1024), 2)
@@ -339,30 +854,136 @@ class AWSService:
             return {'count': 0, 'size_bytes': 0, 'size_mb': 0, 'size_gb': 0}
 
 
+class AsyncAWSService:
+    """
+    Async counterpart of AWSService
+    
+    Runs the (thread-safe) boto3 client on a dedicated thread pool sized
+    to the botocore connection pool, so at most ``max_concurrency`` S3
+    calls are in flight and the event loop never blocks on a request.
+    """
+    
+    def __init__(self, service: AWSService, max_concurrency: Optional[int] = None):
+        """
+        Initialize async S3 service
+        
+        Args:
+            service: Underlying synchronous AWSService
+            max_concurrency: Max concurrent S3 calls (default: the
+                             service's max_pool_connections)
+        """
+        self.service = service
+        self.max_concurrency = max_concurrency or service.max_pool_connections
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="s3-io"
+        )
+    
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+    
+    async def upload(
+        self,
+        data,
+        object_name: str,
+        content_type: str = 'image/jpeg',
+        make_public: bool = True,
+        cache_control: Optional[str] = None
+    ) -> Optional[str]:
+        """Upload bytes or a file-like object; returns the object URL"""
+        if isinstance(data, (bytes, bytearray)):
+            data = io.BytesIO(data)
+        return await self._run(
+            self.service.upload_fileobj, data, object_name, content_type, make_public,
+            cache_control=cache_control
+        )
+    
+    async def download(self, object_name: str) -> Optional[bytes]:
+        """Download an object into memory (None if missing)"""
+        return await self._run(self.service.get_object_bytes, object_name)
+    
+    async def head(self, object_name: str) -> Optional[dict]:
+        """HEAD an object (None if missing)"""
+        return await self._run(self.service.head_file, object_name)
+    
+    async def list(self, prefix: str = "", max_keys: Optional[int] = None) -> List[str]:
+        """List object keys under a prefix"""
+        return await self._run(self.service.list_files, prefix, max_keys)
+    
+    async def delete(self, object_name: str) -> bool:
+        """Delete an object"""
+        return await self._run(self.service.delete_file, object_name)
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
 # Global instance
 _aws_service_instance: Optional[AWSService] = None
+_async_aws_service_instance: Optional[AsyncAWSService] = None
 
 
 def init_aws_service(
     access_key: str, 
     secret_key: str, 
     bucket: str, 
-    region: str
+    region: str,
+    max_concurrency: int = AWS_S3_MAX_CONCURRENCY
 ) -> AWSService:
-    """Initialize global AWS service instance"""
-    global _aws_service_instance
-    _aws_service_instance = AWSService(access_key, secret_key, bucket, region)
+    """Initialize global AWS service instance (and its async counterpart)"""
+    global _aws_service_instance, _async_aws_service_instance
+    _aws_service_instance = AWSService(access_key, secret_key, bucket, region, max_concurrency)
+    if _async_aws_service_instance is not None:
+        _async_aws_service_instance.shutdown()
+    _async_aws_service_instance = AsyncAWSService(_aws_service_instance, max_concurrency)
     return _aws_service_instance
 
 
+def init_aws_service_from_env() -> AWSService:
+    """Initialize from the AWS_* environment variables"""
+    return init_aws_service(
+        access_key=os.getenv("AWS_ACCESS_KEY_ID"),
+        secret_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        bucket=os.getenv("AWS_S3_BUCKET"),
+        region=os.getenv("AWS_REGION", "eu-north-1")
+    )
+
+
+def _build_registered_service():
+    """Build the service on first use when the app registered a factory for it"""
+    from ai_backend.services.registry import get_service_registry
+    
+    registry = get_service_registry()
+    if registry.is_registered("aws"):
+        try:
+            registry.get("aws")
+        except Exception as e:
+            raise RuntimeError(f"AWS service unavailable: {e}")
+
+
 def get_aws_service() -> AWSService:
-    """Get global AWS service instance"""
+    """Get global AWS service instance (built lazily if registered)"""
+    if _aws_service_instance is None:
+        _build_registered_service()
     if _aws_service_instance is None:
         raise RuntimeError("AWS service not initialized. Call init_aws_service() first.")
     return _aws_service_instance
 
 
+def get_async_aws_service() -> AsyncAWSService:
+    """Get global async AWS service instance (built lazily if registered)"""
+    if _async_aws_service_instance is None:
+        _build_registered_service()
+    if _async_aws_service_instance is None:
+        raise RuntimeError("AWS service not initialized. Call init_aws_service() first.")
+    return _async_aws_service_instance
+
+
 def reset_aws_service():
-    """Reset global AWS service instance (for testing)"""
-    global _aws_service_instance
-    _aws_service_instance = None
\ No newline at end of file
+    """Reset global AWS service instances (for testing)"""
+    global _aws_service_instance, _async_aws_service_instance
+    if _async_aws_service_instance is not None:
+        _async_aws_service_instance.shutdown()
+    _aws_service_instance = None
+    _async_aws_service_instance = None
\ No newline at end of file
@@ -0,0 +1,391 @@
+# ai_backend/services/catalog_index.py
+"""
+Furniture Catalog Index
+Persistent on-disk product index (SQLite + FTS5) behind /furniture/search
+
+Products are collected by an offline crawl over every theme site and
+furniture type, then served by indexed queries instead of live scraping.
+A background task re-crawls periodically to keep the index current.
+"""
+
+import os
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from ai_backend.models import FurnitureItem, PriceRange
+
+logger = logging.getLogger(__name__)
+
+# Writable per-user cache location (the package directory may be read-only)
+DEFAULT_INDEX_PATH = str(
+    Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "room-designer" / "furniture_index.sqlite3"
+)
+
+# Tunables (env overridable)
+CATALOG_INDEX_ENABLED = os.getenv("CATALOG_INDEX_ENABLED", "true").lower() == "true"
+CATALOG_INDEX_PATH = os.getenv("CATALOG_INDEX_PATH", DEFAULT_INDEX_PATH)
+CATALOG_REFRESH_SECONDS = int(os.getenv("CATALOG_REFRESH_SECONDS", str(6 * 3600)))  # 0 = no refresh
+CATALOG_CRAWL_DEADLINE_SECONDS = float(os.getenv("CATALOG_CRAWL_DEADLINE_SECONDS", "300"))
+
+# Price range used while crawling (collect everything, filter at query time)
+CRAWL_PRICE_RANGE = PriceRange(min=0, max=1_000_000_000)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    link TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    image_url TEXT NOT NULL DEFAULT '',
+    width REAL,
+    depth REAL,
+    height REAL,
+    domain TEXT NOT NULL,
+    furniture_type TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_type_domain_price
+    ON products (furniture_type, domain, price);
+CREATE INDEX IF NOT EXISTS idx_products_domain_price
+    ON products (domain, price);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    name, furniture_type, content='products', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS products_ai AFTER INSERT ON products BEGIN
+    INSERT INTO products_fts (rowid, name, furniture_type)
+    VALUES (new.id, new.name, new.furniture_type);
+END;
+CREATE TRIGGER IF NOT EXISTS products_ad AFTER DELETE ON products BEGIN
+    INSERT INTO products_fts (products_fts, rowid, name, furniture_type)
+    VALUES ('delete', old.id, old.name, old.furniture_type);
+END;
+CREATE TRIGGER IF NOT EXISTS products_au AFTER UPDATE ON products BEGIN
+    INSERT INTO products_fts (products_fts, rowid, name, furniture_type)
+    VALUES ('delete', old.id, old.name, old.furniture_type);
+    INSERT INTO products_fts (rowid, name, furniture_type)
+    VALUES (new.id, new.name, new.furniture_type);
+END;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _fts_query(furniture_types: List[str]) -> str:
+    """["Sofa", "Coffee Table"] -> '"sofa" OR "coffee table"' (quoted phrases)"""
+    phrases = []
+    for furniture_type in furniture_types:
+        cleaned = furniture_type.replace('"', " ").strip().lower()
+        if cleaned:
+            phrases.append(f'"{cleaned}"')
+    return " OR ".join(phrases)
+
+
+class CatalogIndex:
+    """
+    SQLite/FTS5 product index
+
+    Writes go through one connection serialized with a lock. Reads use a
+    read-only connection per thread (WAL mode, so they never block on the
+    crawler); an in-memory index has no second connection, so its reads
+    share the write connection under the lock.
+    """
+
+    def __init__(self, path: str = CATALOG_INDEX_PATH):
+        """
+        Open (or create) the index
+
+        Args:
+            path: SQLite file path (":memory:" for tests)
+        """
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+        logger.info(f"Catalog index opened: {path} ({self.count()} products)")
+
+    def _reader(self) -> Optional[sqlite3.Connection]:
+        """This thread's read-only connection (None for in-memory indexes)"""
+        if self.path == ":memory:":
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            uri = f"{Path(os.path.abspath(self.path)).as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    def _query(self, sql: str, params=()) -> list:
+        """Run a read query on a reader connection"""
+        conn = self._reader()
+        if conn is None:
+            with self._lock:
+                return self._conn.execute(sql, params).fetchall()
+        return conn.execute(sql, params).fetchall()
+
+    def upsert_products(self, domain: str, furniture_type: str, items: List[FurnitureItem]) -> int:
+        """Insert or refresh scraped products; returns number written"""
+        now = time.time()
+        rows = [
+            (
+                item.link, item.name, item.price, item.image_url,
+                item.dimensions.get("width"), item.dimensions.get("depth"),
+                item.dimensions.get("height"), domain, furniture_type, now
+            )
+            for item in items
+        ]
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO products
+                    (link, name, price, image_url, width, depth, height,
+                     domain, furniture_type, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(link) DO UPDATE SET
+                    name = excluded.name,
+                    price = excluded.price,
+                    image_url = excluded.image_url,
+                    width = excluded.width,
+                    depth = excluded.depth,
+                    height = excluded.height,
+                    domain = excluded.domain,
+                    furniture_type = excluded.furniture_type,
+                    updated_at = excluded.updated_at
+                """,
+                rows
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def search(
+        self,
+        domains: List[str],
+        furniture_types: List[str],
+        price_range: PriceRange,
+        limit: Optional[int] = 10
+    ) -> List[FurnitureItem]:
+        """
+        Indexed product query
+
+        Matches products from the given domains inside the price range whose
+        furniture type is one of the requested types, or whose name matches
+        them in the full-text index. Exact type matches rank first, then
+        cheapest first (same order as the live search), cut to top-k
+        (limit=None returns every match).
+        """
+        if not domains or not furniture_types:
+            return []
+
+        domain_marks = ",".join("?" * len(domains))
+        type_marks = ",".join("?" * len(furniture_types))
+        sql = f"""
+            SELECT name, link, price, image_url, width, depth, height,
+                   furniture_type IN ({type_marks}) AS exact_type
+            FROM products
+            WHERE domain IN ({domain_marks})
+              AND price BETWEEN ? AND ?
+              AND (
+                  furniture_type IN ({type_marks})
+                  OR id IN (SELECT rowid FROM products_fts WHERE products_fts MATCH ?)
+              )
+            ORDER BY exact_type DESC, price ASC
+            LIMIT ?
+        """
+        params = [
+            *furniture_types,
+            *domains,
+            price_range.min, price_range.max,
+            *furniture_types,
+            _fts_query(furniture_types) or '""',
+            -1 if limit is None else limit,  # LIMIT -1: no limit
+        ]
+        rows = self._query(sql, params)
+
+        return [
+            FurnitureItem(
+                name=row["name"],
+                link=row["link"],
+                price=row["price"],
+                image_url=row["image_url"],
+                dimensions={
+                    key: row[key] for key in ("width", "depth", "height")
+                    if row[key] is not None
+                }
+            )
+            for row in rows
+        ]
+
+    def prune(self, older_than: float) -> int:
+        """Delete products not seen by any crawl since the given timestamp"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM products WHERE updated_at < ?", (older_than,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def count(self) -> int:
+        return self._query("SELECT COUNT(*) FROM products")[0][0]
+
+    def get_meta(self, key: str) -> Optional[str]:
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def set_meta(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+            self._conn.commit()
+
+    @property
+    def last_refresh(self) -> float:
+        return float(self.get_meta("last_refresh") or 0)
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "products": self.count(),
+            "last_refresh": self.last_refresh or None,
+        }
+
+    def close(self):
+        with self._lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+            self._conn.close()
+
+
+async def crawl_catalog(index: CatalogIndex, deadline: float = CATALOG_CRAWL_DEADLINE_SECONDS) -> int:
+    """
+    Crawl every theme site for every known furniture type into the index
+
+    Uses the concurrent scraping engine with a generous deadline; products
+    not refreshed by a successful crawl are pruned afterwards.
+
+    Returns:
+        Number of products written
+    """
+    from ai_backend.config import THEMES
+    from ai_backend.services.furniture import SCRAPERS, build_scrape_call
+    from ai_backend.services.furniture_catalog import get_furniture_catalog
+    from ai_backend.services.http_client import get_http_client
+    from ai_backend.services.scraper_engine import run_scrapers, unique_domains
+
+    started = time.time()
+    domains = unique_domains([site for sites in THEMES.values() for site in sites])
+    furniture_types = get_furniture_catalog().furniture_types()
+
+    http = get_http_client()
+    tasks = []
+    for domain in domains:
+        scraper = SCRAPERS.get(domain)
+        if not scraper:
+            continue
+        for furniture_type in furniture_types:
+            call = build_scrape_call(scraper, http, furniture_type, CRAWL_PRICE_RANGE)
+
+            async def tagged(call=call, domain=domain, furniture_type=furniture_type):
+                return [(domain, furniture_type, await call())]
+
+            tasks.append((domain, tagged))
+
+    report = await run_scrapers(tasks, deadline=deadline)
+
+    written = 0
+    for domain, furniture_type, items in report["results"]:
+        written += await asyncio.to_thread(index.upsert_products, domain, furniture_type, items)
+
+    # Only prune when every site answered, so a flaky crawl can't empty the index
+    if not report["timed_out"] and not report["failed"]:
+        pruned = await asyncio.to_thread(index.prune, started)
+        if pruned:
+            logger.info(f"🗑️  Pruned {pruned} stale catalog products")
+
+    await asyncio.to_thread(index.set_meta, "last_refresh", str(time.time()))
+    logger.info(f"✅ Catalog crawl complete: {written} products in {time.time() - started:.1f}s")
+    return written
+
+
+async def refresh_catalog_periodically(index: CatalogIndex, interval: int = CATALOG_REFRESH_SECONDS):
+    """Background loop: crawl whenever the index is older than interval"""
+    while True:
+        age = time.time() - await asyncio.to_thread(lambda: index.last_refresh)
+        if age >= interval:
+            try:
+                await crawl_catalog(index)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Catalog crawl failed: {e}")
+            age = 0
+        await asyncio.sleep(max(interval - age, 1))
+
+
+# Global instance
+_catalog_index_instance: Optional[CatalogIndex] = None
+_refresh_task: Optional[asyncio.Task] = None
+
+
+def init_catalog_index(path: str = CATALOG_INDEX_PATH) -> CatalogIndex:
+    """Initialize global catalog index instance"""
+    global _catalog_index_instance
+    _catalog_index_instance = CatalogIndex(path)
+    return _catalog_index_instance
+
+
+def get_catalog_index() -> Optional[CatalogIndex]:
+    """Get global catalog index (None when disabled)"""
+    if not CATALOG_INDEX_ENABLED:
+        return None
+    if _catalog_index_instance is None:
+        return init_catalog_index()
+    return _catalog_index_instance
+
+
+def start_catalog_refresh(interval: int = CATALOG_REFRESH_SECONDS) -> Optional[asyncio.Task]:
+    """Start the background refresh loop (call from the running event loop)"""
+    global _refresh_task
+    index = get_catalog_index()
+    if index is None or interval <= 0:
+        return None
+    _refresh_task = asyncio.get_running_loop().create_task(
+        refresh_catalog_periodically(index, interval)
+    )
+    return _refresh_task
+
+
+async def stop_catalog_refresh():
+    """Cancel the background refresh loop and close the index"""
+    global _refresh_task, _catalog_index_instance
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        _refresh_task = None
+    if _catalog_index_instance is not None:
+        _catalog_index_instance.close()
+        _catalog_index_instance = None
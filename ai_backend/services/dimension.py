@@ -1,17 +1,30 @@
 # ai_backend/services/dimension.py - UPDATE
 
-import json
+import math
+import functools
 
-with open("ai_backend/data/furniture_data.json", "r") as f:
-    FURNITURE_DATA = json.load(f)
+from ai_backend.services.furniture_catalog import get_furniture_catalog
+from ai_backend.services.registry import lazy_import
+
+np = lazy_import("numpy")  # only the batch paths need it
 
 def calculate_room_area(length: float, width: float) -> float:
     """Square feet ber koro"""
     return length * width
 
 def get_furniture_dimensions(room_type: str, furniture_type: str, subtype: str):
-    """Furniture er size khuje ber koro"""
-    return FURNITURE_DATA.get(room_type, {}).get(furniture_type, {}).get(subtype)
+    """Furniture er size khuje ber koro (compiled catalog, O(1))"""
+    entry = get_furniture_catalog().lookup(furniture_type, subtype, room_type)
+    if entry is None:
+        return None
+    dims = {"width": entry.width, "depth": entry.depth}
+    if entry.height is not None:
+        dims["height"] = entry.height
+    return dims
+
+MAX_USAGE_RATIO = 0.60  # hard limit on floor coverage
+COMFORT_USAGE_RATIO = 0.50  # above this, circulation gets tight
+EPSILON = 1e-9  # float tolerance (touching edges are not an overlap)
 
 def check_furniture_fit(room, furnitures) -> tuple[bool, str]:
     """
@@ -27,21 +40,304 @@ def check_furniture_fit(room, furnitures) -> tuple[bool, str]:
         total_furniture_area += furn_area
     
     # Rule: Furniture 60% er beshi nite pare na
-    max_allowed = room_area * 0.60
+    max_allowed = room_area * MAX_USAGE_RATIO
     
     if total_furniture_area > max_allowed:
         return False, "Please deselect one item because the dimension is bigger."
     
     # Check circulation space (min 3 feet pathway dorkar)
-    if total_furniture_area > room_area * 0.50:
+    if total_furniture_area > room_area * COMFORT_USAGE_RATIO:
         return True, "Fits tightly. Consider removing one item for better movement."
     
     return True, f"All furniture fits comfortably. Using {(total_furniture_area/room_area)*100:.1f}% of floor space."
 
-def check_collision(furnitures: list) -> bool:
+# -------------------------------------------------------------
+# Batch fit-check (vectorized)
+# -------------------------------------------------------------
+
+EXHAUSTIVE_REMOVAL_LIMIT = 16  # items; larger sets fall back to largest-first
+REMOVAL_ALTERNATIVES = 3
+
+
+def _fit_message(fits: bool, usage: float) -> str:
+    """Same wording as check_furniture_fit"""
+    if not fits:
+        return "Please deselect one item because the dimension is bigger."
+    if usage > COMFORT_USAGE_RATIO:
+        return "Fits tightly. Consider removing one item for better movement."
+    return f"All furniture fits comfortably. Using {usage * 100:.1f}% of floor space."
+
+
+@functools.lru_cache(maxsize=EXHAUSTIVE_REMOVAL_LIMIT + 1)
+def _subset_masks(n: int) -> tuple:
+    """
+    Every subset of n items, built once per n
+
+    Returns:
+        (masks, sizes): float 0/1 matrix (2**n x n) and item count of each
+        subset, both read-only
+    """
+    codes = np.arange(1 << n, dtype=np.uint32)
+    masks = ((codes[:, None] >> np.arange(n, dtype=np.uint32)) & 1).astype(np.float64)
+    sizes = masks.sum(axis=1).astype(np.int64)
+    masks.flags.writeable = False
+    sizes.flags.writeable = False
+    return masks, sizes
+
+
+def _greedy_removal(areas: "np.ndarray", excess: float) -> list:
+    order = np.argsort(-areas, kind="stable")
+    count = int(np.searchsorted(np.cumsum(areas[order]), excess - EPSILON) + 1)
+    return [sorted(order[:count].tolist())]
+
+
+def _smallest_removals_batch(areas: "np.ndarray", limits: "np.ndarray") -> list:
+    """
+    smallest_removals for k rows of n item areas (k x n) in one pass
+
+    Removed area of every subset for every row is one matrix product,
+    evaluated in row chunks so the k x 2**n block stays around 8MB.
+    """
+    k, n = areas.shape
+    excess = areas.sum(axis=1) - limits
+    if n > EXHAUSTIVE_REMOVAL_LIMIT:
+        return [[[]] if excess[row] <= EPSILON else _greedy_removal(areas[row], excess[row]) for row in range(k)]
+
+    masks, sizes = _subset_masks(n)
+    chunk = max(1, (1 << 20) >> n)
+    results = []
+    for start in range(0, k, chunk):
+        removed = areas[start:start + chunk] @ masks.T
+        # Infeasible subsets rank past every real size
+        ranked = np.where(removed >= (excess[start:start + chunk] - EPSILON)[:, None], sizes, n + 1)
+        fewest = ranked.min(axis=1)
+        for offset in range(len(removed)):
+            if excess[start + offset] <= EPSILON:
+                results.append([[]])
+                continue
+            candidates = np.flatnonzero(ranked[offset] == fewest[offset])
+            # Rounded so float noise doesn't reorder equal areas (ties keep subset order)
+            order = np.argsort(np.round(removed[offset, candidates], 6), kind="stable")
+            best = candidates[order][:REMOVAL_ALTERNATIVES]
+            results.append([np.flatnonzero(masks[row]).tolist() for row in best])
+    return results
+
+
+def smallest_removals(areas: "np.ndarray", limit: float) -> list:
+    """
+    Smallest sets of item indexes whose removal brings total area <= limit
+
+    Among sets with the fewest items, the ones removing the least area
+    (keeping the most furniture) come first. Sets above
+    EXHAUSTIVE_REMOVAL_LIMIT items use the largest-first greedy answer,
+    which is still minimal in item count.
+    """
+    areas = np.asarray(areas, dtype=np.float64)
+    return _smallest_removals_batch(areas[None, :], np.array([limit]))[0]
+
+
+def check_furniture_fit_batch(room, furniture_sets: list) -> list:
+    """
+    Evaluate many candidate furniture sets against one room
+
+    Footprints of all sets are packed into one padded matrix, so usage
+    and verdicts for every set come from a single vectorized pass.
+
+    Args:
+        room: RoomDimensions
+        furniture_sets: List of FurnitureSelection lists
+
+    Returns:
+        One dict per set with "fits", "usage_percent", "total_sqft",
+        "message" and "removals" (smallest sets of item indexes to drop
+        to get under the 60% "fit" and 50% "comfortable" thresholds)
+    """
+    room_area = room.length * room.width
+    if not furniture_sets:
+        return []
+
+    width = max((len(furnitures) for furnitures in furniture_sets), default=0)
+    footprints = np.zeros((len(furniture_sets), max(width, 1)))
+    for row, furnitures in enumerate(furniture_sets):
+        for col, furniture in enumerate(furnitures):
+            footprints[row, col] = furniture.width * furniture.depth / 144  # sq in -> sq ft
+
+    totals = footprints.sum(axis=1)
+    usage = totals / room_area  # room sides are validated > 0
+    fits = totals <= room_area * MAX_USAGE_RATIO
+
+    # Removal search: sets of equal size share one subset matrix, and both
+    # thresholds are evaluated as extra rows of the same product
+    thresholds = (("fit", MAX_USAGE_RATIO), ("comfortable", COMFORT_USAGE_RATIO))
+    by_size = {}
+    for row, furnitures in enumerate(furniture_sets):
+        by_size.setdefault(len(furnitures), []).append(row)
+    options_by_row = {}
+    for n, rows in by_size.items():
+        areas = np.tile(footprints[rows, :n], (len(thresholds), 1))
+        limits = np.repeat([room_area * ratio for _, ratio in thresholds], len(rows))
+        options = _smallest_removals_batch(areas, limits)
+        for t, (label, _) in enumerate(thresholds):
+            for i, row in enumerate(rows):
+                options_by_row[row, label] = options[t * len(rows) + i]
+
+    results = []
+    for row, furnitures in enumerate(furniture_sets):
+        removals = {}
+        for label, _ in thresholds:
+            options = options_by_row[row, label]
+            removals[label] = {
+                "remove": options[0],
+                "remove_items": [f"{furnitures[i].type} - {furnitures[i].subtype}" for i in options[0]],
+                "alternatives": options[1:],
+            }
+        results.append({
+            "fits": bool(fits[row]),
+            "usage_percent": round(float(usage[row]) * 100, 1),
+            "total_sqft": round(float(totals[row]), 2),
+            "message": _fit_message(bool(fits[row]), float(usage[row])),
+            "removals": removals,
+        })
+    return results
+
+
+# -------------------------------------------------------------
+# Spatial layout checks (positions in feet, furniture sizes in inches)
+# -------------------------------------------------------------
+
+MIN_CLEARANCE_FT = 3.0  # walkway between pieces
+
+
+def footprint(furniture) -> list:
+    """Corner points (feet) of a placed item's rotated footprint"""
+    half_w = furniture.width / 24  # inches -> feet, halved
+    half_d = furniture.depth / 24
+    angle = math.radians(furniture.rotation or 0)
+    cos_a, sin_a = math.cos(angle), math.sin(angle)
+    corners = []
+    for dx, dy in ((-half_w, -half_d), (half_w, -half_d), (half_w, half_d), (-half_w, half_d)):
+        corners.append((
+            furniture.x + dx * cos_a - dy * sin_a,
+            furniture.y + dx * sin_a + dy * cos_a
+        ))
+    return corners
+
+
+def _bounds(corners: list) -> tuple:
+    xs = [x for x, _ in corners]
+    ys = [y for _, y in corners]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _project(corners: list, axis: tuple) -> tuple:
+    dots = [x * axis[0] + y * axis[1] for x, y in corners]
+    return min(dots), max(dots)
+
+
+def _overlaps(a: list, b: list) -> bool:
+    """Separating axis test for two rectangles (edge normals of both)"""
+    for corners in (a, b):
+        for i in range(2):
+            (x1, y1), (x2, y2) = corners[i], corners[i + 1]
+            axis = (y1 - y2, x2 - x1)
+            min_a, max_a = _project(a, axis)
+            min_b, max_b = _project(b, axis)
+            if max_a <= min_b + EPSILON or max_b <= min_a + EPSILON:
+                return False
+    return True
+
+
+def _point_segment_distance(p: tuple, s1: tuple, s2: tuple) -> float:
+    dx, dy = s2[0] - s1[0], s2[1] - s1[1]
+    length_sq = dx * dx + dy * dy
+    t = 0.0 if not length_sq else max(0.0, min(1.0, ((p[0] - s1[0]) * dx + (p[1] - s1[1]) * dy) / length_sq))
+    return math.hypot(p[0] - (s1[0] + t * dx), p[1] - (s1[1] + t * dy))
+
+
+def _distance(a: list, b: list) -> float:
+    """Gap between two non-overlapping convex footprints (feet)"""
+    best = math.inf
+    for points, edges in ((a, b), (b, a)):
+        for i in range(4):
+            s1, s2 = edges[i], edges[(i + 1) % 4]
+            for p in points:
+                best = min(best, _point_segment_distance(p, s1, s2))
+    return best
+
+
+def _candidate_pairs(boxes: list, margin: float) -> list:
+    """
+    Sweep-and-prune broadphase
+
+    Sorts bounding boxes by min x and only pairs boxes whose x extents
+    (grown by margin) overlap, then filters on y. Avoids all-pairs
+    narrowphase checks for spread-out layouts.
     """
-    Advanced: Check koro furniture overlap hocche kina
-    Eita implement korte complex - pore korbe
+    order = sorted(range(len(boxes)), key=lambda i: boxes[i][0])
+    active = []
+    pairs = []
+    for i in order:
+        min_x, min_y, max_x, max_y = boxes[i]
+        active = [j for j in active if boxes[j][2] + margin > min_x]
+        for j in active:
+            if boxes[j][1] < max_y + margin and min_y < boxes[j][3] + margin:
+                pairs.append((min(i, j), max(i, j)))
+        active.append(i)
+    return pairs
+
+
+def check_layout(room, furnitures: list, clearance_ft: float = MIN_CLEARANCE_FT) -> dict:
+    """
+    Validate placed furniture geometrically
+
+    Args:
+        room: RoomDimensions (length along x, width along y, feet)
+        furnitures: PlacedFurniture items
+        clearance_ft: Minimum walkway between pieces
+
+    Returns:
+        Dict with "valid", index pairs in "collisions", item indexes in
+        "out_of_bounds", and "clearance_warnings" (pairs closer than
+        clearance_ft, with their gap in feet)
     """
-    # TODO: Add 2D collision detection
-    return True
\ No newline at end of file
+    shapes = [footprint(furniture) for furniture in furnitures]
+    boxes = [_bounds(corners) for corners in shapes]
+
+    out_of_bounds = [
+        i for i, (min_x, min_y, max_x, max_y) in enumerate(boxes)
+        if min_x < -EPSILON or min_y < -EPSILON
+        or max_x > room.length + EPSILON or max_y > room.width + EPSILON
+    ]
+
+    collisions = []
+    clearance_warnings = []
+    for i, j in _candidate_pairs(boxes, clearance_ft):
+        if _overlaps(shapes[i], shapes[j]):
+            collisions.append({"a": i, "b": j})
+            continue
+        gap = _distance(shapes[i], shapes[j])
+        if gap < clearance_ft:
+            clearance_warnings.append({"a": i, "b": j, "distance_ft": round(gap, 2)})
+
+    valid = not collisions and not out_of_bounds
+    if not valid:
+        message = "Some furniture overlaps or extends past the walls."
+    elif clearance_warnings:
+        message = f"Layout fits, but some pieces are closer than {clearance_ft:g} ft apart."
+    else:
+        message = "Layout fits with clear walkways."
+
+    return {
+        "valid": valid,
+        "collisions": collisions,
+        "out_of_bounds": out_of_bounds,
+        "clearance_warnings": clearance_warnings,
+        "message": message,
+    }
+
+
+def check_collision(furnitures: list) -> bool:
+    """True when no placed furniture footprints overlap"""
+    shapes = [footprint(furniture) for furniture in furnitures]
+    boxes = [_bounds(corners) for corners in shapes]
+    return not any(_overlaps(shapes[i], shapes[j]) for i, j in _candidate_pairs(boxes, 0.0))
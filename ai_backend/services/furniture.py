@@ -1,28 +1,39 @@
 # ai_backend/services/furniture.py - FULL REPLACE
 
-import requests
-from bs4 import BeautifulSoup
-from typing import List
+import asyncio
+import inspect
+import functools
+from typing import List, Optional
 import logging
 from ai_backend.models import FurnitureItem, PriceRange
+from ai_backend.services.scraper_engine import run_scrapers, unique_domains
+from ai_backend.services.catalog_index import get_catalog_index
+from ai_backend.services.http_client import HTTPClientManager, get_http_client
 
 logger = logging.getLogger(__name__)
 
+# Scrapers are async and make every request through the shared client
+# manager (pooling, per-host caps, retries), e.g. ``await http.get(url)``.
+# Signature: (http, furniture_type, price_range) -> List[FurnitureItem]
 
-def scrape_ethnicraft(furniture_type: str, price_range: PriceRange) -> List[FurnitureItem]:
+async def scrape_ethnicraft(
+    http: HTTPClientManager, furniture_type: str, price_range: PriceRange
+) -> List[FurnitureItem]:
     """Ethnicraft specific scraper - PLACEHOLDER"""
     # TODO: Implement actual scraping after inspecting site
     logger.warning("Ethnicraft scraper not implemented yet")
     return []
 
 
-def scrape_kavehome(furniture_type: str, price_range: PriceRange) -> List[FurnitureItem]:
+async def scrape_kavehome(
+    http: HTTPClientManager, furniture_type: str, price_range: PriceRange
+) -> List[FurnitureItem]:
     """Kavehome specific scraper - PLACEHOLDER"""
     logger.warning("Kavehome scraper not implemented yet")
     return []
 
 
-# Scraper mapping
+# Scraper mapping (keys are normalized domains, see normalize_domain)
 SCRAPERS = {
     "ethnicraft.com": scrape_ethnicraft,
     "kavehome.com": scrape_kavehome,
@@ -30,49 +41,95 @@ SCRAPERS = {
 }
 
 
-def search_furniture(
+def build_scrape_call(scraper, http: HTTPClientManager, furniture_type: str, price_range: PriceRange):
+    """Zero-arg awaitable factory for one scraper call (for the engine)"""
+    if inspect.iscoroutinefunction(scraper):
+        return functools.partial(scraper, http, furniture_type, price_range)
+    # Legacy blocking scraper: keep it off the event loop
+    return functools.partial(asyncio.to_thread, scraper, furniture_type, price_range)
+
+
+async def search_furniture_async(
     theme: str, 
     room_type: str, 
     furniture_types: List[str], 
-    price_range: PriceRange
+    price_range: PriceRange,
+    limit: Optional[int] = 10,
+    mock_fallback: bool = True,
+    **engine_options
 ) -> List[FurnitureItem]:
     """
     Search furniture from theme websites
     
+    Answers from the local catalog index when it has matching products.
+    Otherwise every (site, furniture type) scraper call runs in parallel
+    under the engine's per-domain limit, per-site timeout and global
+    deadline, so latency is bounded by the slowest site that answers within
+    budget. Duplicate domains in a theme are scraped once.
+    
     NOTE: Real scraping implementation needed!
     This returns mock data for now.
+    
+    Args:
+        limit: Number of cheapest items to return (None: all of them)
+        mock_fallback: Return placeholder items when nothing is found
+                       (see get_mock_furniture)
+        engine_options: Overrides for run_scrapers (deadline, site_timeout,
+                        per_domain_limit)
     """
     from ai_backend.config import THEMES
     
-    websites = THEMES.get(theme.upper(), [])
-    all_results = []
+    domains = unique_domains(THEMES.get(theme.upper(), []))
     
-    for website in websites:
-        domain = website.replace("https://", "").replace("http://", "").replace("www.", "").split("/")[0]
+    # Indexed lookup first (offline crawl, see catalog_index)
+    index = get_catalog_index()
+    if index is not None:
+        indexed = await asyncio.to_thread(index.search, domains, furniture_types, price_range, limit)
+        if indexed:
+            logger.info(f"Catalog index hit: {len(indexed)} items")
+            return indexed
+    
+    http = get_http_client()
+    tasks = []
+    for domain in domains:
         scraper = SCRAPERS.get(domain)
-        
-        if scraper:
-            for furniture_type in furniture_types:
-                try:
-                    results = scraper(furniture_type, price_range)
-                    all_results.extend(results)
-                except Exception as e:
-                    logger.error(f"Scraping failed for {domain}: {e}")
-        else:
+        if not scraper:
             logger.warning(f"No scraper for {domain}")
+            continue
+        for furniture_type in furniture_types:
+            tasks.append((
+                domain,
+                build_scrape_call(scraper, http, furniture_type, price_range)
+            ))
+    
+    report = await run_scrapers(tasks, **engine_options)
+    
+    all_results = report["results"]
     
     # For testing: Return mock data if no results
-    if not all_results:
+    if not all_results and mock_fallback:
         logger.info("No scrapers implemented, returning mock data")
-        all_results = _get_mock_furniture(furniture_types, price_range)
+        all_results = get_mock_furniture(furniture_types, price_range)
     
     # Sort by price
     all_results.sort(key=lambda x: x.price)
-    return all_results[:10]
+    return all_results[:limit]
+
+
+def search_furniture(
+    theme: str, 
+    room_type: str, 
+    furniture_types: List[str], 
+    price_range: PriceRange
+) -> List[FurnitureItem]:
+    """Synchronous wrapper around search_furniture_async (scripts, shell)"""
+    return asyncio.run(
+        search_furniture_async(theme, room_type, furniture_types, price_range)
+    )
 
 
-def _get_mock_furniture(furniture_types: List[str], price_range: PriceRange) -> List[FurnitureItem]:
-    """Mock furniture data for testing"""
+def get_mock_furniture(furniture_types: List[str], price_range: PriceRange) -> List[FurnitureItem]:
+    """Mock furniture data for testing (priced at the middle of price_range)"""
     mock_data = []
     for furn_type in furniture_types:
         mock_data.append(FurnitureItem(
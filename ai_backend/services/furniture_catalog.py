@@ -0,0 +1,172 @@
+# ai_backend/services/furniture_catalog.py
+"""
+Furniture Dimension Catalog
+Compiled, read-only view of furniture_data.json
+
+The nested room -> type -> subtype JSON is flattened once at startup into
+immutable entries with stable ids and precomputed square footage. Lookups
+by id or by (room type, type, subtype) are single dict hits, and the
+dropdown payload is serialized once together with its ETag.
+"""
+
+import re
+import json
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_PATH = str(Path(__file__).resolve().parent.parent / "data" / "furniture_data.json")
+
+
+def _slug(text: str) -> str:
+    """'Sectional Sofa (L-Shape)' -> 'sectional-sofa-l-shape'"""
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """One furniture subtype with its standard dimensions (inches)"""
+    id: str
+    room_type: str
+    furniture_type: str
+    subtype: str
+    width: float
+    depth: float
+    height: Optional[float]
+    sqft: float  # footprint, square feet
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "subtype": self.subtype,
+            "width": self.width,
+            "depth": self.depth,
+            "height": self.height,
+            "sqft": self.sqft,
+        }
+
+
+class FurnitureCatalog:
+    """Immutable, id-indexed furniture dimension catalog"""
+
+    def __init__(self, data: dict):
+        """
+        Compile the catalog
+
+        Args:
+            data: Parsed furniture_data.json (room -> type -> subtype -> dims)
+        """
+        entries = []
+        for room_type, furniture_types in data.items():
+            for furniture_type, subtypes in furniture_types.items():
+                for subtype, dims in subtypes.items():
+                    width = float(dims["width"])
+                    depth = float(dims["depth"])
+                    height = dims.get("height")
+                    entries.append(CatalogEntry(
+                        id="/".join(_slug(part) for part in (room_type, furniture_type, subtype)),
+                        room_type=room_type,
+                        furniture_type=furniture_type,
+                        subtype=subtype,
+                        width=width,
+                        depth=depth,
+                        height=float(height) if height is not None else None,
+                        sqft=round(width * depth / 144, 4)  # 144 = 12*12
+                    ))
+        self.entries: Tuple[CatalogEntry, ...] = tuple(entries)
+
+        by_key: Dict[tuple, CatalogEntry] = {}
+        by_type: Dict[tuple, CatalogEntry] = {}
+        for entry in self.entries:
+            by_key[(entry.room_type, entry.furniture_type, entry.subtype)] = entry
+            by_type.setdefault((entry.furniture_type, entry.subtype), entry)
+        self._by_id = MappingProxyType({entry.id: entry for entry in self.entries})
+        self._by_key = MappingProxyType(by_key)
+        self._by_type = MappingProxyType(by_type)
+
+        rooms: Dict[str, Dict[str, List[dict]]] = {}
+        for entry in self.entries:
+            rooms.setdefault(entry.room_type, {}).setdefault(entry.furniture_type, []).append(entry.to_dict())
+        body = json.dumps({"rooms": rooms}, separators=(",", ":"), ensure_ascii=False)
+        self.payload: bytes = body.encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.payload).hexdigest()[:32]}"'
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, entry_id: str) -> Optional[CatalogEntry]:
+        return self._by_id.get(entry_id)
+
+    def lookup(self, furniture_type: str, subtype: str, room_type: Optional[str] = None) -> Optional[CatalogEntry]:
+        """Entry for (room type, type, subtype); any room when room_type is None"""
+        if room_type:
+            return self._by_key.get((room_type, furniture_type, subtype))
+        return self._by_type.get((furniture_type, subtype))
+
+    def furniture_types(self) -> List[str]:
+        return sorted({entry.furniture_type for entry in self.entries})
+
+    def room_types(self) -> List[str]:
+        return list(dict.fromkeys(entry.room_type for entry in self.entries))
+
+
+def load_catalog(path: str = DEFAULT_CATALOG_PATH) -> FurnitureCatalog:
+    """Read and compile a catalog file"""
+    with open(path, "r") as f:
+        catalog = FurnitureCatalog(json.load(f))
+    logger.info(f"Furniture catalog compiled: {len(catalog)} subtypes from {path}")
+    return catalog
+
+
+def resolve_selections(selections: Iterable, room_type: Optional[str] = None) -> list:
+    """
+    Fill in missing width/depth/height from the catalog
+
+    Args:
+        selections: FurnitureSelection (or subclass) items
+        room_type: Room the selection belongs to (narrows the lookup)
+
+    Returns:
+        New list of selections with dimensions set
+
+    Raises:
+        ValueError: If an item has no dimensions and is not in the catalog
+    """
+    catalog = get_furniture_catalog()
+    resolved = []
+    for selection in selections:
+        if selection.width is not None and selection.depth is not None:
+            resolved.append(selection)
+            continue
+        entry = catalog.lookup(selection.type, selection.subtype, room_type)
+        if entry is None:
+            raise ValueError(f"Unknown furniture: {selection.type} / {selection.subtype}")
+        resolved.append(selection.model_copy(update={
+            "width": selection.width if selection.width is not None else entry.width,
+            "depth": selection.depth if selection.depth is not None else entry.depth,
+            "height": selection.height if selection.height is not None else entry.height,
+        }))
+    return resolved
+
+
+# Global instance
+_furniture_catalog_instance: Optional[FurnitureCatalog] = None
+
+
+def init_furniture_catalog(path: str = DEFAULT_CATALOG_PATH) -> FurnitureCatalog:
+    """Initialize global furniture catalog instance"""
+    global _furniture_catalog_instance
+    _furniture_catalog_instance = load_catalog(path)
+    return _furniture_catalog_instance
+
+
+def get_furniture_catalog() -> FurnitureCatalog:
+    """Get global furniture catalog (compiled on first use)"""
+    if _furniture_catalog_instance is None:
+        return init_furniture_catalog()
+    return _furniture_catalog_instance
@@ -0,0 +1,416 @@
+# ai_backend/services/generation_cache.py
+"""
+Generation Result Cache
+Content-addressed cache of generated image URLs with in-flight de-duplication
+
+The cache key is a SHA-256 over everything that determines the SDXL output:
+image bytes, normalized prompt, theme, sorted furniture links, model version
+and inference parameters. Identical requests reuse the stored
+``generated/...`` URL; concurrent identical requests share one prediction.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tunables (env overridable)
+GENERATION_CACHE_BACKEND = os.getenv("GENERATION_CACHE_BACKEND", "local").lower()  # local | s3 | none
+GENERATION_CACHE_PATH = os.getenv("GENERATION_CACHE_PATH", "")  # local index file (empty = memory only)
+GENERATION_CACHE_TTL = int(os.getenv("GENERATION_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+GENERATION_CACHE_MAX_ENTRIES = int(os.getenv("GENERATION_CACHE_MAX_ENTRIES", "10000"))
+GENERATION_CACHE_S3_PREFIX = os.getenv("GENERATION_CACHE_S3_PREFIX", "cache/generation/")
+# Max wait on an in-flight twin (default: one prediction, see REPLICATE_PREDICTION_TIMEOUT)
+GENERATION_CACHE_WAIT_SECONDS = float(
+    os.getenv("GENERATION_CACHE_WAIT_SECONDS", os.getenv("REPLICATE_PREDICTION_TIMEOUT", "600"))
+)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase and collapse whitespace so trivial edits hit the cache"""
+    return " ".join(prompt.lower().split())
+
+
+def compute_cache_key(
+    image_hash: str,
+    prompt: str,
+    theme: str,
+    furniture_links: List[str],
+    model: Optional[str] = None,
+    params: Optional[dict] = None
+) -> str:
+    """
+    Build the content-addressed cache key for a generation request
+
+    Args:
+        image_hash: Room photo digest (SHA-256 hex of the bytes, or
+                    "s3:<etag>" for direct uploads)
+        prompt: User placement instructions
+        theme: Design theme
+        furniture_links: Furniture URLs (order does not matter)
+        model: Replicate model version (default: current SDXL model)
+        params: Inference parameters (default: current settings)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    from ai_backend.services.ai_generator import SDXL_MODEL, INFERENCE_PARAMS
+
+    material = {
+        "image": image_hash,
+        "prompt": normalize_prompt(prompt),
+        "theme": theme.strip().upper(),
+        "links": sorted(link.strip() for link in furniture_links if link.strip()),
+        "model": model or SDXL_MODEL,
+        "params": params if params is not None else INFERENCE_PARAMS,
+    }
+    canonical = json.dumps(material, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LocalCacheIndex:
+    """
+    In-process LRU index, optionally persisted to a journal file
+
+    Entries beyond max_entries are evicted least-recently-used first. Each
+    put/delete appends one ``[key, entry]`` line (entry null for deletes);
+    the journal is compacted into a snapshot once it holds more than
+    twice the live entries.
+    """
+
+    # Journal lines always allowed before compacting
+    MIN_COMPACT_LINES = 1000
+
+    def __init__(self, path: str = "", max_entries: int = GENERATION_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._journal_lines = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: dict):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._append(key, entry)
+
+    def delete(self, key: str):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._append(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                text = f.read()
+            if text.startswith("{"):
+                # Older single-object snapshot
+                self._entries = OrderedDict(json.loads(text))
+            else:
+                for line in text.splitlines():
+                    try:
+                        key, entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line
+                    self._journal_lines += 1
+                    if entry is None:
+                        self._entries.pop(key, None)
+                    else:
+                        self._entries[key] = entry
+                        self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            logger.info(f"Loaded {len(self._entries)} cached generations from {self.path}")
+        except Exception as e:
+            logger.warning(f"⚠️  Could not load generation cache index: {e}")
+
+    def _append(self, key: str, entry: Optional[dict]):
+        """Append one journal line, compacting when it grows (lock held)"""
+        if not self.path:
+            return
+        if self._journal_lines >= max(self.MIN_COMPACT_LINES, 2 * len(self._entries)):
+            self._compact()
+            return
+        try:
+            with open(self.path, "a") as f:
+                f.write(json.dumps([key, entry]) + "\n")
+            self._journal_lines += 1
+        except Exception as e:
+            logger.warning(f"⚠️  Could not persist generation cache index: {e}")
+
+    def _compact(self):
+        """Atomically rewrite the journal with one line per live entry (lock held)"""
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                for key, entry in self._entries.items():
+                    f.write(json.dumps([key, entry]) + "\n")
+            os.replace(tmp_path, self.path)
+            self._journal_lines = len(self._entries)
+        except Exception as e:
+            logger.warning(f"⚠️  Could not persist generation cache index: {e}")
+
+
+class S3CacheIndex:
+    """
+    Index stored as one small JSON object per key in S3
+
+    Shared by every worker and pod; eviction is TTL-based (expired entries
+    are deleted on read, a bucket lifecycle rule can sweep the rest).
+    """
+
+    def __init__(self, prefix: str = GENERATION_CACHE_S3_PREFIX):
+        self.prefix = prefix
+
+    def _object_name(self, key: str) -> str:
+        return f"{self.prefix}{key}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        from ai_backend.services.aws_service import get_aws_service
+        body = get_aws_service().get_object_bytes(self._object_name(key))
+        if body is None:
+            return None
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    def put(self, key: str, entry: dict):
+        from ai_backend.services.aws_service import get_aws_service
+        get_aws_service().put_object(
+            self._object_name(key),
+            json.dumps(entry).encode("utf-8"),
+            content_type="application/json"
+        )
+
+    def delete(self, key: str):
+        from ai_backend.services.aws_service import get_aws_service
+        get_aws_service().delete_file(self._object_name(key))
+
+
+class GenerationCache:
+    """
+    Result cache with singleflight de-duplication
+
+    ``get_or_compute`` returns a cached URL when present; otherwise the
+    first caller runs the generation and every concurrent caller with the
+    same key waits for (and shares) that single result. Waiting callers
+    hold their worker-pool thread, so the wait is capped at wait_seconds;
+    endpoints avoid it altogether by handing identical requests the job
+    already producing the key (``track_job`` / ``join_inflight``).
+    """
+
+    def __init__(
+        self,
+        index=None,
+        ttl_seconds: int = GENERATION_CACHE_TTL,
+        wait_seconds: float = GENERATION_CACHE_WAIT_SECONDS
+    ):
+        """
+        Initialize generation cache
+
+        Args:
+            index: LocalCacheIndex / S3CacheIndex (None disables caching,
+                   but keeps in-flight de-duplication)
+            ttl_seconds: Entry lifetime (0 = never expire)
+            wait_seconds: Longest a caller waits on an identical in-flight
+                          generation before giving up
+        """
+        self.index = index
+        self.ttl_seconds = ttl_seconds
+        self.wait_seconds = wait_seconds
+        self._inflight: dict = {}
+        self._jobs: dict = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached URL for key, or None (expired entries are dropped)"""
+        if self.index is None:
+            return None
+        try:
+            entry = self.index.get(key)
+        except Exception as e:
+            logger.warning(f"⚠️  Generation cache lookup failed: {e}")
+            return None
+
+        if entry is None:
+            return None
+
+        if self.ttl_seconds and time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            try:
+                self.index.delete(key)
+            except Exception:
+                pass
+            return None
+
+        return entry.get("url")
+
+    def put(self, key: str, url: str):
+        if self.index is None:
+            return
+        try:
+            self.index.put(key, {"url": url, "created_at": time.time()})
+        except Exception as e:
+            logger.warning(f"⚠️  Generation cache store failed: {e}")
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Cache lookup that updates hit/miss counters"""
+        url = self.get(key)
+        with self._lock:
+            if url:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return url
+
+    def get_or_compute(self, key: str, compute: Callable[[], str], counted: bool = False) -> Tuple[str, bool]:
+        """
+        Return (url, cached) for key, running compute at most once at a time
+
+        Args:
+            key: Cache key
+            compute: Produces the URL on a miss
+            counted: The caller already did a counted ``lookup`` for this
+                     request (hit/miss counters are left alone)
+
+        Returns:
+            Tuple of generated image URL and whether it came from the cache
+            or another in-flight request
+
+        Raises:
+            TimeoutError: If an identical in-flight generation does not
+                          finish within wait_seconds
+        """
+        url = self.get(key) if counted else self.lookup(key)
+        if url:
+            logger.info(f"♻️  Generation cache hit: {key[:12]}")
+            return url, True
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.shared += 1
+
+        if not leader:
+            logger.info(f"♻️  Joining in-flight generation: {key[:12]}")
+            try:
+                return future.result(timeout=self.wait_seconds), True
+            except FutureTimeoutError:
+                raise TimeoutError(f"In-flight generation {key[:12]} did not finish in {self.wait_seconds:.0f}s")
+
+        try:
+            # A previous leader may have finished between lookup and lock
+            url = self.get(key)
+            if url:
+                future.set_result(url)
+                return url, True
+            url = compute()
+            self.put(key, url)
+            future.set_result(url)
+            return url, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def track_job(self, key: str, job):
+        """Remember the queued job producing key until it finishes"""
+        with self._lock:
+            self._jobs[key] = job
+
+        def untrack(done):
+            with self._lock:
+                if self._jobs.get(key) is done:
+                    del self._jobs[key]
+
+        job.add_done_callback(untrack)
+
+    def join_inflight(self, key: str):
+        """Unfinished job already producing key, or None (counted as shared)"""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.finished:
+                return None
+            self.shared += 1
+            return job
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": type(self.index).__name__ if self.index is not None else "none",
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared_inflight": self.shared,
+                "inflight": len(self._inflight),
+                "tracked_jobs": len(self._jobs),
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+# Global instance
+_generation_cache_instance: Optional[GenerationCache] = None
+
+
+def init_generation_cache(
+    backend: str = GENERATION_CACHE_BACKEND,
+    ttl_seconds: int = GENERATION_CACHE_TTL,
+    max_entries: int = GENERATION_CACHE_MAX_ENTRIES,
+    path: str = GENERATION_CACHE_PATH
+) -> GenerationCache:
+    """Initialize global generation cache instance"""
+    global _generation_cache_instance
+
+    if backend == "s3":
+        index = S3CacheIndex()
+    elif backend == "none":
+        index = None
+    else:
+        index = LocalCacheIndex(path, max_entries)
+
+    _generation_cache_instance = GenerationCache(index, ttl_seconds)
+    logger.info(f"Generation cache initialized (backend: {backend}, ttl: {ttl_seconds}s)")
+    return _generation_cache_instance
+
+
+def get_generation_cache() -> GenerationCache:
+    """Get global generation cache (created with defaults on first use)"""
+    if _generation_cache_instance is None:
+        return init_generation_cache()
+    return _generation_cache_instance
+
+
+def reset_generation_cache():
+    """Reset global generation cache instance (for testing)"""
+    global _generation_cache_instance
+    _generation_cache_instance = None
@@ -0,0 +1,329 @@
+# ai_backend/services/http_client.py
+"""
+Shared Outbound HTTP Clients
+One application-lifetime client manager for every outbound call made by
+the services layer (scrapers, image downloads).
+
+Provides keep-alive connection pools, per-host connection caps, retries
+with jittered exponential backoff, timeouts, and usage counters.
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from ai_backend.services.metrics import record_error, record_retry
+from ai_backend.services.registry import lazy_import
+
+# Loaded when the first client is built (keeps app import cheap)
+httpx = lazy_import("httpx")
+requests = lazy_import("requests")
+
+logger = logging.getLogger(__name__)
+
+# Tunables (env overridable)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "10"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_BASE_SECONDS = float(os.getenv("HTTP_BACKOFF_BASE_SECONDS", "0.5"))
+HTTP_BACKOFF_MAX_SECONDS = float(os.getenv("HTTP_BACKOFF_MAX_SECONDS", "8"))
+
+USER_AGENT = "Mozilla/5.0 (compatible; RoomDesignerBot/1.0)"
+
+# Responses worth retrying (rate limits and transient upstream errors)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+class HTTPClientManager:
+    """
+    Pooled async (httpx) and sync (requests) clients
+
+    The async client serves the scrapers running on the event loop; the
+    sync session serves blocking code on worker threads (generation jobs).
+    Both cap connections per host and share the same retry policy.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        per_host_limit: int = HTTP_PER_HOST_LIMIT,
+        timeout: float = HTTP_TIMEOUT_SECONDS,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT_SECONDS,
+        max_retries: int = HTTP_MAX_RETRIES,
+        backoff_base: float = HTTP_BACKOFF_BASE_SECONDS,
+        backoff_max: float = HTTP_BACKOFF_MAX_SECONDS,
+        transport: Optional["httpx.AsyncBaseTransport"] = None
+    ):
+        """
+        Initialize client manager
+
+        Args:
+            max_connections: Total pooled connections (async client)
+            per_host_limit: Concurrent connections per host
+            timeout: Default read/write timeout in seconds
+            connect_timeout: Connect timeout in seconds
+            max_retries: Retries after the first attempt
+            backoff_base: First backoff step in seconds
+            backoff_max: Backoff ceiling in seconds
+            transport: Custom async transport (tests, proxies)
+        """
+        self.max_connections = max_connections
+        self.per_host_limit = per_host_limit
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.sync_timeout = (connect_timeout, timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._transport = transport
+
+        self._async_client: Optional["httpx.AsyncClient"] = None
+        self._async_loop = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        # Sync session: one urllib3 pool per host, blocking when full
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=max(1, max_connections // per_host_limit),
+            pool_maxsize=per_host_limit,
+            pool_block=True
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._adapters = [adapter]
+
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+        self._in_flight: Dict[str, int] = defaultdict(int)
+
+        logger.info(
+            f"HTTP clients initialized ({max_connections} connections, "
+            f"{per_host_limit} per host, {max_retries} retries)"
+        )
+
+    # -------------------------------------------------------------
+    # Async client
+    # -------------------------------------------------------------
+
+    @property
+    def async_client(self) -> "httpx.AsyncClient":
+        """Pooled httpx client bound to the current event loop"""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            if self._async_client is not None:
+                logger.warning("HTTP client used from a new event loop, creating a new pool")
+            self._async_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={"User-Agent": USER_AGENT},
+                transport=self._transport
+            )
+            self._async_loop = loop
+            self._host_semaphores = {}
+        return self._async_client
+
+    async def request(self, method: str, url: str, **kwargs) -> "httpx.Response":
+        """
+        Async request with per-host cap and jittered retries
+
+        Raises:
+            httpx.HTTPError: When the last attempt fails
+        """
+        client = self.async_client
+        host = _host(url)
+        semaphore = self._host_semaphores.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        extensions = {**kwargs.pop("extensions", {}), "trace": self._trace}
+
+        attempt = 0
+        while True:
+            async with semaphore:
+                self._start(host)
+                try:
+                    response = await client.request(method, url, extensions=extensions, **kwargs)
+                except httpx.TransportError as e:
+                    if attempt >= self.max_retries:
+                        self._count("errors")
+                        record_error("http")
+                        raise
+                    logger.warning(f"HTTP {method} {host} failed ({e!r}), retrying")
+                    response = None
+                finally:
+                    self._finish(host)
+
+            if response is not None and (
+                response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries
+            ):
+                return response
+
+            if response is not None:
+                await response.aclose()
+            attempt += 1
+            self._count("retries")
+            record_retry("http")
+            await asyncio.sleep(self._backoff(attempt, response))
+
+    async def get(self, url: str, **kwargs) -> "httpx.Response":
+        return await self.request("GET", url, **kwargs)
+
+    async def _trace(self, event_name: str, info: dict):
+        # A TCP connect during a request means the pool had nothing to reuse
+        if event_name == "connection.connect_tcp.complete":
+            self._count("async_connections_opened")
+
+    # -------------------------------------------------------------
+    # Sync session
+    # -------------------------------------------------------------
+
+    def request_sync(self, method: str, url: str, **kwargs) -> "requests.Response":
+        """
+        Blocking request with jittered retries (for worker threads)
+
+        Raises:
+            requests.RequestException: When the last attempt fails
+        """
+        kwargs.setdefault("timeout", self.sync_timeout)
+        host = _host(url)
+
+        attempt = 0
+        while True:
+            self._start(host)
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    self._count("errors")
+                    record_error("http")
+                    raise
+                logger.warning(f"HTTP {method} {host} failed ({e!r}), retrying")
+                response = None
+            finally:
+                self._finish(host)
+
+            if response is not None and (
+                response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries
+            ):
+                return response
+
+            if response is not None:
+                response.close()
+            attempt += 1
+            self._count("retries")
+            record_retry("http")
+            time.sleep(self._backoff(attempt, response))
+
+    def get_sync(self, url: str, **kwargs) -> "requests.Response":
+        return self.request_sync("GET", url, **kwargs)
+
+    # -------------------------------------------------------------
+    # Helpers / stats
+    # -------------------------------------------------------------
+
+    def _backoff(self, attempt: int, response=None) -> float:
+        """Full-jitter exponential backoff, honoring numeric Retry-After"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def _start(self, host: str):
+        with self._lock:
+            self._counters["requests"] += 1
+            self._in_flight[host] += 1
+
+    def _finish(self, host: str):
+        with self._lock:
+            self._in_flight[host] -= 1
+            if not self._in_flight[host]:
+                del self._in_flight[host]
+
+    def stats(self) -> dict:
+        """Request, retry, pool usage and connection reuse counters"""
+        sync_connections = 0
+        sync_requests = 0
+        for adapter in self._adapters:
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    sync_connections += pool.num_connections
+                    sync_requests += pool.num_requests
+
+        with self._lock:
+            counters = dict(self._counters)
+            in_flight = dict(self._in_flight)
+
+        async_opened = counters.get("async_connections_opened", 0)
+        requests_total = counters.get("requests", 0)
+        opened = async_opened + sync_connections
+        return {
+            "requests": requests_total,
+            "retries": counters.get("retries", 0),
+            "errors": counters.get("errors", 0),
+            "in_flight": sum(in_flight.values()),
+            "in_flight_by_host": in_flight,
+            "connections_opened": opened,
+            "connections_reused": max(requests_total - opened, 0),
+            "sync_pool_requests": sync_requests,
+            "max_connections": self.max_connections,
+            "per_host_limit": self.per_host_limit,
+        }
+
+    async def close(self):
+        """Close pooled connections"""
+        if self._async_client is not None:
+            try:
+                await self._async_client.aclose()
+            except RuntimeError:
+                # Pool belonged to an event loop that is already closed
+                pass
+            self._async_client = None
+        self.session.close()
+        logger.info("HTTP clients closed")
+
+
+# Global instance
+_http_client_instance: Optional[HTTPClientManager] = None
+
+
+def init_http_clients(**options) -> HTTPClientManager:
+    """Initialize global HTTP client manager"""
+    global _http_client_instance
+    _http_client_instance = HTTPClientManager(**options)
+    return _http_client_instance
+
+
+def get_http_client() -> HTTPClientManager:
+    """Get global HTTP client manager (created with defaults on first use)"""
+    if _http_client_instance is None:
+        return init_http_clients()
+    return _http_client_instance
+
+
+async def close_http_clients():
+    """Close and reset the global HTTP client manager"""
+    global _http_client_instance
+    if _http_client_instance is not None:
+        await _http_client_instance.close()
+        _http_client_instance = None
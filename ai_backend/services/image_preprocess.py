@@ -0,0 +1,323 @@
+# ai_backend/services/image_preprocess.py
+"""
+Room Photo Preprocessing
+Normalizes uploads before they are sent to the model
+
+Phone photos arrive as multi-megapixel JPEG/PNG/WebP files with EXIF
+rotation. Each upload is sniffed from its magic bytes, decoded at reduced
+scale (JPEG draft mode), rotated upright, downscaled to the model's
+native resolution and re-encoded as JPEG at a fixed quality. Decoding is
+CPU-bound, so it runs in a process pool.
+
+The same pool renders the downscaled WebP / progressive JPEG derivatives
+of generated images (gallery thumbnails, mobile previews).
+"""
+
+import io
+import os
+import re
+import time
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Tunables (env overridable)
+IMAGE_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", "1024"))  # SDXL native resolution
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "90"))
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(80_000_000)))  # decompression-bomb guard
+IMAGE_PREPROCESS_WORKERS = int(os.getenv("IMAGE_PREPROCESS_WORKERS", "2"))  # 0 = run inline
+
+# Derivatives of generated images (longest side in pixels, encoder quality)
+IMAGE_DERIVATIVE_SIZES = tuple(
+    int(size) for size in os.getenv("IMAGE_DERIVATIVE_SIZES", "1024,640,320").split(",") if size.strip()
+)
+IMAGE_DERIVATIVE_WEBP_QUALITY = int(os.getenv("IMAGE_DERIVATIVE_WEBP_QUALITY", "80"))
+IMAGE_DERIVATIVE_JPEG_QUALITY = int(os.getenv("IMAGE_DERIVATIVE_JPEG_QUALITY", "82"))
+
+# Magic bytes -> format (only formats the pipeline accepts)
+SIGNATURES = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+)
+
+
+def sniff_image_format(data: bytes) -> Optional[str]:
+    """Real image format from the file header ("JPEG", "PNG", "WEBP") or None"""
+    for signature, image_format in SIGNATURES:
+        if data.startswith(signature):
+            return image_format
+    if len(data) >= 12 and data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "WEBP"
+    return None
+
+
+def _flatten_to_rgb(image: Image.Image) -> Image.Image:
+    """RGB copy with any transparency composited onto white"""
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    if image.mode != "RGB":
+        return image.convert("RGB")
+    return image
+
+
+def preprocess_image(
+    data: bytes,
+    max_side: int = IMAGE_MAX_SIDE,
+    quality: int = IMAGE_JPEG_QUALITY
+) -> Tuple[bytes, dict]:
+    """
+    Decode, orient, downscale and re-encode a room photo
+
+    Runs in worker processes, so it only takes and returns plain data.
+
+    Args:
+        data: Uploaded file bytes
+        max_side: Longest side of the output in pixels
+        quality: JPEG quality of the output
+
+    Returns:
+        Tuple of JPEG bytes and info (source format/size, output size)
+
+    Raises:
+        ValueError: If the bytes are not a supported or decodable image
+    """
+    source_format = sniff_image_format(data)
+    if source_format is None:
+        raise ValueError("Unsupported image format. Please upload a JPEG, PNG or WebP photo")
+
+    Image.MAX_IMAGE_PIXELS = IMAGE_MAX_PIXELS
+    try:
+        image = Image.open(io.BytesIO(data))
+        source_size = image.size
+        if source_format == "JPEG":
+            # Let libjpeg decode at 1/2, 1/4 or 1/8 scale when the photo is large
+            image.draft("RGB", (max_side, max_side))
+        image = _flatten_to_rgb(ImageOps.exif_transpose(image))
+
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=quality)
+    except (Image.DecompressionBombError, OSError, SyntaxError) as e:
+        raise ValueError(f"Could not decode image: {e}")
+
+    body = output.getvalue()
+    return body, {
+        "source_format": source_format,
+        "source_size": list(source_size),
+        "size": list(image.size),
+        "bytes_in": len(data),
+        "bytes_out": len(body),
+    }
+
+
+def derivative_specs(
+    sizes: Tuple[int, ...] = IMAGE_DERIVATIVE_SIZES,
+    webp_quality: int = IMAGE_DERIVATIVE_WEBP_QUALITY,
+    jpeg_quality: int = IMAGE_DERIVATIVE_JPEG_QUALITY
+) -> List[dict]:
+    """
+    Derivative variants, smallest first
+    
+    The name encodes size and quality, so changing a setting produces new
+    object keys instead of overwriting immutable ones.
+    """
+    specs = []
+    for size in sorted(set(sizes)):
+        specs.append(_derivative_spec(size, "webp", webp_quality))
+        specs.append(_derivative_spec(size, "jpeg", jpeg_quality))
+    return specs
+
+
+# format -> (file extension, content type)
+DERIVATIVE_FORMATS = {"webp": ("webp", "image/webp"), "jpeg": ("jpg", "image/jpeg")}
+
+_DERIVATIVE_NAME = re.compile(r"^w(\d+)-q(\d+)\.(webp|jpg)$")
+
+
+def _derivative_spec(size: int, image_format: str, quality: int) -> dict:
+    extension, content_type = DERIVATIVE_FORMATS[image_format]
+    return {
+        "name": f"w{size}-q{quality}.{extension}", "max_side": size, "format": image_format,
+        "content_type": content_type, "quality": quality,
+    }
+
+
+def parse_derivative_name(name: str) -> Optional[dict]:
+    """Spec of a stored derivative from its name ("w640-q80.webp"), None if unknown"""
+    match = _DERIVATIVE_NAME.match(name)
+    if match is None:
+        return None
+    image_format = "webp" if match.group(3) == "webp" else "jpeg"
+    return _derivative_spec(int(match.group(1)), image_format, int(match.group(2)))
+
+
+def render_derivatives(data: bytes, specs: List[dict]) -> List[Tuple[str, bytes]]:
+    """
+    Encode every derivative of an image (runs in worker processes)
+    
+    Sizes are produced largest first, each one downscaled from the
+    previous, so the full-size image is only resampled once. Images are
+    never upscaled.
+    
+    Returns:
+        List of (spec name, encoded bytes)
+    
+    Raises:
+        ValueError: If the bytes are not a decodable image
+    """
+    Image.MAX_IMAGE_PIXELS = IMAGE_MAX_PIXELS
+    try:
+        current = _flatten_to_rgb(ImageOps.exif_transpose(Image.open(io.BytesIO(data))))
+        rendered = []
+        for spec in sorted(specs, key=lambda spec: -spec["max_side"]):
+            if max(current.size) > spec["max_side"]:
+                current = current.copy()
+                current.thumbnail((spec["max_side"], spec["max_side"]), Image.LANCZOS)
+            output = io.BytesIO()
+            if spec["format"] == "webp":
+                current.save(output, format="WEBP", quality=spec["quality"], method=4)
+            else:
+                current.save(output, format="JPEG", quality=spec["quality"], progressive=True, optimize=True)
+            rendered.append((spec["name"], output.getvalue()))
+    except (Image.DecompressionBombError, OSError, SyntaxError) as e:
+        raise ValueError(f"Could not decode image: {e}")
+    return rendered
+
+
+class ImagePreprocessor:
+    """Process pool front-end for preprocess_image with usage counters"""
+
+    def __init__(self, workers: int = IMAGE_PREPROCESS_WORKERS):
+        """
+        Initialize preprocessor
+
+        Args:
+            workers: Worker processes (0 runs inline in the calling thread)
+        """
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._counters = {"images": 0, "failed": 0, "bytes_in": 0, "bytes_out": 0, "seconds": 0.0, "derivatives": 0}
+
+    @property
+    def pool(self) -> Optional[ProcessPoolExecutor]:
+        """Worker pool, started on first use (spawned, so it never forks app threads)"""
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def _record(self, started: float, info: Optional[dict]):
+        with self._lock:
+            self._counters["seconds"] += time.perf_counter() - started
+            if info is None:
+                self._counters["failed"] += 1
+                return
+            self._counters["images"] += 1
+            self._counters["bytes_in"] += info["bytes_in"]
+            self._counters["bytes_out"] += info["bytes_out"]
+
+    def preprocess(self, data: bytes) -> Tuple[bytes, dict]:
+        """Blocking preprocess (for worker threads)"""
+        started = time.perf_counter()
+        try:
+            pool = self.pool
+            if pool is None:
+                body, info = preprocess_image(data)
+            else:
+                body, info = pool.submit(preprocess_image, data).result()
+        except Exception:
+            self._record(started, None)
+            raise
+        self._record(started, info)
+        return body, info
+
+    async def preprocess_async(self, data: bytes) -> Tuple[bytes, dict]:
+        """Non-blocking preprocess (for the event loop)"""
+        pool = self.pool
+        if pool is None:
+            return await asyncio.to_thread(self.preprocess, data)
+        started = time.perf_counter()
+        try:
+            body, info = await asyncio.get_running_loop().run_in_executor(pool, preprocess_image, data)
+        except Exception:
+            self._record(started, None)
+            raise
+        self._record(started, info)
+        return body, info
+
+    def render_derivatives(self, data: bytes, specs: Optional[List[dict]] = None) -> List[Tuple[str, bytes]]:
+        """Blocking derivative rendering on the pool (for worker threads)"""
+        specs = specs if specs is not None else derivative_specs()
+        pool = self.pool
+        if pool is None:
+            rendered = render_derivatives(data, specs)
+        else:
+            rendered = pool.submit(render_derivatives, data, specs).result()
+        with self._lock:
+            self._counters["derivatives"] += len(rendered)
+        return rendered
+
+    def start(self):
+        """Spawn the worker processes now instead of on the first image"""
+        pool = self.pool
+        if pool is not None:
+            for future in [pool.submit(sniff_image_format, b"") for _ in range(self.workers)]:
+                future.result()
+        return self
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        counters["seconds"] = round(counters["seconds"], 3)
+        counters["workers"] = self.workers
+        return counters
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+# Global instance
+_preprocessor_instance: Optional[ImagePreprocessor] = None
+
+
+def init_image_preprocessor(workers: int = IMAGE_PREPROCESS_WORKERS) -> ImagePreprocessor:
+    """Initialize global image preprocessor"""
+    global _preprocessor_instance
+    _preprocessor_instance = ImagePreprocessor(workers)
+    logger.info(f"Image preprocessor initialized ({workers} worker processes)")
+    return _preprocessor_instance
+
+
+def get_image_preprocessor() -> ImagePreprocessor:
+    """Get global image preprocessor (created with defaults on first use)"""
+    if _preprocessor_instance is None:
+        return init_image_preprocessor()
+    return _preprocessor_instance
+
+
+def shutdown_image_preprocessor():
+    """Stop worker processes and reset the global instance"""
+    global _preprocessor_instance
+    if _preprocessor_instance is not None:
+        _preprocessor_instance.shutdown()
+        _preprocessor_instance = None
@@ -0,0 +1,314 @@
+# ai_backend/services/jobs.py
+"""
+Background Job Manager
+Runs long blocking pipelines (Replicate -> download -> S3) on a bounded
+worker pool so request handlers can return a job id immediately.
+
+Every job keeps a short, numbered event log (status and stage changes,
+model progress) that listeners such as the SSE endpoint can follow.
+"""
+
+import os
+import uuid
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+FINISHED_STATES = (COMPLETED, FAILED)
+
+# Tunables (env overridable)
+GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", "4"))
+GENERATION_MAX_PENDING = int(os.getenv("GENERATION_MAX_PENDING", "500"))
+GENERATION_JOB_HISTORY = int(os.getenv("GENERATION_JOB_HISTORY", "1000"))
+JOB_EVENT_HISTORY = int(os.getenv("JOB_EVENT_HISTORY", "200"))  # events kept per job
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has reached its pending limit"""
+
+
+class Job:
+    """Single unit of background work and its current status"""
+
+    def __init__(self, job_id: str, kind: str, metadata: Optional[dict] = None):
+        self.id = job_id
+        self.kind = kind
+        self.status = QUEUED
+        self.stage = QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.metadata = metadata or {}
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+        self._callbacks: List[Callable[["Job"], None]] = []
+        self._callbacks_lock = threading.Lock()
+        self._events: deque = deque(maxlen=JOB_EVENT_HISTORY)
+        self._event_seq = 0
+        self._listeners: List[Callable[[dict], None]] = []
+        self.emit("status")
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def finished_seconds(self) -> float:
+        """Seconds spent running (so far, if still running)"""
+        end = self.finished_at or time.time()
+        return end - (self.started_at or self.created_at)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finishes (mostly for tests and scripts)"""
+        return self._done.wait(timeout)
+
+    def add_done_callback(self, callback: Callable[["Job"], None]):
+        """
+        Call callback(job) once the job finishes (from the worker thread,
+        or right away if it already has)
+        """
+        with self._callbacks_lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def emit(self, event: str, **data) -> dict:
+        """
+        Append an event to the job's log and notify listeners
+
+        Every event carries the current status and stage plus data.
+        Listeners are called from the emitting thread.
+        """
+        with self._callbacks_lock:
+            self._event_seq += 1
+            record = {
+                "id": self._event_seq,
+                "event": event,
+                "data": {"status": self.status, "stage": self.stage, **data},
+                "time": time.time(),
+            }
+            self._events.append(record)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(record)
+            except Exception as e:
+                logger.warning(f"⚠️  Job listener failed for {self.id}: {e}")
+        return record
+
+    def events_since(self, last_id: int = 0) -> List[dict]:
+        """Events with an id greater than last_id (oldest may have been dropped)"""
+        with self._callbacks_lock:
+            return [record for record in self._events if record["id"] > last_id]
+
+    def subscribe(self, listener: Callable[[dict], None]):
+        """Call listener(event) for every event emitted from now on"""
+        with self._callbacks_lock:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[dict], None]):
+        with self._callbacks_lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _mark_done(self):
+        with self._callbacks_lock:
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                logger.warning(f"⚠️  Job callback failed for {self.id}: {e}")
+
+    def to_dict(self) -> dict:
+        """Public status representation"""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "metadata": self.metadata,
+        }
+
+
+class JobManager:
+    """
+    Bounded background worker pool
+
+    Jobs are executed on a fixed-size thread pool, so blocking SDK calls
+    (replicate, requests, boto3) never run on the event loop. The number of
+    pending jobs is capped; finished jobs are kept in a bounded history.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = GENERATION_WORKERS,
+        max_pending: int = GENERATION_MAX_PENDING,
+        history_size: int = GENERATION_JOB_HISTORY
+    ):
+        """
+        Initialize job manager
+
+        Args:
+            max_workers: Number of jobs executed concurrently
+            max_pending: Maximum queued + running jobs before rejecting
+            history_size: Number of finished jobs kept for status lookups
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.history_size = history_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="generation-worker"
+        )
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        logger.info(f"Job manager started ({max_workers} workers, {max_pending} max pending)")
+
+    def submit(
+        self,
+        kind: str,
+        func: Callable[..., Any],
+        *args,
+        metadata: Optional[dict] = None,
+        **kwargs
+    ) -> Job:
+        """
+        Enqueue a job
+
+        The callable receives the Job as its first argument so it can
+        report stage transitions via ``set_stage``.
+
+        Raises:
+            QueueFullError: If too many jobs are pending
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError(
+                    f"Too many pending jobs ({self._pending}/{self.max_pending})"
+                )
+            job = Job(str(uuid.uuid4()), kind, metadata)
+            self._jobs[job.id] = job
+            self._pending += 1
+            self._trim_history()
+
+        self._executor.submit(self._run, job, func, args, kwargs)
+        logger.info(f"Job queued: {job.id} ({kind})")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def set_stage(self, job: Job, stage: str, **detail):
+        """Record the pipeline stage a running job is in (emits a stage event)"""
+        job.stage = stage
+        job.emit("stage", **detail)
+        logger.info(f"Job {job.id}: {stage}")
+
+    def stats(self) -> dict:
+        """Pool usage counters"""
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job.status == RUNNING)
+            return {
+                "workers": self.max_workers,
+                "pending": self._pending,
+                "running": running,
+                "queued": self._pending - running,
+                "max_pending": self.max_pending,
+                "tracked": len(self._jobs),
+            }
+
+    def list_jobs(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting work and release worker threads"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        logger.info("Job manager stopped")
+
+    def _run(self, job: Job, func: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]):
+        job.status = RUNNING
+        job.stage = RUNNING
+        job.started_at = time.time()
+        job.emit("status")
+        try:
+            job.result = func(job, *args, **kwargs)
+            job.finished_at = time.time()
+            job.status = job.stage = COMPLETED
+            job.emit("status", result=job.result)
+            logger.info(f"✅ Job completed: {job.id} ({job.finished_seconds():.1f}s)")
+        except Exception as e:
+            job.error = str(e)
+            job.finished_at = time.time()
+            job.status = job.stage = FAILED
+            job.emit("status", error=job.error)
+            logger.error(f"❌ Job failed: {job.id}: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+            job._mark_done()
+
+    def _trim_history(self):
+        """Drop the oldest finished jobs beyond history_size (lock held)"""
+        excess = len(self._jobs) - self.history_size
+        if excess <= 0:
+            return
+        for job_id in list(self._jobs.keys()):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].finished:
+                del self._jobs[job_id]
+                excess -= 1
+
+
+# Global instance
+_job_manager_instance: Optional[JobManager] = None
+
+
+def init_job_manager(
+    max_workers: int = GENERATION_WORKERS,
+    max_pending: int = GENERATION_MAX_PENDING
+) -> JobManager:
+    """Initialize global job manager instance"""
+    global _job_manager_instance
+    if _job_manager_instance is not None:
+        _job_manager_instance.shutdown()
+    _job_manager_instance = JobManager(max_workers, max_pending)
+    return _job_manager_instance
+
+
+def get_job_manager() -> JobManager:
+    """Get global job manager (created with defaults on first use)"""
+    if _job_manager_instance is None:
+        return init_job_manager()
+    return _job_manager_instance
+
+
+def shutdown_job_manager():
+    """Shutdown and reset the global job manager"""
+    global _job_manager_instance
+    if _job_manager_instance is not None:
+        _job_manager_instance.shutdown()
+        _job_manager_instance = None
@@ -0,0 +1,180 @@
+# ai_backend/services/metrics.py
+"""
+Metrics
+Prometheus histograms/counters/gauges and per-request Server-Timing
+
+Pipelines time their stages with ``stage_timer``. Every measurement
+feeds a histogram and, when it runs on behalf of an HTTP request (also
+from threadpool code, via contextvars), that response's Server-Timing
+header. Pool gauges are read from each service's own stats() at scrape
+time, so nothing has to keep them in sync.
+"""
+
+import re
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "room_designer"
+
+# Seconds; spans sub-millisecond fit checks up to multi-minute predictions
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80, 160, 320)
+
+STAGE_SECONDS = Histogram(
+    "stage_seconds", "Time spent in each pipeline stage",
+    ["pipeline", "stage"], namespace=NAMESPACE, buckets=STAGE_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "http_request_seconds", "HTTP request latency by route",
+    ["method", "route", "status"], namespace=NAMESPACE, buckets=STAGE_BUCKETS
+)
+ERRORS = Counter("errors", "Errors by downstream service", ["service"], namespace=NAMESPACE)
+RETRIES = Counter("retries", "Retried calls by downstream service", ["service"], namespace=NAMESPACE)
+
+# Stages measured for the current request: list of (name, seconds)
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+
+# -------------------------------------------------------------
+# Recording
+# -------------------------------------------------------------
+
+def observe_stage(pipeline: str, stage: str, seconds: float):
+    """Record a stage duration (histogram + current request's Server-Timing)"""
+    STAGE_SECONDS.labels(pipeline, stage).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+@contextmanager
+def stage_timer(pipeline: str, stage: str):
+    """Time the enclosed block as one pipeline stage (recorded on error too)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(pipeline, stage, time.perf_counter() - started)
+
+
+def record_error(service: str):
+    ERRORS.labels(service).inc()
+
+
+def record_retry(service: str):
+    RETRIES.labels(service).inc()
+
+
+# -------------------------------------------------------------
+# Pool gauges
+# -------------------------------------------------------------
+
+class _StatsCollector:
+    """Exports numeric fields of registered stats() sources as gauges"""
+
+    def __init__(self):
+        self.sources: Dict[str, Callable[[], dict]] = {}
+
+    def collect(self):
+        for name, source in list(self.sources.items()):
+            try:
+                stats = source()
+            except Exception as e:
+                logger.warning(f"⚠️  Metrics source {name} failed: {e}")
+                continue
+            for field, value in stats.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                gauge = GaugeMetricFamily(f"{NAMESPACE}_{name}_{field}", f"{name} {field.replace('_', ' ')}")
+                gauge.add_metric([], value)
+                yield gauge
+
+
+_stats_collector = _StatsCollector()
+REGISTRY.register(_stats_collector)
+
+
+def register_gauge_source(name: str, source: Callable[[], dict]):
+    """Expose source()'s numeric fields as room_designer_<name>_<field> gauges"""
+    _stats_collector.sources[name] = source
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Prometheus exposition body and its content type"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+# -------------------------------------------------------------
+# HTTP middleware
+# -------------------------------------------------------------
+
+_TOKEN_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def server_timing_header(timings: List[Tuple[str, float]], total: float) -> str:
+    """'preprocess;dur=12.3, total;dur=15.0' (repeated stages are summed)"""
+    merged: Dict[str, float] = {}
+    for name, seconds in timings:
+        name = _TOKEN_UNSAFE.sub("_", name)
+        merged[name] = merged.get(name, 0.0) + seconds
+    merged["total"] = total
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in merged.items())
+
+
+def _route_template(scope) -> str:
+    """Matched route path (e.g. /generation/jobs/{job_id}), not the raw URL"""
+    endpoint = scope.get("endpoint")
+    router = scope.get("router")
+    if endpoint is None or router is None:
+        return "unmatched"
+    for route in router.routes:
+        if getattr(route, "endpoint", None) is endpoint:
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Per-request latency histogram and Server-Timing header
+
+    The header is written when the response starts, so streaming responses
+    only list the stages finished by then.
+    """
+
+    def __init__(self, app, exclude_paths: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        timings: List[Tuple[str, float]] = []
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def timed_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = server_timing_header(timings, time.perf_counter() - started)
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            _request_timings.reset(token)
+            REQUEST_SECONDS.labels(scope["method"], _route_template(scope), str(status)).observe(
+                time.perf_counter() - started
+            )
@@ -0,0 +1,182 @@
+# ai_backend/services/registry.py
+"""
+Service Registry
+Lazy construction and parallel warm-up of heavy services
+
+Importing the app must stay cheap, so new workers and pods become ready
+quickly. Heavy third-party modules are bound with ``lazy_import`` and
+only loaded on first attribute access, and expensive clients (boto3,
+worker pools, the compiled catalog) are registered here as factories.
+Each one is built exactly once: on first use, or earlier by ``warm_up``,
+which builds everything registered in parallel threads.
+"""
+
+import os
+import time
+import logging
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+SERVICE_WARMUP_WORKERS = int(os.getenv("SERVICE_WARMUP_WORKERS", "8"))
+
+
+class LazyModule:
+    """
+    Module stand-in that imports the real module on first attribute access
+
+    Attribute writes go to the real module too, so ``patch.object`` on a
+    lazily imported module behaves as usual.
+    """
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _load(self):
+        module = object.__getattribute__(self, "_module")
+        if module is None:
+            with object.__getattribute__(self, "_lock"):
+                module = object.__getattribute__(self, "_module")
+                if module is None:
+                    module = importlib.import_module(object.__getattribute__(self, "_name"))
+                    object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr: str):
+        delattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if object.__getattribute__(self, "_module") is not None else "not loaded"
+        return f"<lazy module {object.__getattribute__(self, '_name')!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """``np = lazy_import("numpy")``: defers the import until np is used"""
+    return LazyModule(name)
+
+
+def preload(module: LazyModule):
+    """Force a lazy module to load (for warm-up steps)"""
+    module._load()
+
+
+class ServiceRegistry:
+    """Named service factories, each built once on first use or at warm-up"""
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._seconds: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """Register (or replace) a factory; nothing is built yet"""
+        with self._lock:
+            self._factories[name] = factory
+            self._locks.setdefault(name, threading.Lock())
+            self._instances.pop(name, None)
+            self._errors.pop(name, None)
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._factories
+
+    def get(self, name: str) -> Any:
+        """
+        Service instance, built on first call
+
+        Raises:
+            KeyError: If no factory is registered under name
+            Exception: Whatever the factory raises (retried on the next call)
+        """
+        if name in self._instances:
+            return self._instances[name]
+        with self._lock:
+            factory = self._factories[name]
+            lock = self._locks[name]
+
+        with lock:
+            if name in self._instances:
+                return self._instances[name]
+            started = time.perf_counter()
+            try:
+                instance = factory()
+            except Exception as e:
+                self._errors[name] = str(e)
+                raise
+            self._seconds[name] = time.perf_counter() - started
+            self._errors.pop(name, None)
+            self._instances[name] = instance
+            return instance
+
+    def warm_up(self, names: Optional[Iterable[str]] = None, max_workers: int = SERVICE_WARMUP_WORKERS) -> Dict[str, float]:
+        """
+        Build services in parallel threads (failures are logged, not raised)
+
+        Args:
+            names: Services to build (default: all registered)
+            max_workers: Parallel builder threads
+
+        Returns:
+            Build seconds of each service that is ready
+        """
+        names = list(self._factories if names is None else names)
+        if not names:
+            return {}
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(names))), thread_name_prefix="warm-up") as pool:
+            futures = {name: pool.submit(self.get, name) for name in names}
+        for name, future in futures.items():
+            error = future.exception()
+            if error is not None:
+                logger.warning(f"⚠️  Warm-up of {name} failed: {error}")
+
+        ready = {name: self._seconds[name] for name in names if name in self._instances}
+        logger.info(f"✅ Warmed up {len(ready)}/{len(names)} services in {time.perf_counter() - started:.2f}s")
+        return ready
+
+    def stats(self) -> dict:
+        return {
+            "registered": len(self._factories),
+            "ready": len(self._instances),
+            "failed": len(self._errors),
+            "services": {
+                name: {
+                    "ready": name in self._instances,
+                    "build_seconds": round(self._seconds[name], 4) if name in self._seconds else None,
+                    "error": self._errors.get(name),
+                }
+                for name in self._factories
+            },
+        }
+
+
+# Global instance
+_service_registry_instance: Optional[ServiceRegistry] = None
+
+
+def get_service_registry() -> ServiceRegistry:
+    """Get global service registry (created on first use)"""
+    global _service_registry_instance
+    if _service_registry_instance is None:
+        _service_registry_instance = ServiceRegistry()
+    return _service_registry_instance
+
+
+def reset_service_registry():
+    """Reset global service registry (for testing)"""
+    global _service_registry_instance
+    _service_registry_instance = None
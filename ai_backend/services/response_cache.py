@@ -0,0 +1,324 @@
+# ai_backend/services/response_cache.py
+"""
+Response Cache
+In-process, byte-bounded LRU cache with TTL and stale-while-revalidate
+for read-mostly endpoints (furniture search, root info, theme list)
+
+Fresh entries are served directly. Entries past their TTL but inside the
+stale window are served immediately while one background refresh runs.
+Responses carry ETag / Cache-Control headers so browsers and CDNs can
+absorb repeat traffic too.
+"""
+
+import os
+import json
+import math
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+logger = logging.getLogger(__name__)
+
+# Tunables (env overridable)
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+RESPONSE_CACHE_STALE_SECONDS = int(os.getenv("RESPONSE_CACHE_STALE_SECONDS", "600"))
+SEARCH_PRICE_BUCKET = float(os.getenv("SEARCH_PRICE_BUCKET", "50"))
+
+# Cache states (also sent as X-Cache)
+HIT = "HIT"
+STALE = "STALE"
+MISS = "MISS"
+
+
+def _measure(value: Any) -> int:
+    """Approximate retained size of a cached value in bytes"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return len(json.dumps(jsonable_encoder(value), separators=(",", ":")))
+
+
+def bucket_price_range(min_price: float, max_price: float, bucket: float = SEARCH_PRICE_BUCKET) -> Tuple[float, float]:
+    """Widen a price range to bucket edges: (512, 988) -> (500, 1000)"""
+    if bucket <= 0:
+        return min_price, max_price
+    return math.floor(min_price / bucket) * bucket, math.ceil(max_price / bucket) * bucket
+
+
+def make_key(namespace: str, **params) -> str:
+    """Stable cache key from already-normalized parameters"""
+    return f"{namespace}:" + json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class _Entry:
+    __slots__ = ("value", "size", "created_at")
+
+    def __init__(self, value: Any, size: int):
+        self.value = value
+        self.size = size
+        self.created_at = time.time()
+
+
+class ResponseCache:
+    """
+    Byte-bounded LRU with TTL and stale-while-revalidate
+
+    Least-recently-used entries are evicted once the total measured size
+    exceeds max_bytes. Concurrent misses for one key share a single
+    computation.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        ttl_seconds: int = RESPONSE_CACHE_TTL_SECONDS,
+        stale_seconds: int = RESPONSE_CACHE_STALE_SECONDS,
+        enabled: bool = RESPONSE_CACHE_ENABLED
+    ):
+        """
+        Initialize response cache
+
+        Args:
+            max_bytes: Total size budget for cached values
+            ttl_seconds: Freshness lifetime (0 = never expire)
+            stale_seconds: Extra window in which stale values are served
+                           while revalidating
+            enabled: False turns every lookup into a miss
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._background: set = set()
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0, "refreshes": 0}
+
+    # -------------------------------------------------------------
+    # Core
+    # -------------------------------------------------------------
+
+    def get(self, key: str) -> Tuple[Optional[Any], str]:
+        """Return (value, HIT/STALE) or (None, MISS) without counting"""
+        if not self.enabled:
+            return None, MISS
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, MISS
+            age = time.time() - entry.created_at
+            if not self.ttl_seconds or age < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                return entry.value, HIT
+            if age < self.ttl_seconds + self.stale_seconds:
+                self._entries.move_to_end(key)
+                return entry.value, STALE
+            self._remove(key)
+            return None, MISS
+
+    def put(self, key: str, value: Any):
+        if not self.enabled:
+            return
+        size = _measure(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = _Entry(value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._counters["evictions"] += 1
+
+    def _remove(self, key: str):
+        """Drop an entry (lock held)"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def invalidate(self, prefix: str = ""):
+        """Drop every entry whose key starts with prefix"""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._remove(key)
+
+    def _count(self, state: str):
+        name = {HIT: "hits", STALE: "stale_hits", MISS: "misses"}[state]
+        with self._lock:
+            self._counters[name] += 1
+
+    # -------------------------------------------------------------
+    # Read-through helpers
+    # -------------------------------------------------------------
+
+    def get_or_build(self, key: str, build: Callable[[], Any]) -> Tuple[Any, str]:
+        """Synchronous read-through (for cheap builders like static payloads)"""
+        value, state = self.get(key)
+        if state == MISS:
+            value = build()
+            self.put(key, value)
+        elif state == STALE:
+            self.put(key, build())
+        self._count(state)
+        return value, state
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, str]:
+        """
+        Async read-through with stale-while-revalidate
+
+        Returns:
+            Tuple of value and cache state (HIT, STALE or MISS)
+        """
+        value, state = self.get(key)
+        self._count(state)
+        if state == HIT:
+            return value, state
+        if state == STALE:
+            if key not in self._inflight:
+                task = asyncio.get_running_loop().create_task(self._compute(key, compute, background=True))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+            return value, state
+        return await self._compute(key, compute), state
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[Any]], background: bool = False) -> Any:
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+            self.put(key, value)
+            future.set_result(value)
+            if background:
+                with self._lock:
+                    self._counters["refreshes"] += 1
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting on the future; mark the error retrieved
+            future.exception()
+            if background:
+                logger.warning(f"⚠️  Background refresh failed for {key[:60]}: {e}")
+                return None
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["stale_hits"] + self._counters["misses"]
+            served = self._counters["hits"] + self._counters["stale_hits"]
+            return {
+                **self._counters,
+                "hit_ratio": round(served / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "stale_seconds": self.stale_seconds,
+                "enabled": self.enabled,
+            }
+
+
+# -------------------------------------------------------------
+# HTTP helpers
+# -------------------------------------------------------------
+
+def compute_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True when If-None-Match names etag (or is *)"""
+    header = request.headers.get("if-none-match", "")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in tags
+
+
+def cache_control(max_age: int, stale_seconds: int = 0) -> str:
+    value = f"public, max-age={max_age}"
+    if stale_seconds:
+        value += f", stale-while-revalidate={stale_seconds}"
+    return value
+
+
+def cached_response(
+    request: Request,
+    content: Any,
+    max_age: int = RESPONSE_CACHE_TTL_SECONDS,
+    stale_seconds: int = RESPONSE_CACHE_STALE_SECONDS,
+    state: Optional[str] = None,
+    etag: Optional[str] = None,
+    conditional: bool = True
+) -> Response:
+    """
+    JSON response with ETag / Cache-Control (304 when the client is current)
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        content: Pre-serialized bytes or a JSON-able value
+        max_age: Cache-Control max-age
+        stale_seconds: Cache-Control stale-while-revalidate
+        state: Server cache state for the X-Cache header
+        etag: Precomputed ETag (default: hash of the body)
+        conditional: Answer If-None-Match with 304 (GET/HEAD only)
+    """
+    if isinstance(content, (bytes, bytearray)):
+        body = bytes(content)
+    else:
+        body = json.dumps(jsonable_encoder(content), separators=(",", ":")).encode("utf-8")
+    etag = etag or compute_etag(body)
+
+    headers = {"ETag": etag, "Cache-Control": cache_control(max_age, stale_seconds)}
+    if state:
+        headers["X-Cache"] = state
+
+    if conditional and etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# Global instance
+_response_cache_instance: Optional[ResponseCache] = None
+
+
+def init_response_cache(**options) -> ResponseCache:
+    """Initialize global response cache instance"""
+    global _response_cache_instance
+    _response_cache_instance = ResponseCache(**options)
+    logger.info(
+        f"Response cache initialized ({_response_cache_instance.max_bytes // (1024 * 1024)} MB, "
+        f"ttl: {_response_cache_instance.ttl_seconds}s)"
+    )
+    return _response_cache_instance
+
+
+def get_response_cache() -> ResponseCache:
+    """Get global response cache (created with defaults on first use)"""
+    if _response_cache_instance is None:
+        return init_response_cache()
+    return _response_cache_instance
+
+
+def reset_response_cache():
+    """Reset global response cache instance (for testing)"""
+    global _response_cache_instance
+    _response_cache_instance = None
@@ -0,0 +1,111 @@
+# ai_backend/services/scraper_engine.py
+"""
+Concurrent Scraping Engine
+Fans scraper calls out over asyncio with per-domain concurrency limits,
+per-site timeouts and a global deadline. Whatever finished inside the
+deadline is returned; slow or failing sites are reported, not awaited.
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tunables (env overridable)
+SCRAPE_DEADLINE_SECONDS = float(os.getenv("SCRAPE_DEADLINE_SECONDS", "8"))
+SCRAPE_SITE_TIMEOUT_SECONDS = float(os.getenv("SCRAPE_SITE_TIMEOUT_SECONDS", "5"))
+SCRAPE_PER_DOMAIN_LIMIT = int(os.getenv("SCRAPE_PER_DOMAIN_LIMIT", "2"))
+
+# A scrape task: (domain, zero-arg callable returning an awaitable list)
+ScrapeTask = Tuple[str, Callable[[], Awaitable[list]]]
+
+
+def normalize_domain(website: str) -> str:
+    """https://www.heals.com/ -> heals.com"""
+    domain = re.sub(r"^https?://", "", website.strip().lower())
+    domain = domain.split("/")[0]
+    return re.sub(r"^www\d*\.", "", domain)
+
+
+def unique_domains(websites: List[str]) -> List[str]:
+    """Normalized domains in first-seen order, duplicates removed"""
+    seen = []
+    for website in websites:
+        domain = normalize_domain(website)
+        if domain and domain not in seen:
+            seen.append(domain)
+    return seen
+
+
+async def run_scrapers(
+    tasks: List[ScrapeTask],
+    deadline: float = SCRAPE_DEADLINE_SECONDS,
+    site_timeout: float = SCRAPE_SITE_TIMEOUT_SECONDS,
+    per_domain_limit: int = SCRAPE_PER_DOMAIN_LIMIT
+) -> Dict[str, Any]:
+    """
+    Run scrape tasks concurrently and collect partial results
+
+    Args:
+        tasks: (domain, callable) pairs
+        deadline: Global budget in seconds; unfinished tasks are cancelled
+        site_timeout: Budget for a single scraper call
+        per_domain_limit: Max concurrent calls against one domain
+
+    Returns:
+        Dict with "results" (flattened items) and per-domain "completed",
+        "timed_out" and "failed" lists plus "elapsed" seconds
+    """
+    start = time.perf_counter()
+    semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def run_one(domain: str, factory: Callable[[], Awaitable[list]]) -> list:
+        semaphore = semaphores.setdefault(domain, asyncio.Semaphore(per_domain_limit))
+        async with semaphore:
+            return await asyncio.wait_for(factory(), site_timeout)
+
+    report: Dict[str, Any] = {
+        "results": [],
+        "completed": [],
+        "timed_out": [],
+        "failed": [],
+        "elapsed": 0.0,
+    }
+    if not tasks:
+        return report
+
+    running = {
+        asyncio.create_task(run_one(domain, factory)): domain
+        for domain, factory in tasks
+    }
+    done, pending = await asyncio.wait(running.keys(), timeout=deadline)
+
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    for task, domain in running.items():
+        if task in pending:
+            report["timed_out"].append(domain)
+            continue
+        error = task.exception()
+        if error is None:
+            report["results"].extend(task.result() or [])
+            report["completed"].append(domain)
+        elif isinstance(error, asyncio.TimeoutError):
+            report["timed_out"].append(domain)
+        else:
+            logger.error(f"Scraping failed for {domain}: {error}")
+            report["failed"].append(domain)
+
+    report["elapsed"] = time.perf_counter() - start
+    logger.info(
+        f"Scraped {len(report['completed'])} calls in {report['elapsed']:.2f}s "
+        f"({len(report['timed_out'])} timed out, {len(report['failed'])} failed)"
+    )
+    return report
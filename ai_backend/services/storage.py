@@ -1,17 +1,335 @@
 # ai_backend/services/storage.py - IMPROVED VERSION
 
+import io
 import os
+import asyncio
 import uuid
+import time
+import hashlib
 import logging
-from typing import Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+from typing import Optional, BinaryIO, List, Tuple
 from botocore.exceptions import ClientError
+from ai_backend.services.metrics import record_error, stage_timer
+from ai_backend.services.registry import lazy_import
+
+requests = lazy_import("requests")
 
 logger = logging.getLogger(__name__)
 
+# Max size accepted for generated images (50MB)
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+
+ALLOWED_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.webp']
+
+CONTENT_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.webp': 'image/webp',
+}
+
+EXTENSIONS_BY_CONTENT_TYPE = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/webp': '.webp',
+}
+
+# Content-addressed assets never change, so they can be cached forever
+ASSET_CACHE_CONTROL = os.getenv("ASSET_CACHE_CONTROL", "public, max-age=31536000, immutable")
+ASSET_CDN_BASE_URL = os.getenv("ASSET_CDN_BASE_URL", "").rstrip("/")  # empty = presigned URLs
+ASSET_URL_EXPIRES_SECONDS = int(os.getenv("ASSET_URL_EXPIRES_SECONDS", str(24 * 3600)))
+ASSET_SPOOL_MAX_BYTES = int(os.getenv("ASSET_SPOOL_MAX_BYTES", str(16 * 1024 * 1024)))  # then disk
+HASH_CHUNK_SIZE = 256 * 1024
+ASSET_UPLOAD_WORKERS = int(os.getenv("ASSET_UPLOAD_WORKERS", "6"))  # concurrent variant uploads
+
+
+def _object_name_from_url(url: str) -> Optional[str]:
+    """
+    https://bucket.s3.region.amazonaws.com/folder/file.jpg -> folder/file.jpg
+    
+    Presigned (query string) and CDN delivery URLs map to the same key.
+    """
+    url = url.split("?", 1)[0]
+    if ".amazonaws.com/" in url:
+        return url.split(".amazonaws.com/")[-1]
+    if ASSET_CDN_BASE_URL and url.startswith(ASSET_CDN_BASE_URL + "/"):
+        return url[len(ASSET_CDN_BASE_URL) + 1:]
+    return None
+
+
+def _generate_object_key(folder: str, file_extension: str) -> str:
+    """Build S3 key as folder/YYYYMMDD/<uuid><ext>"""
+    from datetime import datetime
+    timestamp = datetime.now().strftime("%Y%m%d")
+    return f"{folder}/{timestamp}/{uuid.uuid4()}{file_extension}"
+
+
+def content_addressed_key(digest: str, folder: str, file_extension: str) -> str:
+    """
+    folder/ab/cd/<sha256><ext>
+    
+    Two hex levels spread writes over 65,536 prefixes, so no single S3
+    prefix becomes a request-rate hotspot; identical content maps to one key.
+    """
+    return f"{folder}/{digest[:2]}/{digest[2:4]}/{digest}{file_extension}"
+
+
+def derivative_key(digest: str, folder: str, name: str) -> str:
+    """folder/ab/cd/<sha256>/<variant name>: derivatives share the original's asset id"""
+    return f"{folder}/{digest[:2]}/{digest[2:4]}/{digest}/{name}"
+
+
+def _spool_and_hash(fileobj: BinaryIO, max_bytes: int = MAX_UPLOAD_SIZE) -> Tuple[SpooledTemporaryFile, str, int]:
+    """Copy a stream into a spool while hashing it (ValueError past max_bytes)"""
+    spool = SpooledTemporaryFile(max_size=ASSET_SPOOL_MAX_BYTES)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = fileobj.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise ValueError(f"File too large: more than {max_bytes / (1024*1024):.0f}MB")
+            digest.update(chunk)
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, digest.hexdigest(), size
+
+
+def _store_asset(
+    fileobj: BinaryIO,
+    digest: str,
+    size: int,
+    folder: str,
+    file_extension: str,
+    content_type: str,
+    derivatives: bool = False
+) -> str:
+    """
+    Write an immutable content-addressed object (skipped if it already exists)
+    
+    With derivatives, the resized variants are written before the
+    original. If the original already exists (stored before derivatives
+    were enabled, or under other size/quality settings), only the missing
+    variants are rendered.
+    """
+    aws_service = _require_aws_service()
+    
+    object_name = content_addressed_key(digest, folder, file_extension)
+    if aws_service.head_file(object_name) is not None:
+        logger.info(f"♻️  Identical asset already stored: {object_name}")
+        if derivatives:
+            with stage_timer("storage", "derivatives"):
+                _ensure_derivatives(fileobj, digest, folder)
+        return aws_service.get_file_url(object_name)
+    
+    if derivatives:
+        with stage_timer("storage", "derivatives"):
+            _store_derivatives(fileobj.read(), digest, folder)
+        fileobj.seek(0)
+    
+    url = aws_service.upload_fileobj(
+        fileobj,
+        object_name=object_name,
+        content_type=content_type,
+        make_public=False,
+        size=size,
+        cache_control=ASSET_CACHE_CONTROL
+    )
+    
+    if not url:
+        raise Exception("Failed to get upload URL from AWS")
+    
+    logger.info(f"✅ File uploaded to S3: {url}")
+    return url
+
+
+def _require_aws_service():
+    from ai_backend.services.aws_service import get_aws_service
+    
+    try:
+        return get_aws_service()
+    except RuntimeError:
+        logger.error("AWS service not initialized")
+        raise Exception("AWS service not configured. Check your .env file and run setup_aws.py")
+
+
+# =====================================================
+# DERIVATIVES (resized WebP / progressive JPEG variants)
+# =====================================================
+
+_derivative_pool: Optional[ThreadPoolExecutor] = None
+_derivative_pool_lock = threading.Lock()
+
+
+def _get_derivative_pool() -> ThreadPoolExecutor:
+    global _derivative_pool
+    with _derivative_pool_lock:
+        if _derivative_pool is None:
+            _derivative_pool = ThreadPoolExecutor(
+                max_workers=max(1, ASSET_UPLOAD_WORKERS), thread_name_prefix="asset-upload"
+            )
+        return _derivative_pool
+
+
+def _store_derivative(object_name: str, data: bytes, content_type: str) -> str:
+    aws_service = _require_aws_service()
+    if aws_service.head_file(object_name) is not None:
+        return aws_service.get_file_url(object_name)
+    url = aws_service.upload_fileobj(
+        io.BytesIO(data),
+        object_name=object_name,
+        content_type=content_type,
+        make_public=False,
+        size=len(data),
+        cache_control=ASSET_CACHE_CONTROL
+    )
+    if not url:
+        raise Exception(f"Failed to upload variant {object_name}")
+    return url
+
+
+def _store_derivatives(data: bytes, digest: str, folder: str, specs: Optional[List[dict]] = None) -> List[str]:
+    """Render derivatives in the process pool (default: all), then upload them concurrently"""
+    from ai_backend.services.image_preprocess import derivative_specs, get_image_preprocessor
+    
+    specs = {spec["name"]: spec for spec in (specs if specs is not None else derivative_specs())}
+    rendered = get_image_preprocessor().render_derivatives(data, list(specs.values()))
+    
+    futures = [
+        _get_derivative_pool().submit(
+            _store_derivative, derivative_key(digest, folder, name), body, specs[name]["content_type"]
+        )
+        for name, body in rendered
+    ]
+    urls = [future.result() for future in futures]
+    _forget_stored_derivatives(digest, folder)
+    logger.info(f"✅ Stored {len(urls)} derivatives of {digest[:12]}")
+    return urls
+
+
+def _ensure_derivatives(fileobj: BinaryIO, digest: str, folder: str):
+    """Render and store the configured derivatives an existing asset lacks"""
+    from ai_backend.services.image_preprocess import derivative_specs
+    
+    stored = _stored_derivatives(digest, folder)
+    missing = [spec for spec in derivative_specs() if spec["name"] not in stored]
+    if missing:
+        logger.info(f"Rendering {len(missing)} missing derivatives of {digest[:12]}")
+        _store_derivatives(fileobj.read(), digest, folder, missing)
+        fileobj.seek(0)
+
+
+# Derivative names found under each asset: (digest, folder) -> (names, valid until)
+_DERIVATIVE_MEMO_SIZE = 10000
+_DERIVATIVE_MEMO_INCOMPLETE_SECONDS = 60
+_stored_derivative_names: "OrderedDict[Tuple[str, str], Tuple[frozenset, float]]" = OrderedDict()
+_derivative_memo_lock = threading.Lock()
+
+
+def _stored_derivatives(digest: str, folder: str) -> frozenset:
+    """
+    Names of the derivatives actually stored for an asset (one LIST call)
+    
+    A set that covers the current configuration is immutable and kept;
+    an incomplete one is re-listed after a minute, as it may be filled in.
+    """
+    from ai_backend.services.image_preprocess import derivative_specs
+    
+    memo_key = (digest, folder)
+    now = time.time()
+    with _derivative_memo_lock:
+        memo = _stored_derivative_names.get(memo_key)
+        if memo is not None and memo[1] > now:
+            _stored_derivative_names.move_to_end(memo_key)
+            return memo[0]
+    
+    prefix = derivative_key(digest, folder, "")
+    names = frozenset(key[len(prefix):] for key in _require_aws_service().list_files(prefix))
+    complete = all(spec["name"] in names for spec in derivative_specs())
+    
+    with _derivative_memo_lock:
+        _stored_derivative_names[memo_key] = (
+            names, float("inf") if complete else now + _DERIVATIVE_MEMO_INCOMPLETE_SECONDS
+        )
+        _stored_derivative_names.move_to_end(memo_key)
+        while len(_stored_derivative_names) > _DERIVATIVE_MEMO_SIZE:
+            _stored_derivative_names.popitem(last=False)
+    return names
+
+
+def _forget_stored_derivatives(digest: str, folder: str):
+    with _derivative_memo_lock:
+        _stored_derivative_names.pop((digest, folder), None)
+
+
+def derivative_urls(url: str) -> List[dict]:
+    """
+    Client-facing derivative URLs of a content-addressed asset, smallest first
+    
+    Only variants that are actually stored under the asset are listed
+    (see _stored_derivatives), so assets stored before derivatives existed
+    or under other size/quality settings never advertise missing files.
+    Assets under legacy (non content-addressed) keys have no variants.
+    
+    Blocking (one LIST on a memo miss); call from worker threads.
+    
+    Returns:
+        List of {"name", "max_side", "format", "content_type", "url"}
+    """
+    from ai_backend.services.image_preprocess import parse_derivative_name
+    
+    object_name = _object_name_from_url(url)
+    if object_name is None:
+        return []
+    folder, _, filename = object_name.rpartition("/")
+    digest = os.path.splitext(filename)[0]
+    parts = folder.rsplit("/", 2)
+    if len(parts) != 3 or len(digest) != 64 or parts[1:] != [digest[:2], digest[2:4]]:
+        return []
+    
+    try:
+        stored = _stored_derivatives(digest, parts[0])
+    except Exception as e:
+        logger.warning(f"⚠️  Could not list derivatives of {digest[:12]}: {e}")
+        return []
+    
+    specs = [spec for spec in map(parse_derivative_name, stored) if spec is not None]
+    specs.sort(key=lambda spec: (spec["max_side"], spec["format"] != "webp", spec["quality"]))
+    base_url = url[:-len(object_name)]
+    return [
+        {
+            "name": spec["name"],
+            "max_side": spec["max_side"],
+            "format": spec["format"],
+            "content_type": spec["content_type"],
+            "url": delivery_url(base_url + derivative_key(digest, parts[0], spec["name"])),
+        }
+        for spec in specs
+    ]
+
+
+def shutdown_derivative_pool():
+    """Stop the variant upload threads (app shutdown)"""
+    global _derivative_pool
+    with _derivative_pool_lock:
+        pool, _derivative_pool = _derivative_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
 
 def upload_to_s3(file_path: str, folder: str = "generated") -> str:
     """
-    Upload image to S3 and return public URL
+    Upload image to S3 under its content hash and return the object URL
     
     Args:
         file_path: Local file path to upload
@@ -24,16 +342,13 @@ def upload_to_s3(file_path: str, folder: str = "generated") -> str:
         Exception: If upload fails
     """
     try:
-        from ai_backend.services.aws_service import get_aws_service
-        
         # Validate file exists
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
         
         # Validate file size (max 50MB for images)
         file_size = os.path.getsize(file_path)
-        max_size = 50 * 1024 * 1024  # 50MB
-        if file_size > max_size:
+        if file_size > MAX_UPLOAD_SIZE:
             raise ValueError(f"File too large: {file_size / (1024*1024):.2f}MB (max: 50MB)")
         
         # Generate unique filename with proper extension
@@ -44,36 +359,22 @@ def upload_to_s3(file_path: str, folder: str = "generated") -> str:
             file_extension = ".jpg"
         
         # Validate extension
-        allowed_extensions = ['.jpg', '.jpeg', '.png', '.webp']
-        if file_extension not in allowed_extensions:
+        if file_extension not in ALLOWED_EXTENSIONS:
             logger.warning(f"Unusual file extension: {file_extension}, using .jpg")
             file_extension = ".jpg"
         
-        # Generate S3 key with timestamp for better organization
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y%m%d")
-        file_name = f"{folder}/{timestamp}/{uuid.uuid4()}{file_extension}"
-        
-        logger.info(f"Uploading to S3: {file_name} (size: {file_size / 1024:.2f}KB)")
-        
-        # Get AWS service
-        try:
-            aws_service = get_aws_service()
-        except RuntimeError as e:
-            logger.error("AWS service not initialized")
-            raise Exception("AWS service not configured. Check your .env file and run setup_aws.py")
-        
-        # Upload file
-        url = aws_service.upload_file(
-            file_path=file_path,
-            object_name=file_name,
-            make_public=True
-        )
-        
-        if not url:
-            raise Exception("Failed to get upload URL from AWS")
-        
-        logger.info(f"✅ File uploaded to S3: {url}")
+        # Content-addressed key (hash the file, then upload it once)
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as source:
+            for chunk in iter(lambda: source.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+            source.seek(0)
+            
+            logger.info(f"Uploading to S3: {digest.hexdigest()[:12]} (size: {file_size / 1024:.2f}KB)")
+            url = _store_asset(
+                source, digest.hexdigest(), file_size, folder, file_extension,
+                CONTENT_TYPES.get(file_extension, "image/jpeg")
+            )
         
         # Cleanup local file
         try:
@@ -99,6 +400,122 @@ def upload_to_s3(file_path: str, folder: str = "generated") -> str:
         raise Exception(f"Failed to upload to S3: {str(e)}")
 
 
+def upload_fileobj_to_s3(
+    fileobj: BinaryIO,
+    folder: str = "generated",
+    file_extension: str = ".jpg",
+    content_type: Optional[str] = None,
+    derivatives: bool = False,
+    max_bytes: int = MAX_UPLOAD_SIZE
+) -> str:
+    """
+    Upload a file-like object to S3 under its content hash
+    
+    The stream is spooled (in memory up to ASSET_SPOOL_MAX_BYTES, then on
+    disk) while it is hashed, then written once as an immutable object
+    with a long-lived Cache-Control header and no ACL. Reading stops with
+    ValueError as soon as more than max_bytes arrive. Content that is
+    already stored is not uploaded again.
+    
+    Args:
+        fileobj: Readable binary stream (BytesIO, HTTP response body, ...)
+        folder: S3 folder/prefix (default: "generated")
+        file_extension: Extension used for the object key
+        content_type: MIME type (derived from extension if omitted)
+        derivatives: Also store the resized variants (see derivative_urls)
+        max_bytes: Largest accepted stream (default MAX_UPLOAD_SIZE, 50MB)
+    
+    Returns:
+        S3 object URL (see delivery_url for the client-facing URL)
+    
+    Raises:
+        ValueError: If the stream is larger than max_bytes
+        Exception: If upload fails
+    """
+    file_extension = file_extension.lower()
+    if file_extension not in ALLOWED_EXTENSIONS:
+        logger.warning(f"Unusual file extension: {file_extension}, using .jpg")
+        file_extension = ".jpg"
+    content_type = content_type or CONTENT_TYPES[file_extension]
+    
+    spool, digest, size = _spool_and_hash(fileobj, max_bytes)
+    with spool:
+        logger.info(f"Uploading to S3: {digest[:12]} ({size / 1024:.2f}KB)")
+        return _store_asset(spool, digest, size, folder, file_extension, content_type, derivatives)
+
+
+def upload_from_url(
+    source_url: str,
+    folder: str = "generated",
+    derivatives: bool = False,
+    max_bytes: int = MAX_UPLOAD_SIZE
+) -> str:
+    """
+    Copy a remote image (e.g. Replicate output) into S3
+    
+    The HTTP body is read chunk by chunk into a spool while it is hashed,
+    then stored under its content hash (see upload_fileobj_to_s3). The
+    body is buffered once (in memory, or on disk past
+    ASSET_SPOOL_MAX_BYTES) because the key depends on the full hash. A
+    declared Content-Length over max_bytes is refused before reading, and
+    the byte count is enforced while reading, so bodies without (or with a
+    wrong) Content-Length are capped too.
+    
+    Args:
+        source_url: URL of the image to copy
+        folder: S3 folder/prefix (default: "generated")
+        derivatives: Also store the resized variants (see derivative_urls)
+        max_bytes: Largest accepted body (default MAX_UPLOAD_SIZE, 50MB)
+    
+    Returns:
+        S3 object URL
+    
+    Raises:
+        ValueError: If the remote file is larger than max_bytes
+        Exception: If download or upload fails
+    """
+    try:
+        from ai_backend.services.http_client import get_http_client
+        
+        # Pooled keep-alive session with retries (see http_client)
+        with stage_timer("storage", "download"):
+            response = get_http_client().get_sync(source_url, stream=True, timeout=(5, 60))
+        with response:
+            response.raise_for_status()
+            
+            content_length = int(response.headers.get("Content-Length") or 0)
+            if content_length > max_bytes:
+                raise ValueError(
+                    f"File too large: {content_length / (1024*1024):.2f}MB (max: {max_bytes / (1024*1024):.0f}MB)"
+                )
+            
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+            file_extension = EXTENSIONS_BY_CONTENT_TYPE.get(content_type)
+            if file_extension is None:
+                file_extension = os.path.splitext(source_url.split("?")[0])[1].lower() or ".jpg"
+            
+            # Transparently decode gzip/deflate transfer encodings
+            response.raw.decode_content = True
+            # Covers the body transfer, hashing and the S3 write; max_bytes
+            # is checked per chunk, whatever Content-Length claimed
+            with stage_timer("storage", "s3_upload"):
+                return upload_fileobj_to_s3(
+                    response.raw, folder, file_extension, derivatives=derivatives, max_bytes=max_bytes
+                )
+        
+    except ValueError as e:
+        logger.error(f"❌ Validation error: {e}")
+        raise
+    except requests.RequestException as e:
+        record_error("download")
+        logger.error(f"❌ Download failed: {e}")
+        raise Exception(f"Failed to download generated image: {str(e)}")
+    except Exception as e:
+        record_error("s3")
+        logger.error(f"❌ Upload failed: {e}")
+        raise Exception(f"Failed to upload to S3: {str(e)}")
+
+
 def delete_from_s3(url: str) -> bool:
     """
     Delete file from S3 using its URL
@@ -113,10 +530,8 @@ def delete_from_s3(url: str) -> bool:
         from ai_backend.services.aws_service import get_aws_service
         
         # Extract object name from URL
-        # URL format: https://bucket.s3.region.amazonaws.com/folder/file.jpg
-        if ".amazonaws.com/" in url:
-            object_name = url.split(".amazonaws.com/")[-1]
-        else:
+        object_name = _object_name_from_url(url)
+        if object_name is None:
             logger.error(f"Invalid S3 URL format: {url}")
             return False
         
@@ -140,51 +555,231 @@ def delete_from_s3(url: str) -> bool:
         return False
 
 
+def _file_info(url: str, object_name: str, head: Optional[dict]) -> dict:
+    """File info dict from one HEAD response (None = missing)"""
+    if head is None:
+        return {"exists": False, "size": 0, "url": url, "object_name": object_name}
+    
+    size = head.get("ContentLength", 0)
+    last_modified = head.get("LastModified")
+    return {
+        "exists": True,
+        "size": size,
+        "size_kb": round(size / 1024, 2),
+        "size_mb": round(size / (1024 * 1024), 2),
+        "content_type": head.get("ContentType"),
+        "etag": (head.get("ETag") or "").strip('"') or None,
+        "last_modified": last_modified.isoformat() if last_modified else None,
+        "url": url,
+        "object_name": object_name
+    }
+
+
 def get_s3_file_info(url: str) -> Optional[dict]:
     """
-    Get file information from S3
+    Get file information from S3 (one HEAD request)
     
     Args:
-        url: Full S3 URL of the file
+        url: S3, presigned or CDN URL of the file
     
     Returns:
-        Dict with file info (size, exists), or None if error
+        Dict with exists, size, content_type, etag and last_modified,
+        or None if error
     """
     try:
         from ai_backend.services.aws_service import get_aws_service
         
         # Extract object name from URL
-        if ".amazonaws.com/" in url:
-            object_name = url.split(".amazonaws.com/")[-1]
-        else:
+        object_name = _object_name_from_url(url)
+        if object_name is None:
             return None
         
-        # Get AWS service
-        aws_service = get_aws_service()
-        
-        # Check if file exists
-        exists = aws_service.file_exists(object_name)
-        
-        if not exists:
-            return {"exists": False, "size": 0}
-        
-        # Get file size
-        size = aws_service.get_file_size(object_name)
-        
-        return {
-            "exists": True,
-            "size": size,
-            "size_kb": round(size / 1024, 2) if size else 0,
-            "size_mb": round(size / (1024 * 1024), 2) if size else 0,
-            "url": url,
-            "object_name": object_name
-        }
+        return _file_info(url, object_name, get_aws_service().head_file(object_name))
         
     except Exception as e:
         logger.error(f"❌ Failed to get file info: {e}")
         return None
 
 
+# =====================================================
+# DELIVERY URLS (CDN or presigned; objects carry no ACL)
+# =====================================================
+
+_DELIVERY_URL_MEMO_SIZE = 10000
+_delivery_urls: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+_delivery_lock = threading.Lock()
+
+
+def delivery_url(url: str) -> str:
+    """
+    Client-facing URL for a stored asset
+    
+    With ASSET_CDN_BASE_URL set this is the stable CDN URL. Otherwise it is
+    a presigned GET, reused for the first half of its lifetime so repeat
+    views get the same URL (and hit browser/CDN caches). Non-S3 URLs are
+    returned unchanged.
+    """
+    object_name = _object_name_from_url(url)
+    if object_name is None:
+        return url
+    if ASSET_CDN_BASE_URL:
+        return f"{ASSET_CDN_BASE_URL}/{object_name}"
+    
+    now = time.time()
+    with _delivery_lock:
+        memo = _delivery_urls.get(object_name)
+        if memo is not None and memo[1] > now:
+            _delivery_urls.move_to_end(object_name)
+            return memo[0]
+    
+    from ai_backend.services.aws_service import get_aws_service
+    
+    try:
+        signed = get_aws_service().generate_presigned_get(object_name, ASSET_URL_EXPIRES_SECONDS)
+    except RuntimeError:
+        signed = None
+    if not signed:
+        return url
+    
+    with _delivery_lock:
+        _delivery_urls[object_name] = (signed, now + ASSET_URL_EXPIRES_SECONDS / 2)
+        _delivery_urls.move_to_end(object_name)
+        while len(_delivery_urls) > _DELIVERY_URL_MEMO_SIZE:
+            _delivery_urls.popitem(last=False)
+    return signed
+
+
+# =====================================================
+# DIRECT UPLOADS (client -> S3 via presigned POST/PUT)
+# =====================================================
+
+UPLOADS_FOLDER = "uploads"
+UPLOAD_URL_EXPIRES_SECONDS = int(os.getenv("UPLOAD_URL_EXPIRES_SECONDS", "900"))
+
+
+def is_upload_key(object_name: str) -> bool:
+    """True for keys issued by create_direct_upload (nothing else is readable)"""
+    return (
+        object_name.startswith(f"{UPLOADS_FOLDER}/")
+        and ".." not in object_name
+        and os.path.splitext(object_name)[1] in CONTENT_TYPES
+    )
+
+
+def create_direct_upload(
+    content_type: str,
+    max_bytes: int,
+    method: str = "POST",
+    content_length: Optional[int] = None,
+    expires_in: int = UPLOAD_URL_EXPIRES_SECONDS
+) -> dict:
+    """
+    Presigned URL for uploading a room photo straight to S3
+    
+    Args:
+        content_type: image/jpeg, image/png or image/webp
+        max_bytes: Size limit (POST policy range / PUT length check)
+        method: "POST" (size range enforced by S3) or "PUT" (exact size)
+        content_length: Declared size, required for PUT
+        expires_in: URL lifetime in seconds
+    
+    Returns:
+        Dict with key, method, url, fields (POST only), headers and expiry
+    
+    Raises:
+        ValueError: Unsupported type/method or a bad declared size
+        Exception: If the URL cannot be signed
+    """
+    file_extension = EXTENSIONS_BY_CONTENT_TYPE.get(content_type)
+    if file_extension is None:
+        raise ValueError("Unsupported content type. Use image/jpeg, image/png or image/webp")
+    method = method.upper()
+    if method not in ("POST", "PUT"):
+        raise ValueError("method must be POST or PUT")
+    if content_length is not None and not 0 < content_length <= max_bytes:
+        raise ValueError(f"Declared size must be between 1 byte and {max_bytes // (1024 * 1024)}MB")
+    if method == "PUT" and content_length is None:
+        raise ValueError("size is required for PUT uploads")
+    
+    from ai_backend.services.aws_service import get_aws_service
+    
+    try:
+        aws_service = get_aws_service()
+    except RuntimeError:
+        raise Exception("AWS service not configured. Check your .env file and run setup_aws.py")
+    
+    object_name = _generate_object_key(UPLOADS_FOLDER, file_extension)
+    upload = {"key": object_name, "method": method, "expires_in": expires_in, "max_bytes": max_bytes}
+    
+    if method == "POST":
+        post = aws_service.generate_presigned_post(object_name, content_type, max_bytes, expires_in)
+        if post is None:
+            raise Exception("Failed to sign upload URL")
+        upload.update(url=post["url"], fields=post["fields"])
+    else:
+        url = aws_service.generate_presigned_put(object_name, content_type, content_length, expires_in)
+        if url is None:
+            raise Exception("Failed to sign upload URL")
+        upload.update(url=url, headers={"Content-Type": content_type})
+    
+    logger.info(f"Direct upload issued: {object_name} ({method})")
+    return upload
+
+
+# =====================================================
+# ASYNC HELPERS (for request handlers; see AsyncAWSService)
+# =====================================================
+
+async def get_s3_file_info_async(url: str) -> Optional[dict]:
+    """Async variant of get_s3_file_info (single HEAD request)"""
+    from ai_backend.services.aws_service import get_async_aws_service
+    
+    object_name = _object_name_from_url(url)
+    if object_name is None:
+        return None
+    
+    try:
+        head = await get_async_aws_service().head(object_name)
+    except Exception as e:
+        logger.error(f"❌ Failed to get file info: {e}")
+        return None
+    
+    return _file_info(url, object_name, head)
+
+
+async def get_s3_files_info_async(urls: List[str], folder: Optional[str] = None) -> List[Optional[dict]]:
+    """
+    File info for many URLs in one parallel round
+    
+    One HEAD per distinct object, all in flight at once (bounded by the
+    async S3 layer's concurrency limit).
+    
+    Args:
+        urls: S3, presigned or CDN URLs
+        folder: Only check objects under this folder/prefix
+    
+    Returns:
+        File info per URL in input order; None for URLs that are not
+        stored assets (or outside folder) or could not be checked
+    """
+    object_names = {url: _object_name_from_url(url) for url in urls}
+    # First URL seen for each distinct object
+    unique = {}
+    for url, name in object_names.items():
+        if name is not None and (folder is None or name.startswith(folder.rstrip("/") + "/")):
+            unique.setdefault(name, url)
+    
+    with stage_timer("storage", "head_batch"):
+        infos = await asyncio.gather(*(get_s3_file_info_async(url) for url in unique.values()))
+    by_name = dict(zip(unique, infos))
+    
+    results = []
+    for url in urls:
+        info = by_name.get(object_names[url])
+        results.append(dict(info, url=url) if info is not None else None)
+    return results
+
+
 def save_to_local(file_path: str, folder: str = "uploads") -> str:
     """
     Save file locally (for development/testing without AWS)
@@ -217,45 +812,46 @@ def save_to_local(file_path: str, folder: str = "uploads") -> str:
         raise
 
 
-def cleanup_old_files(folder: str = "generated", days_old: int = 30) -> int:
+def cleanup_old_files(folder: str = "generated", days_old: int = 30, dry_run: bool = False) -> int:
     """
     Delete files older than specified days from S3
     
+    Streams the listing page by page, filters on LastModified and deletes
+    in parallel batches of 1000, so it scales to millions of objects.
+    
     Args:
         folder: S3 folder/prefix
         days_old: Delete files older than this many days
+        dry_run: Only count the files that would be deleted
     
     Returns:
-        Number of files deleted
+        Number of files deleted (or matched, in dry-run mode)
     """
     try:
         from ai_backend.services.aws_service import get_aws_service
-        from datetime import datetime, timedelta
+        from datetime import datetime, timedelta, timezone
         
         logger.info(f"Cleaning up files older than {days_old} days in '{folder}/'")
         
         aws_service = get_aws_service()
         
-        # List all files
-        files = aws_service.list_files(prefix=f"{folder}/")
+        # Calculate cutoff date (S3 LastModified is UTC)
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_old)
         
-        if not files:
-            logger.info("No files to cleanup")
-            return 0
+        report = aws_service.delete_older_than(f"{folder}/", cutoff_date, dry_run=dry_run)
         
-        # Calculate cutoff date
-        cutoff_date = datetime.now() - timedelta(days=days_old)
+        if dry_run:
+            logger.info(
+                f"✅ Cleanup dry run: {report['matched']} of {report['scanned']} files "
+                f"({report['bytes'] / (1024 * 1024):.2f}MB) would be deleted"
+            )
+            return report["matched"]
         
-        deleted_count = 0
-        
-        # Note: This is a simple implementation
-        # In production, you should check LastModified date
-        for file_key in files:
-            # For now, just count (implement proper date checking if needed)
-            pass
-        
-        logger.info(f"✅ Cleanup complete: {deleted_count} files deleted")
-        return deleted_count
+        logger.info(
+            f"✅ Cleanup complete: {report['deleted']} files deleted "
+            f"({report['objects_per_second']} objects/s scanned)"
+        )
+        return report["deleted"]
         
     except Exception as e:
         logger.error(f"❌ Cleanup failed: {e}")
@@ -0,0 +1,351 @@
+# ai_backend/services/storage_stats.py
+"""
+Storage Usage Statistics
+Incremental per-prefix and per-day bucket usage
+
+Uploads are written as ``folder/YYYYMMDD/<uuid>.<ext>``, so every past
+day is a partition that no longer grows. Each partition is listed once,
+its totals are cached (optionally persisted to a JSON file), and later
+refreshes only re-list today's, new, or invalidated partitions - in
+parallel across prefixes. Usage queries are answered from the cache.
+
+Content-addressed assets (``folder/ab/cd/<sha256>.<ext>``) land in
+random hash shards instead, so no shard is ever sealed. A shard is
+listed once and then kept current by the uploads recorded through
+``record_upload``; deletes invalidate it, and it is re-listed after
+STORAGE_STATS_RECONCILE_SECONDS to pick up writes by other processes.
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Tunables (env overridable)
+STORAGE_STATS_CACHE_PATH = os.getenv("STORAGE_STATS_CACHE_PATH", "")  # empty = memory only
+STORAGE_STATS_TTL_SECONDS = int(os.getenv("STORAGE_STATS_TTL_SECONDS", "300"))
+STORAGE_STATS_WORKERS = int(os.getenv("STORAGE_STATS_WORKERS", "8"))
+STORAGE_STATS_RECONCILE_SECONDS = int(os.getenv("STORAGE_STATS_RECONCILE_SECONDS", "3600"))
+
+DATE_PARTITION = re.compile(r"^\d{8}$")
+HASH_SHARD = re.compile(r"^[0-9a-f]{2}$")
+
+# Days still considered open for writes (uploads use local time, so allow
+# yesterday to settle before caching it for good)
+OPEN_DAYS = 1
+
+
+def _partition_day(prefix: str) -> Optional[str]:
+    """"generated/20250101/" -> "20250101" (None for non-date prefixes)"""
+    name = prefix.rstrip("/").rsplit("/", 1)[-1]
+    if not DATE_PARTITION.match(name):
+        return None
+    try:
+        datetime.strptime(name, "%Y%m%d")
+    except ValueError:
+        return None
+    return name
+
+
+def _is_hash_shard(prefix: str) -> bool:
+    """"generated/ab/" -> True (first level of content-addressed keys)"""
+    return bool(HASH_SHARD.match(prefix.rstrip("/").rsplit("/", 1)[-1]))
+
+
+def _partition_of(object_name: str) -> Optional[str]:
+    """"generated/ab/cd/x.png" -> "generated/ab/" (None for shallower keys)"""
+    parts = object_name.split("/")
+    if len(parts) < 3:
+        return None
+    return f"{parts[0]}/{parts[1]}/"
+
+
+def _totals(count: int = 0, size_bytes: int = 0) -> dict:
+    return {
+        "count": count,
+        "size_bytes": size_bytes,
+        "size_mb": round(size_bytes / (1024 * 1024), 2),
+    }
+
+
+class StorageUsageTracker:
+    """
+    Cached bucket usage built from delimited listings
+
+    Layout: top-level folders -> partitions (one level below). Sealed
+    (past) date partitions are listed once; hash shards are listed once
+    per reconcile interval and updated by recorded uploads; everything
+    else is re-listed on each refresh. Deletes invalidate the affected
+    prefix.
+    """
+
+    def __init__(
+        self,
+        aws_service,
+        cache_path: str = STORAGE_STATS_CACHE_PATH,
+        ttl_seconds: int = STORAGE_STATS_TTL_SECONDS,
+        workers: int = STORAGE_STATS_WORKERS,
+        reconcile_seconds: int = STORAGE_STATS_RECONCILE_SECONDS
+    ):
+        """
+        Initialize usage tracker
+
+        Args:
+            aws_service: AWSService used for listings
+            cache_path: JSON file for partition totals (empty = memory only)
+            ttl_seconds: Age after which usage() refreshes (0 = every call)
+            workers: Parallel partition listings
+            reconcile_seconds: Age after which hash shards are re-listed
+        """
+        self.aws = aws_service
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.workers = workers
+        self.reconcile_seconds = reconcile_seconds
+
+        # partition prefix -> {"count", "size_bytes", "sealed", "indexed", "listed_at"}
+        self._partitions: Dict[str, dict] = {}
+        # folder prefix -> totals of objects directly under it
+        self._loose: Dict[str, dict] = {}
+        # hash shard -> keys counted by record_upload since its last listing
+        self._recorded: Dict[str, Set[str]] = {}
+        self._refreshed_at = 0.0
+        self._last_refresh = {"listed": 0, "cached": 0, "seconds": 0.0}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._load()
+
+    # -------------------------------------------------------------
+    # Refresh
+    # -------------------------------------------------------------
+
+    def _is_sealed(self, prefix: str, today: datetime) -> bool:
+        day = _partition_day(prefix)
+        if day is None:
+            return False
+        cutoff = (today - timedelta(days=OPEN_DAYS)).strftime("%Y%m%d")
+        return day < cutoff
+
+    def _is_current(self, totals: dict, now: float) -> bool:
+        """Cached totals that need no listing (sealed, or a recently listed shard)"""
+        if totals.get("sealed"):
+            return True
+        return bool(totals.get("indexed")) and now - totals.get("listed_at", 0) < self.reconcile_seconds
+
+    def _list_partition(self, prefix: str) -> dict:
+        count = 0
+        size = 0
+        for obj in self.aws.iter_objects(prefix):
+            count += 1
+            size += obj["size"]
+        return {"count": count, "size_bytes": size}
+
+    def refresh(self) -> dict:
+        """
+        Re-list new, open and invalidated partitions
+
+        Returns:
+            Dict with "listed" and "cached" partition counts and "seconds"
+        """
+        with self._refresh_lock:
+            started = time.perf_counter()
+            today = datetime.now()
+
+            folders, root_objects = self.aws.list_prefixes("")
+            loose = {"": self._sum(root_objects)}
+            partitions: List[str] = []
+            for folder in folders:
+                children, objects = self.aws.list_prefixes(folder)
+                loose[folder] = self._sum(objects)
+                partitions.extend(children)
+
+            now = time.time()
+            with self._lock:
+                cached = {
+                    prefix: self._partitions[prefix]
+                    for prefix in partitions
+                    if prefix in self._partitions and self._is_current(self._partitions[prefix], now)
+                }
+            to_list = [prefix for prefix in partitions if prefix not in cached]
+
+            listed = {}
+            if to_list:
+                with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(to_list)))) as pool:
+                    for prefix, totals in zip(to_list, pool.map(self._list_partition, to_list)):
+                        totals["sealed"] = self._is_sealed(prefix, today)
+                        totals["indexed"] = _is_hash_shard(prefix)
+                        totals["listed_at"] = time.time()
+                        listed[prefix] = totals
+
+            with self._lock:
+                # Partitions that disappeared from the bucket are dropped
+                self._partitions = {**cached, **listed}
+                for prefix in listed:
+                    self._recorded.pop(prefix, None)
+                self._loose = loose
+                self._refreshed_at = time.time()
+                self._last_refresh = {
+                    "listed": len(listed),
+                    "cached": len(cached),
+                    "seconds": round(time.perf_counter() - started, 3),
+                }
+                self._save()
+                report = dict(self._last_refresh)
+
+            logger.info(
+                f"Storage usage refreshed: {report['listed']} partitions listed, "
+                f"{report['cached']} cached ({report['seconds']}s)"
+            )
+            return report
+
+    @staticmethod
+    def _sum(objects: List[dict]) -> dict:
+        return {"count": len(objects), "size_bytes": sum(obj["size"] for obj in objects)}
+
+    # -------------------------------------------------------------
+    # Queries / invalidation
+    # -------------------------------------------------------------
+
+    def usage(self, prefix: Optional[str] = None, refresh: bool = False) -> dict:
+        """
+        Bucket usage from the cache (refreshed when older than the TTL)
+
+        Args:
+            prefix: Only include keys under this prefix (e.g. "generated/")
+            refresh: Force a refresh first
+
+        Returns:
+            Dict with "total", per-folder "prefixes" (each with "days"
+            for date partitions) and "refreshed_at"
+        """
+        if refresh or not self._refreshed_at or time.time() - self._refreshed_at >= self.ttl_seconds:
+            self.refresh()
+
+        with self._lock:
+            partitions = dict(self._partitions)
+            loose = dict(self._loose)
+            refreshed_at = self._refreshed_at
+
+        folders: Dict[str, dict] = {}
+
+        def folder_entry(folder: str) -> dict:
+            return folders.setdefault(folder, {"count": 0, "size_bytes": 0, "days": {}})
+
+        for folder, totals in loose.items():
+            if not totals["count"] or (prefix and not folder.startswith(prefix)):
+                continue
+            entry = folder_entry(folder)
+            entry["count"] += totals["count"]
+            entry["size_bytes"] += totals["size_bytes"]
+
+        for partition, totals in partitions.items():
+            if prefix and not (partition.startswith(prefix) or prefix.startswith(partition)):
+                continue
+            folder = partition[:partition.rstrip("/").rfind("/") + 1]
+            entry = folder_entry(folder)
+            entry["count"] += totals["count"]
+            entry["size_bytes"] += totals["size_bytes"]
+            day = _partition_day(partition)
+            if day:
+                entry["days"][day] = _totals(totals["count"], totals["size_bytes"])
+
+        total_count = sum(entry["count"] for entry in folders.values())
+        total_size = sum(entry["size_bytes"] for entry in folders.values())
+        return {
+            "total": _totals(total_count, total_size),
+            "prefixes": {
+                folder: {**_totals(entry["count"], entry["size_bytes"]), "days": entry["days"]}
+                for folder, entry in sorted(folders.items())
+            },
+            "refreshed_at": refreshed_at,
+        }
+
+    def record_upload(self, object_name: str, size_bytes: int):
+        """
+        Count an uploaded object in its cached hash shard
+
+        Only content-addressed shards are updated; other partitions pick
+        the object up on their next listing. A key is counted at most once
+        between listings, so concurrent uploads of the same content and
+        re-rendered derivatives are not added twice. Overwrites this
+        process cannot see (another worker, or a key that existed at the
+        last listing) are corrected by the periodic reconcile listing.
+        """
+        partition = _partition_of(object_name)
+        if partition is None or not _is_hash_shard(partition):
+            return
+        with self._lock:
+            totals = self._partitions.get(partition)
+            if totals is None or not totals.get("indexed"):
+                return
+            recorded = self._recorded.setdefault(partition, set())
+            if object_name in recorded:
+                return
+            recorded.add(object_name)
+            totals["count"] += 1
+            totals["size_bytes"] += size_bytes
+
+    def invalidate(self, prefix: str = ""):
+        """Forget cached partitions under (or containing) prefix"""
+        with self._lock:
+            stale = [
+                partition for partition in self._partitions
+                if partition.startswith(prefix) or prefix.startswith(partition)
+            ]
+            for partition in stale:
+                del self._partitions[partition]
+                self._recorded.pop(partition, None)
+            # Force the next usage() call to refresh
+            self._refreshed_at = 0.0
+            self._save()
+        if stale:
+            logger.info(f"Storage usage invalidated for '{prefix}' ({len(stale)} partitions)")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "partitions": len(self._partitions),
+                "sealed": sum(1 for p in self._partitions.values() if p["sealed"]),
+                "indexed": sum(1 for p in self._partitions.values() if p.get("indexed")),
+                "refreshed_at": self._refreshed_at or None,
+                "last_refresh": dict(self._last_refresh),
+            }
+
+    # -------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------
+
+    def _load(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+            # Only sealed partitions and recently listed shards are trusted across restarts
+            now = time.time()
+            self._partitions = {
+                prefix: totals for prefix, totals in data.get("partitions", {}).items()
+                if self._is_current(totals, now)
+            }
+            logger.info(f"Loaded {len(self._partitions)} cached storage partitions from {self.cache_path}")
+        except Exception as e:
+            logger.warning(f"⚠️  Could not load storage usage cache: {e}")
+
+    def _save(self):
+        """Atomically rewrite the cache file (lock held)"""
+        if not self.cache_path:
+            return
+        try:
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"partitions": self._partitions}, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.warning(f"⚠️  Could not persist storage usage cache: {e}")
@@ -1,12 +1,22 @@
+import io
 import pytest
 import json
 import os
+from PIL import Image
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 from main import app
+from ai_backend.services.jobs import get_job_manager
 
 client = TestClient(app)
 
+
+def _jpeg_bytes(color=(200, 180, 160), size=(64, 48)):
+    """Small real JPEG (uploads are sniffed and decoded)"""
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
 # Fixture for sample room data
 @pytest.fixture
 def sample_room():
@@ -72,7 +82,7 @@ def test_furniture_fit_check_failure(sample_room):
 # ===================================================================
 # 3. Test Furniture Search (Mock Web Scraping)
 # ===================================================================
-@patch("ai_backend.services.furniture.requests.get")
+@patch("ai_backend.services.http_client.HTTPClientManager.get")
 def test_search_furniture(mock_get):
     # Mock HTML response
     mock_html = """
@@ -108,10 +118,17 @@ def test_search_furniture(mock_get):
 # ===================================================================
 # 4. Test Image Generation Endpoint (Mock Replicate & S3)
 # ===================================================================
+def _wait_for_job(job_id, timeout=5):
+    job = get_job_manager().get(job_id)
+    assert job is not None
+    assert job.wait(timeout), "job did not finish in time"
+    return job
+
+
 def test_generate_image_success(tmp_path):
     # Create dummy image file
     dummy_image_path = tmp_path / "room.jpg"
-    dummy_image_path.write_bytes(b"fake image data")
+    dummy_image_path.write_bytes(_jpeg_bytes())
 
     with open(dummy_image_path, "rb") as f:
         files = {"room_image": ("room.jpg", f, "image/jpeg")}
@@ -122,18 +139,96 @@ def test_generate_image_success(tmp_path):
         }
 
         # Mock Replicate
-        with patch("ai_backend.services.ai_generator.replicate.run") as mock_replicate:
-            mock_replicate.return_value = ["https://replicate.com/output.jpg"]
+        with patch("ai_backend.api.generation.generate_room_image") as mock_generate:
+            mock_generate.return_value = "https://replicate.delivery/output.jpg"
 
             # Mock S3 upload
-            with patch("ai_backend.services.storage.upload_to_s3") as mock_s3:
+            with patch("ai_backend.api.generation.upload_from_url") as mock_s3:
                 mock_s3.return_value = "https://s3.amazonaws.com/bucket/gen123.jpg"
 
                 response = client.post("/generation/generate", data=data, files=files)
 
-                assert response.status_code == 200
-                result = response.json()
-                assert result["generated_image_url"] == "https://s3.amazonaws.com/bucket/gen123.jpg"
+                # Generation is queued and returns immediately
+                assert response.status_code == 202
+                job_id = response.json()["job_id"]
+                _wait_for_job(job_id)
+
+    status = client.get(f"/generation/jobs/{job_id}")
+    assert status.status_code == 200
+    assert status.json()["status"] == "completed"
+
+    result = client.get(f"/generation/jobs/{job_id}/result")
+    assert result.status_code == 200
+    assert result.json()["generated_image_url"] == "https://s3.amazonaws.com/bucket/gen123.jpg"
+
+
+def test_generate_image_job_failure(tmp_path):
+    files = {"room_image": ("room.jpg", _jpeg_bytes((10, 20, 30)), "image/jpeg")}
+    data = {
+        "prompt": "Sofa on left",
+        "theme": "MINIMAL SCANDINAVIAN",
+        "furniture_links": "https://example.com/sofa"
+    }
+    with patch("ai_backend.api.generation.generate_room_image") as mock_generate:
+        mock_generate.side_effect = Exception("replicate down")
+        response = client.post("/generation/generate", data=data, files=files)
+        assert response.status_code == 202
+        job = _wait_for_job(response.json()["job_id"])
+
+    assert job.status == "failed"
+    result = client.get(f"/generation/jobs/{job.id}/result")
+    assert result.status_code == 500
+    assert "replicate down" in result.json()["detail"]
+
+
+def test_generate_image_repeat_request_is_served_from_cache():
+    data = {
+        "prompt": "Armchair by the window",
+        "theme": "BOHO ECLECTIC",
+        "furniture_links": "https://example.com/chair"
+    }
+    with patch("ai_backend.api.generation.generate_room_image") as mock_generate, \
+         patch("ai_backend.api.generation.upload_from_url") as mock_s3:
+        mock_s3.return_value = "https://s3.mock/generated/chair.jpg"
+        first = client.post("/generation/generate", data=data,
+                            files={"room_image": ("room.jpg", _jpeg_bytes((1, 2, 3)), "image/jpeg")})
+        assert first.status_code == 202
+        _wait_for_job(first.json()["job_id"])
+
+        second = client.post("/generation/generate", data=data,
+                             files={"room_image": ("room.jpg", _jpeg_bytes((1, 2, 3)), "image/jpeg")})
+
+    assert second.status_code == 200
+    assert second.json()["cached"] is True
+    assert second.json()["generated_image_url"] == "https://s3.mock/generated/chair.jpg"
+    assert mock_generate.call_count == 1
+
+
+def test_identical_requests_in_flight_share_one_job():
+    import threading
+    release = threading.Event()
+    data = {
+        "prompt": "Lamp in the corner",
+        "theme": "BOHO ECLECTIC",
+        "furniture_links": "https://example.com/lamp"
+    }
+    files = lambda: {"room_image": ("room.jpg", _jpeg_bytes((9, 8, 7)), "image/jpeg")}
+    with patch("ai_backend.api.generation.generate_room_image",
+               side_effect=lambda *a, **k: release.wait(5) and "https://r/lamp.png") as mock_generate, \
+         patch("ai_backend.api.generation.upload_from_url", return_value="https://s3.mock/generated/lamp.jpg"):
+        first = client.post("/generation/generate", data=data, files=files())
+        second = client.post("/generation/generate", data=data, files=files())
+        release.set()
+        _wait_for_job(first.json()["job_id"])
+
+    assert first.status_code == second.status_code == 202
+    assert second.json()["job_id"] == first.json()["job_id"]  # no second job holding a worker
+    assert mock_generate.call_count == 1
+
+
+def test_generation_job_not_found():
+    assert client.get("/generation/jobs/does-not-exist").status_code == 404
+    assert client.get("/generation/jobs/does-not-exist/result").status_code == 404
 
 
 def test_generate_image_missing_file():
@@ -165,13 +260,13 @@ def test_full_flow_integration(sample_room, sample_furniture, tmp_path):
         "furniture_types": ["Sofa", "Coffee Table"],
         "price_range": {"min": 100, "max": 2000}
     }
-    with patch("ai_backend.services.furniture.requests.get"):
+    with patch("ai_backend.services.http_client.HTTPClientManager.get"):
         search_resp = client.post("/furniture/search", json=search_payload)
         assert search_resp.status_code == 200
 
     # Step 4: Generate image (mocked)
     dummy_img = tmp_path / "test.jpg"
-    dummy_img.write_bytes(b"img")
+    dummy_img.write_bytes(_jpeg_bytes((90, 90, 90)))
     with open(dummy_img, "rb") as f:
         gen_data = {
             "prompt": "Sofa on left, table in center",
@@ -179,12 +274,16 @@ def test_full_flow_integration(sample_room, sample_furniture, tmp_path):
             "furniture_links": "https://example.com/1,https://example.com/2"
         }
         files = {"room_image": ("test.jpg", f, "image/jpeg")}
-        with patch("ai_backend.services.ai_generator.replicate.run"), \
-             patch("ai_backend.services.storage.upload_to_s3") as mock_s3:
+        with patch("ai_backend.api.generation.generate_room_image"), \
+             patch("ai_backend.api.generation.upload_from_url") as mock_s3:
             mock_s3.return_value = "https://s3.mock/gen.jpg"
             gen_resp = client.post("/generation/generate", data=gen_data, files=files)
-            assert gen_resp.status_code == 200
-            assert "generated_image_url" in gen_resp.json()
+            assert gen_resp.status_code == 202
+            job_id = gen_resp.json()["job_id"]
+            _wait_for_job(job_id)
+    result_resp = client.get(f"/generation/jobs/{job_id}/result")
+    assert result_resp.status_code == 200
+    assert "generated_image_url" in result_resp.json()
 
 
 # ===================================================================
@@ -0,0 +1,466 @@
+import asyncio
+import time
+
+import pytest
+from moto import mock_s3
+
+from ai_backend.services import storage
+from ai_backend.services.aws_service import (
+    AsyncAWSService, init_aws_service, get_async_aws_service, reset_aws_service
+)
+
+BUCKET = "room-designer-test"
+
+
+@pytest.fixture
+def aws():
+    """AWSService backed by a moto S3 stand-in"""
+    with mock_s3():
+        service = init_aws_service("testing", "testing", BUCKET, "us-east-1", max_concurrency=8)
+        service.create_bucket()
+        yield service
+        reset_aws_service()
+
+
+# ===================================================================
+# 1. Async S3 layer
+# ===================================================================
+def test_async_upload_download_head_list_delete(aws):
+    s3 = get_async_aws_service()
+
+    async def scenario():
+        url = await s3.upload(b"image-bytes", "generated/20250101/a.jpg")
+        assert url.endswith("generated/20250101/a.jpg")
+        assert await s3.download("generated/20250101/a.jpg") == b"image-bytes"
+        head = await s3.head("generated/20250101/a.jpg")
+        assert head["ContentLength"] == 11 and head["ContentType"] == "image/jpeg"
+        assert await s3.list("generated/") == ["generated/20250101/a.jpg"]
+        assert await s3.delete("generated/20250101/a.jpg")
+        assert await s3.head("generated/20250101/a.jpg") is None
+        assert await s3.download("generated/20250101/a.jpg") is None
+
+    asyncio.run(scenario())
+
+
+def test_pool_size_matches_concurrency_limit(aws):
+    assert aws.s3_client.meta.config.max_pool_connections == 8
+    assert get_async_aws_service().max_concurrency == 8
+
+
+def test_async_calls_are_bounded_and_overlap(aws):
+    s3 = AsyncAWSService(aws, max_concurrency=4)
+    active = {"now": 0, "peak": 0}
+
+    def slow_head(object_name):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.05)
+        active["now"] -= 1
+        return None
+
+    aws.head_file = slow_head
+
+    async def scenario():
+        start = time.perf_counter()
+        await asyncio.gather(*(s3.head(f"k{i}") for i in range(12)))
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(scenario())
+    assert active["peak"] == 4
+    assert elapsed < 12 * 0.05
+
+
+# ===================================================================
+# 2. Async storage helpers
+# ===================================================================
+def test_async_storage_helpers(aws):
+    async def scenario():
+        s3 = get_async_aws_service()
+        url = await s3.upload(b"png", "uploads/a.png", content_type="image/png", make_public=False)
+        info = await storage.get_s3_file_info_async(url)
+        assert info["exists"] and info["size"] == 3
+        assert await s3.delete("uploads/a.png")
+        assert (await storage.get_s3_file_info_async(url))["exists"] is False
+
+    asyncio.run(scenario())
+
+
+# ===================================================================
+# 3. Multipart transfer engine
+# ===================================================================
+def test_multipart_upload_from_memory_reports_progress_and_throughput(aws):
+    import io
+    from ai_backend.services.aws_service import build_transfer_config
+
+    body = b"x" * (11 * 1024 * 1024)
+    progress = []
+    config = build_transfer_config(multipart_threshold_mb=5, multipart_chunksize_mb=5, max_concurrency=3)
+
+    url = aws.upload_fileobj(
+        io.BytesIO(body), "generated/big.jpg",
+        progress_callback=lambda done, total: progress.append((done, total)),
+        transfer_config=config
+    )
+
+    assert url.endswith("generated/big.jpg")
+    # 3 parts -> multipart upload ETag has a "-<parts>" suffix
+    assert aws.head_file("generated/big.jpg")["ETag"].strip('"').endswith("-3")
+    assert progress[-1] == (len(body), len(body))
+
+    target = io.BytesIO()
+    assert aws.download_fileobj("generated/big.jpg", target, transfer_config=config)
+    assert target.getvalue() == body
+
+    stats = aws.transfer_stats()
+    assert stats["transfers"] == 2
+    assert stats["bytes"] == 2 * len(body)
+    assert stats["recent"][-1]["direction"] == "download"
+    assert stats["recent"][0]["throughput_mbps"] > 0
+
+
+def test_transfer_config_defaults_come_from_settings(aws):
+    from ai_backend.services.aws_service import (
+        AWS_S3_MULTIPART_CHUNKSIZE_MB, AWS_S3_TRANSFER_CONCURRENCY, MB
+    )
+    assert aws.transfer_config.multipart_chunksize == AWS_S3_MULTIPART_CHUNKSIZE_MB * MB
+    assert aws.transfer_config.max_concurrency == AWS_S3_TRANSFER_CONCURRENCY
+
+
+# ===================================================================
+# 4. Pagination and lifecycle sweeper
+# ===================================================================
+def _put_many(aws, prefix, count):
+    for i in range(count):
+        aws.s3_client.put_object(Bucket=BUCKET, Key=f"{prefix}{i:05d}.jpg", Body=b"12345")
+
+
+def test_iter_objects_and_list_files_paginate_past_1000(aws):
+    _put_many(aws, "generated/20240101/", 1205)
+
+    objects = list(aws.iter_objects("generated/", page_size=500))
+    assert len(objects) == 1205
+    assert set(objects[0]) == {"key", "size", "last_modified"}
+    assert len(aws.list_files("generated/")) == 1205
+    assert len(aws.list_files("generated/", max_keys=10)) == 10
+
+    assert aws.delete_folder("generated/")
+    assert aws.list_files("generated/") == []
+
+
+def test_sweeper_deletes_only_objects_older_than_cutoff(aws):
+    from datetime import datetime, timezone
+
+    _put_many(aws, "generated/old/", 1100)
+    time.sleep(1.1)
+    cutoff = datetime.now(timezone.utc)
+    # moto truncates LastModified to whole seconds
+    time.sleep(1.1)
+    _put_many(aws, "generated/new/", 5)
+
+    dry = aws.delete_older_than("generated/", cutoff, dry_run=True)
+    assert (dry["scanned"], dry["matched"], dry["deleted"]) == (1105, 1100, 0)
+    assert dry["bytes"] == 1100 * 5
+    assert len(aws.list_files("generated/")) == 1105
+
+    report = aws.delete_older_than("generated/", cutoff, workers=2)
+    assert report["deleted"] == 1100 and report["errors"] == 0
+    assert report["objects_per_second"] > 0
+    assert aws.list_files("generated/") == [f"generated/new/{i:05d}.jpg" for i in range(5)]
+
+
+def test_cleanup_old_files_uses_last_modified(aws):
+    _put_many(aws, "generated/20240101/", 3)
+    assert storage.cleanup_old_files("generated", days_old=30) == 0
+    assert storage.cleanup_old_files("generated", days_old=-1, dry_run=True) == 3
+    assert storage.cleanup_old_files("generated", days_old=-1) == 3
+    assert aws.list_files("generated/") == []
+
+
+# ===================================================================
+# 5. Incremental usage statistics
+# ===================================================================
+def test_usage_caches_sealed_day_partitions(aws):
+    from datetime import datetime
+
+    today = datetime.now().strftime("%Y%m%d")
+    _put_many(aws, "generated/20240101/", 3)
+    _put_many(aws, "generated/20240102/", 2)
+    _put_many(aws, f"generated/{today}/", 1)
+    aws.put_object("cache/generation/k.json", b"{}")
+
+    tracker = aws.usage_tracker
+    usage = tracker.usage(refresh=True)
+    assert usage["total"]["count"] == 7
+    assert usage["prefixes"]["generated/"]["count"] == 6
+    assert usage["prefixes"]["generated/"]["days"]["20240101"]["size_bytes"] == 15
+    assert usage["prefixes"]["cache/"]["count"] == 1
+    assert tracker.stats()["last_refresh"]["listed"] == 4
+
+    # Only today's and non-date partitions are listed again
+    _put_many(aws, f"generated/{today}/", 4)
+    report = tracker.refresh()
+    assert (report["listed"], report["cached"]) == (2, 2)
+    assert aws.get_bucket_size()["count"] == 10
+    assert tracker.usage(prefix="generated/")["total"]["count"] == 9
+
+    # Sweeping a sealed partition invalidates it
+    aws.delete_folder("generated/20240101/")
+    assert aws.get_bucket_size()["count"] == 7
+    assert "20240101" not in tracker.usage()["prefixes"]["generated/"]["days"]
+
+
+def test_usage_keeps_hash_shards_current_from_uploads(aws, tmp_path):
+    import io
+
+    urls = [
+        storage.upload_fileobj_to_s3(io.BytesIO(f"asset-{i}".encode()), folder="generated", file_extension=".png")
+        for i in range(5)
+    ]
+    tracker = aws.usage_tracker
+    usage = tracker.usage(refresh=True)
+    assert usage["prefixes"]["generated/"]["count"] == 5
+    shards = tracker.stats()["indexed"]
+    assert shards == len({url.split(".amazonaws.com/")[1][:13] for url in urls})
+
+    # Shards are not listed again; new uploads are counted as they happen
+    storage.upload_fileobj_to_s3(io.BytesIO(b"asset-new"), folder="generated", file_extension=".png")
+    report = tracker.refresh()
+    assert report["cached"] >= shards
+    assert report["listed"] <= 1  # only a shard that did not exist yet
+    assert tracker.usage()["prefixes"]["generated/"]["count"] == 6
+
+    # Two uploads of one new key (concurrent duplicates that both missed
+    # the HEAD, re-rendered derivatives) count once; put_object counts too
+    key = urls[0].split(".amazonaws.com/")[1]
+    for _ in range(2):
+        aws.upload_fileobj(io.BytesIO(b"variant"), key[:16] + "race/w320.webp", make_public=False)
+    assert tracker.usage()["prefixes"]["generated/"]["count"] == 7
+    aws.put_object(key[:13] + "ff/elsewhere.png", b"x")
+    assert tracker.usage()["prefixes"]["generated/"]["count"] == 8
+
+    # Deleting an asset re-lists only its shard
+    assert storage.delete_from_s3(urls[0])
+    report = tracker.refresh()
+    assert report["listed"] == 1
+    assert tracker.usage()["prefixes"]["generated/"]["count"] == 7
+    assert aws.get_bucket_size()["count"] == 7
+
+    path = tmp_path / "local.png"
+    path.write_bytes(b"local")
+    aws.upload_file(str(path), key[:13] + "ee/local.png")
+    assert aws.get_bucket_size()["count"] == 8
+
+
+def test_usage_cache_file_keeps_sealed_partitions(aws, tmp_path):
+    from ai_backend.services.storage_stats import StorageUsageTracker
+
+    _put_many(aws, "uploads/20240101/", 2)
+    path = str(tmp_path / "usage.json")
+    StorageUsageTracker(aws, cache_path=path).refresh()
+
+    restarted = StorageUsageTracker(aws, cache_path=path)
+    assert restarted.refresh()["listed"] == 0
+    assert restarted.usage()["total"]["count"] == 2
+
+
+# ===================================================================
+# 6. Presigned direct uploads
+# ===================================================================
+def _png_bytes():
+    import io
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), "white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_presigned_post_upload_lands_under_uploads(aws):
+    import requests
+
+    upload = storage.create_direct_upload("image/png", max_bytes=1024 * 1024)
+    assert upload["method"] == "POST"
+    assert upload["key"].startswith("uploads/") and upload["key"].endswith(".png")
+    assert upload["fields"]["Content-Type"] == "image/png"
+
+    body = _png_bytes()
+    response = requests.post(upload["url"], data=upload["fields"], files={"file": ("room.png", body)})
+    assert response.status_code in (200, 204)
+    assert aws.get_object_bytes(upload["key"]) == body
+
+
+def test_presigned_put_signs_type_and_length(aws):
+    upload = storage.create_direct_upload("image/jpeg", max_bytes=1024, method="put", content_length=512)
+    assert upload["method"] == "PUT"
+    assert upload["headers"] == {"Content-Type": "image/jpeg"}
+    assert "content-length%3Bcontent-type" in upload["url"]  # X-Amz-SignedHeaders
+
+    with pytest.raises(ValueError):
+        storage.create_direct_upload("image/gif", max_bytes=1024)
+    with pytest.raises(ValueError):
+        storage.create_direct_upload("image/jpeg", max_bytes=1024, method="PUT")
+    with pytest.raises(ValueError):
+        storage.create_direct_upload("image/jpeg", max_bytes=1024, content_length=2048)
+
+
+def test_generate_from_uploaded_key(aws):
+    from unittest.mock import patch
+    from fastapi.testclient import TestClient
+    from ai_backend.services.jobs import get_job_manager
+    from main import app
+
+    client = TestClient(app)
+    issued = client.post("/generation/uploads", json={"content_type": "image/png"}).json()
+    aws.put_object(issued["key"], _png_bytes(), content_type="image/png")
+    form = {"prompt": "direct sofa", "theme": "MODERN", "furniture_links": "https://x.com/direct"}
+
+    with patch("ai_backend.api.generation.generate_room_image", return_value="https://replicate.delivery/out.png") as mock_generate, \
+         patch("ai_backend.api.generation.upload_from_url", return_value="https://s3/generated/out.png"):
+        response = client.post("/generation/generate", data={**form, "image_key": issued["key"]})
+        assert response.status_code == 202
+        job = get_job_manager().get(response.json()["job_id"])
+        assert job.wait(10)
+
+    assert job.result["generated_image_url"] == "https://s3/generated/out.png"
+    assert mock_generate.call_args.args[0].startswith(b"\xff\xd8\xff")  # preprocessed to JPEG
+    assert job.metadata["image"]["source_format"] == "PNG"
+
+    assert client.post("/generation/generate", data={**form, "image_key": "generated/x.png"}).status_code == 400
+    assert client.post("/generation/generate", data={**form, "image_key": "uploads/20250101/missing.png"}).status_code == 404
+    assert client.post("/generation/generate", data=form).status_code == 400
+
+
+# ===================================================================
+# 7. Content-addressed immutable assets
+# ===================================================================
+def test_identical_assets_are_stored_once_with_immutable_headers(aws):
+    import io
+
+    first = storage.upload_fileobj_to_s3(io.BytesIO(b"same-image"), folder="generated", file_extension=".png")
+    second = storage.upload_fileobj_to_s3(io.BytesIO(b"same-image"), folder="generated", file_extension=".png")
+    assert first == second
+    assert aws.list_files("generated/") == [first.split(".amazonaws.com/")[1]]
+
+    key = first.split(".amazonaws.com/")[1]
+    head = aws.head_file(key)
+    assert head["CacheControl"] == storage.ASSET_CACHE_CONTROL
+    assert head["ContentType"] == "image/png"
+    grants = aws.s3_client.get_object_acl(Bucket=BUCKET, Key=key)["Grants"]
+    assert all("AllUsers" not in str(grant["Grantee"]) for grant in grants)
+
+
+def test_delivery_url_is_presigned_and_stable_or_cdn(aws, monkeypatch):
+    import io
+
+    url = storage.upload_fileobj_to_s3(io.BytesIO(b"deliver-me"), folder="generated", file_extension=".jpg")
+    signed = storage.delivery_url(url)
+    assert "X-Amz-Signature=" in signed
+    assert storage.delivery_url(url) == signed  # reused, so browsers can cache it
+
+    monkeypatch.setattr(storage, "ASSET_CDN_BASE_URL", "https://cdn.example.com")
+    assert storage.delivery_url(url) == "https://cdn.example.com/" + url.split(".amazonaws.com/")[1]
+    assert storage.delivery_url("https://replicate.delivery/x.png") == "https://replicate.delivery/x.png"
+
+
+def test_derivatives_are_stored_under_the_asset_id(aws, monkeypatch):
+    import io
+    from PIL import Image
+    from ai_backend.services import image_preprocess
+
+    monkeypatch.setattr(image_preprocess, "_preprocessor_instance", image_preprocess.ImagePreprocessor(workers=0))
+    monkeypatch.setattr(storage, "ASSET_CDN_BASE_URL", "https://cdn.example.com")
+    photo = io.BytesIO()
+    Image.new("RGB", (800, 600), (200, 150, 100)).save(photo, format="PNG")
+
+    url = storage.upload_fileobj_to_s3(io.BytesIO(photo.getvalue()), file_extension=".png", derivatives=True)
+    original = url.split(".amazonaws.com/")[1]
+    asset_prefix = original.rsplit(".", 1)[0] + "/"
+    stored = sorted(aws.list_files(asset_prefix))
+    assert len(stored) == len(image_preprocess.derivative_specs())
+
+    derivatives = storage.derivative_urls(url)
+    assert [d["url"] for d in derivatives] == [
+        "https://cdn.example.com/" + asset_prefix + spec["name"] for spec in image_preprocess.derivative_specs()
+    ]
+    assert sorted(d["url"].split("cdn.example.com/")[1] for d in derivatives) == stored
+    for derivative in derivatives:
+        key = derivative["url"].split("cdn.example.com/")[1]
+        head = aws.head_file(key)
+        assert (head["ContentType"], head["CacheControl"]) == (derivative["content_type"], storage.ASSET_CACHE_CONTROL)
+        image = Image.open(io.BytesIO(aws.get_object_bytes(key)))
+        assert max(image.size) == min(derivative["max_side"], 800)
+
+    assert storage.derivative_urls("https://s3/generated/out.png") == []
+
+
+def test_missing_derivatives_are_not_advertised_and_filled_on_dedupe(aws, monkeypatch):
+    import io
+    from PIL import Image
+    from ai_backend.services import image_preprocess
+
+    monkeypatch.setattr(image_preprocess, "_preprocessor_instance", image_preprocess.ImagePreprocessor(workers=0))
+    photo = io.BytesIO()
+    Image.new("RGB", (500, 400), (10, 150, 100)).save(photo, format="PNG")
+
+    # Stored before derivatives existed: nothing is advertised
+    url = storage.upload_fileobj_to_s3(io.BytesIO(photo.getvalue()), file_extension=".png")
+    assert storage.derivative_urls(url) == []
+
+    # A variant from older settings is listed as stored, not the current ones
+    asset_prefix = url.split(".amazonaws.com/")[1].rsplit(".", 1)[0] + "/"
+    aws.put_object(asset_prefix + "w200-q70.jpg", b"old", content_type="image/jpeg")
+    storage._forget_stored_derivatives(asset_prefix.split("/")[-2], "generated")
+    assert [d["name"] for d in storage.derivative_urls(url)] == ["w200-q70.jpg"]
+
+    # Generating the same image again fills in only the missing variants
+    assert storage.upload_fileobj_to_s3(io.BytesIO(photo.getvalue()), file_extension=".png", derivatives=True) == url
+    names = [d["name"] for d in storage.derivative_urls(url)]
+    assert set(names) == {"w200-q70.jpg"} | {spec["name"] for spec in image_preprocess.derivative_specs()}
+    assert names[0] == "w200-q70.jpg"
+
+
+# ===================================================================
+# 8. Object metadata
+# ===================================================================
+def test_file_info_uses_a_single_head(aws, monkeypatch):
+    import io
+
+    url = storage.upload_fileobj_to_s3(io.BytesIO(b"info-me"), folder="generated", file_extension=".png")
+    calls = []
+    original = aws.s3_client.head_object
+    monkeypatch.setattr(aws.s3_client, "head_object", lambda **kwargs: calls.append(kwargs) or original(**kwargs))
+
+    info = storage.get_s3_file_info(storage.delivery_url(url))
+    assert len(calls) == 1
+    assert (info["exists"], info["size"], info["content_type"]) == (True, 7, "image/png")
+    assert info["object_name"] == url.split(".amazonaws.com/")[1]
+    assert info["etag"] and info["last_modified"]
+    assert storage.get_s3_file_info(url.replace(".png", "0.png"))["exists"] is False
+
+
+def test_assets_info_endpoint_checks_urls_in_one_round(aws):
+    import io
+    from fastapi.testclient import TestClient
+    from ai_backend.api.generation import ASSET_INFO_MAX_URLS
+    from main import app
+
+    client = TestClient(app)
+    stored = [
+        storage.upload_fileobj_to_s3(io.BytesIO(f"gallery-{i}".encode()), folder="generated", file_extension=".jpg")
+        for i in range(3)
+    ]
+    upload = storage.upload_fileobj_to_s3(io.BytesIO(b"room"), folder="uploads", file_extension=".jpg")
+    missing = stored[0].replace(".jpg", ".webp")
+    urls = [storage.delivery_url(stored[0]), stored[1], stored[2], stored[1], missing, upload, "https://example.com/x.jpg"]
+
+    response = client.post("/generation/assets/info", json={"urls": urls})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["count"], body["found"], body["missing"]) == (7, 4, 3)
+    assert [result["url"] for result in body["results"]] == urls
+    assert [result["exists"] for result in body["results"]] == [True, True, True, True, False, False, False]
+    assert body["results"][0]["content_type"] == "image/jpeg"
+    assert "error" in body["results"][5] and "error" in body["results"][6]
+
+    too_many = {"urls": [stored[0]] * (ASSET_INFO_MAX_URLS + 1)}
+    assert client.post("/generation/assets/info", json=too_many).status_code == 400
@@ -0,0 +1,49 @@
+from unittest.mock import patch
+
+import replicate
+import requests
+
+from ai_backend.services import ai_generator
+from benchmarks.fake_replicate import FakeReplicate
+from benchmarks.run import compare, percentile, summarize
+
+
+# ===================================================================
+# 1. Report math
+# ===================================================================
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([0.2], 99) == 0.2
+    assert percentile([], 50) == 0.0
+
+
+def test_summarize_and_compare():
+    result = summarize([0.1, 0.2, 0.3, 0.4], errors=1, wall_seconds=2.0)
+    assert result["requests"] == 5 and result["errors"] == 1
+    assert result["throughput_rps"] == 2.0
+    assert result["latency_ms"]["p50"] == 200.0
+
+    baseline = {"scenarios": {"health": {"latency_ms": {"p50": 100.0, "p95": 400.0, "p99": 0}, "throughput_rps": 4.0}}}
+    delta = compare({"scenarios": {"health": result}}, baseline)["health"]
+    assert delta["p50"] == 100.0 and delta["p95"] == 0.0 and delta["p99"] is None
+    assert delta["throughput_rps"] == -50.0
+
+
+# ===================================================================
+# 2. Fake Replicate speaks the real SDK's protocol
+# ===================================================================
+def test_fake_replicate_round_trip_through_sdk():
+    with FakeReplicate(latency=0.2, output_size=64) as fake:
+        client = replicate.Client(api_token="bench", base_url=fake.url)
+        updates = []
+        with patch.object(ai_generator.replicate, "predictions", client.predictions):
+            output = ai_generator.run_prediction({"prompt": "x"}, on_progress=updates.append, poll_interval=0.02)
+
+        assert output[0].startswith(fake.url)
+        assert requests.get(output[0], timeout=5).content == fake.output
+        assert updates[-1]["status"] == "succeeded"
+        assert any(update["logs"] for update in updates)
+        assert fake.counters["created"] == 1
@@ -0,0 +1,120 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import patch
+
+from ai_backend.models import FurnitureItem, PriceRange
+from ai_backend.services.catalog_index import CatalogIndex, crawl_catalog
+from ai_backend.services.furniture import search_furniture_async
+
+
+def _item(name, price, slug):
+    return FurnitureItem(
+        name=name,
+        link=f"https://shop.example/{slug}",
+        price=price,
+        image_url=f"https://shop.example/{slug}.jpg",
+        dimensions={"width": 80, "depth": 36, "height": 34}
+    )
+
+
+def _index():
+    index = CatalogIndex(":memory:")
+    index.upsert_products("kavehome.com", "Sofa", [
+        _item("Mara 3-seater sofa", 899, "mara"),
+        _item("Compact sofa bed", 450, "compact"),
+        _item("Grand sofa", 4999, "grand"),
+    ])
+    index.upsert_products("ethnicraft.com", "Armchair / Lounge Chair", [
+        _item("Oak lounge chair with sofa cushion", 600, "oak-chair"),
+    ])
+    index.upsert_products("rh.com", "Sofa", [_item("Cloud sofa", 700, "cloud")])
+    return index
+
+
+# ===================================================================
+# 1. Indexed queries
+# ===================================================================
+def test_search_filters_domain_type_and_price():
+    results = _index().search(["kavehome.com"], ["Sofa"], PriceRange(min=400, max=1000))
+    assert [item.name for item in results] == ["Compact sofa bed", "Mara 3-seater sofa"]
+    assert results[0].dimensions == {"width": 80, "depth": 36, "height": 34}
+
+
+def test_search_ranks_exact_type_before_full_text_matches():
+    results = _index().search(["kavehome.com", "ethnicraft.com"], ["Sofa"], PriceRange(min=0, max=1000))
+    assert [item.name for item in results] == [
+        "Compact sofa bed", "Mara 3-seater sofa", "Oak lounge chair with sofa cushion"
+    ]
+
+
+def test_search_applies_top_k_and_upserts_by_link():
+    index = _index()
+    index.upsert_products("kavehome.com", "Sofa", [_item("Compact sofa bed", 300, "compact")])
+    results = index.search(["kavehome.com"], ["Sofa"], PriceRange(min=0, max=10000), limit=1)
+    assert len(results) == 1 and results[0].price == 300
+    assert len(index.search(["kavehome.com"], ["Sofa"], PriceRange(min=0, max=10000), limit=None)) == 3
+    assert index.count() == 5
+
+
+def test_search_furniture_answers_from_index():
+    with patch("ai_backend.services.furniture.get_catalog_index", return_value=_index()), \
+         patch("ai_backend.services.furniture.run_scrapers") as mock_engine:
+        results = asyncio.run(search_furniture_async(
+            "MINIMAL SCANDINAVIAN", "Living Room Furniture", ["Sofa"], PriceRange(min=0, max=1000)
+        ))
+    # rh.com is not a MINIMAL SCANDINAVIAN site
+    assert [item.name for item in results] == [
+        "Compact sofa bed", "Mara 3-seater sofa", "Oak lounge chair with sofa cushion"
+    ]
+    mock_engine.assert_not_called()
+
+
+def test_file_index_reads_on_own_connections_while_writing(tmp_path):
+    import threading
+    from ai_backend.services import catalog_index
+
+    assert not catalog_index.DEFAULT_INDEX_PATH.startswith(str(Path(catalog_index.__file__).parents[1]))
+
+    index = CatalogIndex(str(tmp_path / "index.sqlite3"))
+    index.upsert_products("kavehome.com", "Sofa", [_item("Mara 3-seater sofa", 899, "mara")])
+    errors = []
+
+    def read():
+        try:
+            for _ in range(50):
+                assert index.search(["kavehome.com"], ["Sofa"], PriceRange(min=0, max=1000))
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for t in readers:
+        t.start()
+    for i in range(50):
+        index.upsert_products("kavehome.com", "Sofa", [_item(f"Sofa {i}", 100 + i, f"s{i}")])
+    for t in readers:
+        t.join(5)
+
+    assert errors == []
+    assert index.count() == 51 and len(index._readers) >= 5  # main thread + each reader
+    index.close()
+
+
+# ===================================================================
+# 2. Crawl
+# ===================================================================
+def test_crawl_populates_index_and_prunes_stale_products():
+    index = CatalogIndex(":memory:")
+    index.upsert_products("kavehome.com", "Sofa", [_item("Discontinued sofa", 100, "gone")])
+
+    async def fake_scraper(client, furniture_type, price_range):
+        if furniture_type == "Sofa":
+            return [_item("Fresh sofa", 500, "fresh")]
+        return []
+
+    with patch("ai_backend.services.furniture.SCRAPERS", {"kavehome.com": fake_scraper}):
+        written = asyncio.run(crawl_catalog(index, deadline=5))
+
+    assert written == 1
+    results = index.search(["kavehome.com"], ["Sofa"], PriceRange(min=0, max=1000))
+    assert [item.name for item in results] == ["Fresh sofa"]
+    assert index.last_refresh > 0
@@ -0,0 +1,120 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from ai_backend.services.registry import ServiceRegistry, lazy_import
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Modules that must not load while importing the app
+HEAVY_MODULES = ("replicate", "boto3", "numpy", "httpx", "requests", "bs4")
+
+# Import cost of the app itself, on top of fastapi (milliseconds)
+COLD_START_BUDGET_MS = int(os.getenv("COLD_START_BUDGET_MS", "500"))
+
+
+def _importtime(code: str, env: dict) -> dict:
+    """Cumulative -X importtime microseconds by module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, total, name = line.split("|")
+            if total.strip().isdigit():
+                cumulative[name.strip()] = int(total)
+    return cumulative
+
+
+# ===================================================================
+# 1. Cold start
+# ===================================================================
+def test_app_import_defers_heavy_modules_and_fits_budget():
+    cumulative = _importtime("import main", dict(os.environ))
+
+    assert "main" in cumulative
+    assert [name for name in HEAVY_MODULES if name in cumulative] == []
+    own_ms = (cumulative["main"] - cumulative.get("fastapi", 0)) / 1000
+    assert own_ms < COLD_START_BUDGET_MS, f"app import took {own_ms:.0f}ms on top of fastapi"
+
+
+def test_config_import_does_not_exit_without_env():
+    env = {key: value for key, value in os.environ.items() if not key.startswith(("AWS_", "REPLICATE_"))}
+    code = "from ai_backend import config; print(config.missing_env_variables())"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0
+    assert "AWS_S3_BUCKET" in result.stdout
+
+
+# ===================================================================
+# 2. Lazy modules and the service registry
+# ===================================================================
+def test_lazy_module_loads_on_first_use():
+    json_module = lazy_import("json")
+    assert "not loaded" in repr(json_module)
+    assert json_module.loads("[1]") == [1]
+    assert "(loaded)" in repr(json_module)
+
+
+def test_registry_builds_once_and_warms_up_in_parallel():
+    registry = ServiceRegistry()
+    calls = []
+    barrier = threading.Barrier(3, timeout=5)
+
+    def factory(name):
+        def build():
+            calls.append(name)
+            barrier.wait()  # all three are being built at the same time
+            return name.upper()
+        return build
+
+    for name in ("a", "b", "c"):
+        registry.register(name, factory(name))
+    registry.register("broken", lambda: 1 / 0)
+
+    started = time.perf_counter()
+    ready = registry.warm_up()
+    assert time.perf_counter() - started < 5
+    assert set(ready) == {"a", "b", "c"}
+    assert registry.get("a") == "A"
+    assert sorted(calls) == ["a", "b", "c"]
+
+    stats = registry.stats()
+    assert (stats["registered"], stats["ready"], stats["failed"]) == (4, 3, 1)
+    assert "division by zero" in stats["services"]["broken"]["error"]
+    with pytest.raises(ZeroDivisionError):
+        registry.get("broken")
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+
+def test_aws_service_is_built_on_first_use_when_registered(monkeypatch):
+    from ai_backend.services import aws_service
+    from ai_backend.services.registry import get_service_registry, reset_service_registry
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_S3_BUCKET", "lazy-bucket")
+
+    aws_service.reset_aws_service()
+    with pytest.raises(RuntimeError):
+        aws_service.get_aws_service()
+
+    reset_service_registry()
+    try:
+        get_service_registry().register("aws", aws_service.init_aws_service_from_env)
+        service = aws_service.get_aws_service()
+        assert service.bucket_name == "lazy-bucket"
+        assert aws_service.get_async_aws_service().service is service
+    finally:
+        reset_service_registry()
+        aws_service.reset_aws_service()
@@ -0,0 +1,156 @@
+import time
+
+from fastapi.testclient import TestClient
+
+import numpy as np
+
+from ai_backend.models import FurnitureSelection, PlacedFurniture, RoomDimensions
+from ai_backend.services.dimension import (
+    check_collision, check_furniture_fit, check_furniture_fit_batch, check_layout,
+    footprint, smallest_removals
+)
+from main import app
+
+client = TestClient(app)
+
+ROOM = RoomDimensions(length=15, width=12)
+
+
+def _place(x, y, width=36, depth=24, rotation=0):
+    return PlacedFurniture(type="Table", subtype="Test", width=width, depth=depth, x=x, y=y, rotation=rotation)
+
+
+# ===================================================================
+# 1. Geometry
+# ===================================================================
+def test_rotated_footprint_swaps_extents():
+    corners = footprint(_place(5, 5, width=72, depth=36, rotation=90))
+    xs = sorted(round(x, 6) for x, _ in corners)
+    ys = sorted(round(y, 6) for _, y in corners)
+    assert (xs[0], xs[-1]) == (3.5, 6.5)
+    assert (ys[0], ys[-1]) == (2.0, 8.0)
+
+
+def test_overlap_boundary_and_clearance():
+    layout = [
+        _place(2, 2),                 # 3x2 ft at the back-left corner
+        _place(4, 2),                 # overlaps the first piece
+        _place(10, 2),                # 3 ft gap to the second: clear
+        _place(14.5, 6),              # pokes past the right wall
+        _place(10, 4.5),              # 0.5 ft in front of the third piece
+    ]
+    report = check_layout(ROOM, layout)
+
+    assert report["valid"] is False
+    assert report["collisions"] == [{"a": 0, "b": 1}]
+    assert report["out_of_bounds"] == [3]
+    warned = {(w["a"], w["b"]): w["distance_ft"] for w in report["clearance_warnings"]}
+    assert warned[(2, 4)] == 0.5
+    assert (1, 2) not in warned
+
+
+def test_touching_pieces_do_not_collide():
+    assert check_collision([_place(2, 2), _place(5, 2)]) is True
+    assert check_collision([_place(2, 2), _place(4.9, 2)]) is False
+    # 45 degree rotation clears an axis-aligned bounding-box overlap
+    assert check_collision([_place(3, 3, 24, 24, rotation=45), _place(4.9, 4.9, 24, 24)]) is True
+
+
+def test_dozens_of_items_check_quickly():
+    layout = [_place(1.5 + (i % 8) * 1.7, 1 + (i // 8) * 1.4, width=18, depth=12) for i in range(48)]
+    check_layout(RoomDimensions(length=15, width=12), layout)
+    started = time.perf_counter()
+    for _ in range(20):
+        report = check_layout(RoomDimensions(length=15, width=12), layout)
+    assert report["valid"] is True
+    assert (time.perf_counter() - started) / 20 < 0.05
+
+
+# ===================================================================
+# 2. Batch fit-check
+# ===================================================================
+OVERSIZED = [
+    {"type": "Sofa", "subtype": "Sectional Sofa (U-Shape)", "width": 130, "depth": 95},  # 85.8 sq ft
+    {"type": "TV Stand", "subtype": "Large", "width": 66, "depth": 18},                 # 8.3 sq ft
+    {"type": "Bed", "subtype": "Queen", "width": 80, "depth": 60},                      # 33.3 sq ft
+    {"type": "Chair", "subtype": "Accent", "width": 30, "depth": 30},                   # 6.3 sq ft
+]
+COMFORTABLE = [
+    {"type": "Sofa", "subtype": "3-Seater Sofa", "width": 84, "depth": 36},
+    {"type": "Coffee Table", "subtype": "Rectangular", "width": 48, "depth": 24},
+]
+
+
+def test_batch_matches_single_fit_check():
+    sets = [[FurnitureSelection(**item) for item in items] for items in (COMFORTABLE, OVERSIZED, [])]
+    results = check_furniture_fit_batch(ROOM, sets)
+
+    for furnitures, result in zip(sets, results):
+        fits, message = check_furniture_fit(ROOM, furnitures)
+        assert (result["fits"], result["message"]) == (fits, message)
+    assert results[0]["removals"]["fit"]["remove"] == []
+    assert results[2]["usage_percent"] == 0
+
+
+def test_smallest_removals_prefer_keeping_more_furniture():
+    sets = [[FurnitureSelection(**item) for item in OVERSIZED]]
+    removals = check_furniture_fit_batch(ROOM, sets)[0]["removals"]
+
+    # Dropping the bed is enough for 60%; the sectional also works but removes more
+    assert removals["fit"]["remove"] == [2]
+    assert removals["fit"]["remove_items"] == ["Bed - Queen"]
+    assert removals["fit"]["alternatives"] == [[0]]
+    assert removals["comfortable"]["remove"] == [0]
+
+
+def test_large_sets_fall_back_to_largest_first():
+    areas = np.array([10.0] * 20)
+    assert smallest_removals(areas, 108) == [list(range(10))]
+    assert smallest_removals(areas, 500) == [[]]
+
+
+# ===================================================================
+# 3. Endpoints
+# ===================================================================
+def test_batch_fit_check_endpoint():
+    payload = {"room": {"length": 15, "width": 12}, "sets": [COMFORTABLE, OVERSIZED]}
+    response = client.post("/room/fit-check/batch", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["room_sqft"] == 180
+    assert [r["fits"] for r in data["results"]] == [True, False]
+    assert data["results"][1]["removals"]["fit"]["remove"] == [2]
+
+def test_fit_check_batch_rejects_oversized_sets():
+    from ai_backend.api.room import FIT_CHECK_BATCH_MAX_SETS
+    from ai_backend.services.dimension import EXHAUSTIVE_REMOVAL_LIMIT
+
+    item = {"type": "Chair", "subtype": "Side", "width": 20, "depth": 20}
+    room = {"length": 15, "width": 12}
+    too_many_items = {"room": room, "sets": [[item] * (EXHAUSTIVE_REMOVAL_LIMIT + 1)]}
+    assert client.post("/room/fit-check/batch", json=too_many_items).status_code == 422
+    too_many_sets = {"room": room, "sets": [[item]] * (FIT_CHECK_BATCH_MAX_SETS + 1)}
+    assert client.post("/room/fit-check/batch", json=too_many_sets).status_code == 422
+    at_limit = {"room": room, "sets": [[item] * EXHAUSTIVE_REMOVAL_LIMIT]}
+    assert client.post("/room/fit-check/batch", json=at_limit).status_code == 200
+
+
+def test_fit_check_batch_rejects_empty_and_negative_rooms():
+    item = {"type": "Chair", "subtype": "Side", "width": 20, "depth": 20}
+    for room in ({"length": 0, "width": 10}, {"length": -5, "width": 10}):
+        response = client.post("/room/fit-check/batch", json={"room": room, "sets": [[item]]})
+        assert response.status_code == 422
+
+def test_layout_check_endpoint():
+    payload = {
+        "room": {"length": 15, "width": 12},
+        "furnitures": [
+            {"type": "Sofa", "subtype": "3-Seater", "width": 84, "depth": 36, "x": 4, "y": 1.5},
+            {"type": "Coffee Table", "subtype": "Rect", "width": 48, "depth": 24, "x": 4, "y": 6, "rotation": 0},
+        ],
+    }
+    response = client.post("/room/layout-check", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["valid"] is True
+    assert data["clearance_warnings"] == [{"a": 0, "b": 1, "distance_ft": 2.0}]
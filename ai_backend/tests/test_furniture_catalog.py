@@ -0,0 +1,80 @@
+from fastapi.testclient import TestClient
+
+from ai_backend.models import FurnitureSelection
+from ai_backend.services.dimension import get_furniture_dimensions
+from ai_backend.services.furniture_catalog import (
+    FurnitureCatalog, get_furniture_catalog, resolve_selections
+)
+from main import app
+
+client = TestClient(app)
+
+
+# ===================================================================
+# 1. Compiled catalog
+# ===================================================================
+def test_catalog_is_flat_indexed_and_precomputed():
+    catalog = get_furniture_catalog()
+    entry = catalog.get("living-room-furniture/sofa/3-seater-sofa")
+
+    assert entry is catalog.lookup("Sofa", "3-Seater Sofa", "Living Room Furniture")
+    assert (entry.width, entry.depth, entry.sqft) == (84, 36, 21)
+    assert "Sofa" in catalog.furniture_types()
+    assert get_furniture_dimensions("Living Room Furniture", "Sofa", "3-Seater Sofa") == {
+        "width": 84, "depth": 36, "height": 34
+    }
+    assert get_furniture_dimensions("Living Room Furniture", "Sofa", "Nope") is None
+
+
+def test_catalog_entries_are_immutable():
+    catalog = FurnitureCatalog({"Room": {"Desk": {"Small": {"width": 40, "depth": 20}}}})
+    entry = catalog.get("room/desk/small")
+    try:
+        entry.width = 1
+        assert False, "entry should be frozen"
+    except AttributeError:
+        pass
+    assert entry.height is None
+
+
+def test_resolve_selections_fills_missing_dimensions():
+    sent = FurnitureSelection(type="Coffee Table", subtype="Square", width=30, depth=30)
+    looked_up = FurnitureSelection(type="Sofa", subtype="3-Seater Sofa")
+    resolved = resolve_selections([sent, looked_up], "Living Room Furniture")
+
+    assert resolved[0] is sent
+    assert (resolved[1].width, resolved[1].depth, resolved[1].height) == (84, 36, 34)
+    assert looked_up.width is None
+
+
+# ===================================================================
+# 2. Endpoints
+# ===================================================================
+def test_catalog_endpoint_supports_etag_revalidation():
+    response = client.get("/furniture/catalog")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert "max-age" in response.headers["cache-control"]
+    assert "3-Seater Sofa" in [
+        item["subtype"] for item in response.json()["rooms"]["Living Room Furniture"]["Sofa"]
+    ]
+
+    cached = client.get("/furniture/catalog", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+def test_fit_check_resolves_dimensions_server_side():
+    payload = {
+        "room": {"length": 15, "width": 12},
+        "room_type": "Living Room Furniture",
+        "furnitures": [{"type": "Sofa", "subtype": "3-Seater Sofa"}, {"type": "Coffee Table", "subtype": "Square"}],
+    }
+    response = client.post("/room/fit-check", json=payload)
+    assert response.status_code == 200
+    assert "16.7%" in response.json()["message"]
+
+    payload["furnitures"] = [{"type": "Sofa", "subtype": "Made Up"}]
+    response = client.post("/room/fit-check", json=payload)
+    assert response.status_code == 400
+    assert "Unknown furniture" in response.json()["detail"]
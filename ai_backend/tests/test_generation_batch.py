@@ -0,0 +1,135 @@
+import io
+import json
+import threading
+import time
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from ai_backend.services.jobs import get_job_manager
+from main import app
+
+client = TestClient(app)
+
+
+def _jpeg_bytes(color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (1600, 1200), color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def _variants(*themes):
+    return json.dumps([
+        {"theme": theme, "prompt": f"{theme.lower()} sofa", "furniture_links": [f"https://x.com/{i}"]}
+        for i, theme in enumerate(themes)
+    ])
+
+
+# ===================================================================
+# 1. Fan-out
+# ===================================================================
+def test_batch_preprocesses_once_and_runs_variants_concurrently():
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+    inputs = []
+
+    def slow_generate(image, prompt, theme, links, on_progress=None):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+            inputs.append(image)
+        time.sleep(0.2)
+        with lock:
+            active["now"] -= 1
+        return f"https://replicate.delivery/{theme}.png"
+
+    files = {"room_image": ("room.jpg", _jpeg_bytes((10, 60, 90)), "image/jpeg")}
+    data = {"variants": _variants("MODERN LIVING", "BOHO ECLECTIC", "TIMELESS LUXURY")}
+    with patch("ai_backend.api.generation.generate_room_image", side_effect=slow_generate), \
+         patch("ai_backend.api.generation.upload_from_url", side_effect=lambda url, folder, **kwargs: url.replace("replicate", "s3")), \
+         patch("ai_backend.services.image_preprocess.ImagePreprocessor.preprocess_async",
+               return_value=(b"preprocessed", {"bytes_out": 12})) as mock_pre:
+        started = time.perf_counter()
+        response = client.post("/generation/batch", data=data, files=files)
+        assert response.status_code == 202
+        variants = response.json()["variants"]
+        for variant in variants:
+            assert get_job_manager().get(variant["job_id"]).wait(5)
+        elapsed = time.perf_counter() - started
+
+    assert mock_pre.call_count == 1
+    assert len(set(inputs)) == 1
+    assert active["peak"] > 1
+    assert elapsed < 0.55  # closer to one variant than to three
+    result = client.get(variants[1]["result_url"]).json()
+    assert result["generated_image_url"] == "https://s3.delivery/BOHO ECLECTIC.png"
+
+
+def test_batch_stream_yields_results_as_they_finish():
+    def generate(image, prompt, theme, links, on_progress=None):
+        time.sleep(0.3 if theme == "MODERN LIVING" else 0.01)
+        if theme == "BOHO ECLECTIC":
+            raise Exception("model error")
+        return f"https://replicate.delivery/{theme}.png"
+
+    files = {"room_image": ("room.jpg", _jpeg_bytes((200, 10, 10)), "image/jpeg")}
+    data = {"variants": _variants("MODERN LIVING", "BOHO ECLECTIC", "MODERN MEDITERRANEAN"), "stream": "true"}
+    with patch("ai_backend.api.generation.generate_room_image", side_effect=generate), \
+         patch("ai_backend.api.generation.upload_from_url", side_effect=lambda url, folder, **kwargs: url):
+        response = client.post("/generation/batch", data=data, files=files)
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[-1]["done"] is True
+    assert (lines[-1]["completed"], lines[-1]["failed"]) == (2, 1)
+    # The slow variant arrives last
+    assert lines[-2]["theme"] == "MODERN LIVING" and lines[-2]["status"] == "completed"
+    failed = next(line for line in lines if line.get("theme") == "BOHO ECLECTIC")
+    assert "model error" in failed["error"]
+
+
+# ===================================================================
+# 2. Validation and cache
+# ===================================================================
+def test_batch_validates_variants():
+    files = {"room_image": ("room.jpg", _jpeg_bytes((0, 0, 0)), "image/jpeg")}
+    assert client.post("/generation/batch", data={"variants": "not json"}, files=files).status_code == 400
+    assert client.post("/generation/batch", data={"variants": "[]"}, files=files).status_code == 400
+    too_many = _variants(*(["MODERN LIVING"] * 11))
+    assert client.post("/generation/batch", data={"variants": too_many}, files=files).status_code == 400
+
+
+def test_batch_applies_upload_checks():
+    from ai_backend.utils.uploads import MAX_IMAGE_UPLOAD_BYTES
+
+    data = {"variants": _variants("MODERN LIVING")}
+    not_image = {"room_image": ("room.jpg", _jpeg_bytes((0, 0, 0)), "text/plain")}
+    assert client.post("/generation/batch", data=data, files=not_image).status_code == 400
+
+    huge = {"room_image": ("room.jpg", b"\xff\xd8\xff" + b"\0" * (MAX_IMAGE_UPLOAD_BYTES + 1), "image/jpeg")}
+    response = client.post("/generation/batch", data=data, files=huge)
+    assert response.status_code == 413
+    assert "Image too large" in response.json()["detail"]
+
+    headers = {"content-length": str(2 * MAX_IMAGE_UPLOAD_BYTES)}
+    response = client.post("/generation/batch", content=b"", headers=headers)
+    assert response.status_code == 413
+    assert "Request body exceeds" in response.json()["detail"]  # refused before parsing
+
+
+def test_batch_serves_cached_variants_without_jobs():
+    image = _jpeg_bytes((5, 5, 5))
+    data = {"variants": _variants("BOHO ECLECTIC")}
+    with patch("ai_backend.api.generation.generate_room_image", return_value="https://r/x.png") as mock_generate, \
+         patch("ai_backend.api.generation.upload_from_url", return_value="https://s3/x.png"):
+        first = client.post("/generation/batch", data=data, files={"room_image": ("r.jpg", image, "image/jpeg")})
+        get_job_manager().get(first.json()["variants"][0]["job_id"]).wait(5)
+        with patch("ai_backend.utils.uploads.IngestedUpload.read_bytes") as mock_read:
+            second = client.post("/generation/batch", data=data, files={"room_image": ("r.jpg", image, "image/jpeg")})
+
+    assert second.status_code == 200
+    variant = second.json()["variants"][0]
+    assert variant["status"] == "completed" and variant["result"]["cached"] is True
+    mock_read.assert_not_called()  # the spooled photo is never loaded for cache hits
+    assert mock_generate.call_count == 1
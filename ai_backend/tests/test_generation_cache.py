@@ -0,0 +1,115 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from ai_backend.services.generation_cache import (
+    GenerationCache, LocalCacheIndex, compute_cache_key
+)
+
+
+# ===================================================================
+# 1. Cache key
+# ===================================================================
+def test_cache_key_ignores_link_order_and_prompt_whitespace():
+    a = compute_cache_key("img", "Sofa  on the LEFT", "modern living", ["https://b", "https://a"])
+    b = compute_cache_key("img", " sofa on the left ", "MODERN LIVING", ["https://a", "https://b"])
+    assert a == b
+
+
+def test_cache_key_changes_with_inputs():
+    base = compute_cache_key("img", "sofa", "MODERN LIVING", ["https://a"])
+    assert base != compute_cache_key("img2", "sofa", "MODERN LIVING", ["https://a"])
+    assert base != compute_cache_key("img", "sofa", "BOHO ECLECTIC", ["https://a"])
+    assert base != compute_cache_key("img", "sofa", "MODERN LIVING", ["https://a"], params={"strength": 0.8})
+
+
+# ===================================================================
+# 2. Index eviction / TTL / persistence
+# ===================================================================
+def test_local_index_evicts_least_recently_used():
+    index = LocalCacheIndex(max_entries=2)
+    index.put("a", {"url": "A"})
+    index.put("b", {"url": "B"})
+    index.get("a")
+    index.put("c", {"url": "C"})
+    assert index.get("b") is None
+    assert index.get("a") and index.get("c")
+
+
+def test_expired_entries_are_dropped():
+    cache = GenerationCache(LocalCacheIndex(), ttl_seconds=60)
+    cache.index.put("k", {"url": "old", "created_at": time.time() - 120})
+    assert cache.get("k") is None
+    assert cache.index.get("k") is None
+
+
+def test_local_index_persists_to_file(tmp_path):
+    path = str(tmp_path / "index.json")
+    LocalCacheIndex(path).put("k", {"url": "https://s3/generated/x.jpg", "created_at": time.time()})
+    assert LocalCacheIndex(path).get("k")["url"] == "https://s3/generated/x.jpg"
+
+
+def test_local_index_appends_and_compacts_journal(tmp_path):
+    path = tmp_path / "index.json"
+    index = LocalCacheIndex(str(path))
+    index.MIN_COMPACT_LINES = 4
+    index.put("a", {"url": "A"})
+    index.put("b", {"url": "B"})
+    index.delete("a")
+    assert len(path.read_text().splitlines()) == 3  # one line per write, no rewrite
+
+    index.put("b", {"url": "B2"})
+    index.put("c", {"url": "C"})  # journal full: compacted to the live entries
+    assert len(path.read_text().splitlines()) == 2
+    reloaded = LocalCacheIndex(str(path))
+    assert reloaded.get("a") is None and reloaded.get("b")["url"] == "B2" and reloaded.get("c")["url"] == "C"
+
+
+# ===================================================================
+# 3. Singleflight
+# ===================================================================
+def test_concurrent_identical_requests_share_one_computation():
+    cache = GenerationCache(LocalCacheIndex())
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(2)
+        return "https://s3/generated/shared.jpg"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join(2)
+
+    assert len(calls) == 1
+    assert [url for url, _ in results] == ["https://s3/generated/shared.jpg"] * 5
+    assert sum(1 for _, cached in results if not cached) == 1
+    assert cache.get_or_compute("key", compute) == ("https://s3/generated/shared.jpg", True)
+
+
+def test_counted_requests_are_not_counted_twice_and_followers_time_out():
+    cache = GenerationCache(LocalCacheIndex(), wait_seconds=0.05)
+    assert cache.lookup("key") is None  # endpoint lookup: the one counted miss
+    assert cache.get_or_compute("key", lambda: "https://s3/generated/x.jpg", counted=True)[1] is False
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (0, 1)
+
+    started = threading.Event()
+    leader = threading.Thread(
+        target=cache.get_or_compute, args=("slow", lambda: started.set() or time.sleep(0.5) or "u")
+    )
+    leader.start()
+    started.wait(1)
+    with pytest.raises(TimeoutError):
+        cache.get_or_compute("slow", lambda: "never")
+    leader.join(2)
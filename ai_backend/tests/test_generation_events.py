@@ -0,0 +1,140 @@
+import io
+import json
+import threading
+from unittest.mock import patch, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from ai_backend.services import ai_generator
+from ai_backend.services.jobs import JobManager, get_job_manager
+from main import app
+
+client = TestClient(app)
+
+
+def _jpeg_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 600), "white").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def _parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            events.append({"id": int(fields["id"]), "event": fields["event"], "data": json.loads(fields["data"])})
+    return events
+
+
+# ===================================================================
+# 1. Prediction polling
+# ===================================================================
+def test_run_prediction_reports_status_and_new_log_lines():
+    prediction = MagicMock(id="pred-1", output=["https://replicate.delivery/out.png"], error=None, progress=None)
+    states = iter([
+        ("starting", ""),
+        ("processing", "step 1/30\n"),
+        ("processing", "step 1/30\nstep 2/30\n"),
+        ("succeeded", "step 1/30\nstep 2/30\n"),
+    ])
+
+    def advance():
+        prediction.status, prediction.logs = next(states)
+
+    advance()
+    prediction.reload.side_effect = advance
+    updates = []
+
+    with patch.object(ai_generator.replicate.predictions, "create", return_value=prediction):
+        output = ai_generator.run_prediction({"prompt": "x"}, on_progress=updates.append, poll_interval=0)
+
+    assert output == ["https://replicate.delivery/out.png"]
+    assert [(u["status"], u["logs"]) for u in updates] == [
+        ("starting", []),
+        ("processing", ["step 1/30"]),
+        ("processing", ["step 2/30"]),
+        ("succeeded", []),
+    ]
+
+
+def test_run_prediction_raises_on_failure_and_cancels_on_timeout():
+    failed = MagicMock(id="pred-2", status="failed", logs="", error="NSFW content", progress=None)
+    with patch.object(ai_generator.replicate.predictions, "create", return_value=failed):
+        with pytest.raises(Exception, match="NSFW"):
+            ai_generator.run_prediction({}, poll_interval=0)
+
+    stuck = MagicMock(id="pred-3", status="processing", logs="", progress=None)
+    with patch.object(ai_generator.replicate.predictions, "create", return_value=stuck):
+        with pytest.raises(Exception, match="timed out"):
+            ai_generator.run_prediction({}, poll_interval=0, timeout=0)
+    stuck.cancel.assert_called_once()
+
+
+# ===================================================================
+# 2. Job event log
+# ===================================================================
+def test_job_events_record_lifecycle_and_notify_listeners():
+    manager = JobManager(max_workers=1)
+    release = threading.Event()
+    seen = []
+
+    def work(job):
+        release.wait(5)
+        manager.set_stage(job, "uploading")
+        return {"url": "https://s3/x.png"}
+
+    job = manager.submit("test", work)
+    job.subscribe(seen.append)
+    release.set()
+    assert job.wait(5)
+    manager.shutdown()
+
+    events = job.events_since(0)
+    assert events[0]["data"]["status"] == "queued"
+    assert events[-1]["data"] == {"status": "completed", "stage": "completed", "result": {"url": "https://s3/x.png"}}
+    assert [e["id"] for e in events] == sorted(e["id"] for e in events)
+    assert seen[-1] is events[-1]
+    assert job.events_since(events[-2]["id"]) == [events[-1]]
+
+
+# ===================================================================
+# 3. SSE endpoint
+# ===================================================================
+def _fake_generate(image, prompt, theme, links, on_progress=None):
+    on_progress({"status": "starting", "logs": [], "progress": None})
+    on_progress({"status": "processing", "logs": ["step 15/30"], "progress": 0.5})
+    return "https://replicate.delivery/out.png"
+
+
+def test_events_stream_pushes_stages_and_final_url():
+    with patch("ai_backend.api.generation.generate_room_image", side_effect=_fake_generate), \
+         patch("ai_backend.api.generation.upload_from_url", return_value="https://s3/generated/out.png"):
+        created = client.post(
+            "/generation/generate",
+            files={"room_image": ("room.jpg", _jpeg_bytes(), "image/jpeg")},
+            data={"prompt": "sse sofa", "theme": "MODERN", "furniture_links": "https://x.com/sse"}
+        ).json()
+        assert created["events_url"] == f"/generation/jobs/{created['job_id']}/events"
+
+        response = client.get(created["events_url"])
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    stages = [e["data"]["stage"] for e in events if e["event"] == "stage"]
+    assert stages == ["preprocessing", "generating", "starting", "processing", "uploading"]
+    log = next(e for e in events if e["event"] == "log")
+    assert log["data"]["lines"] == ["step 15/30"] and log["data"]["progress"] == 0.5
+    assert events[-1]["event"] == "status"
+    assert events[-1]["data"]["result"]["generated_image_url"] == "https://s3/generated/out.png"
+
+    # Resume after the last seen id only replays the tail
+    resumed = _parse_sse(client.get(created["events_url"], headers={"Last-Event-ID": str(events[-2]["id"])}).text)
+    assert [e["id"] for e in resumed] == [events[-1]["id"]]
+
+
+def test_events_stream_unknown_job():
+    assert client.get("/generation/jobs/missing/events").status_code == 404
@@ -0,0 +1,88 @@
+import asyncio
+from unittest.mock import patch, MagicMock
+
+import httpx
+import pytest
+import requests
+
+from ai_backend.services.http_client import HTTPClientManager
+
+
+def _manager(handler, **options):
+    options.setdefault("backoff_base", 0)
+    return HTTPClientManager(transport=httpx.MockTransport(handler), **options)
+
+
+# ===================================================================
+# 1. Async client retries
+# ===================================================================
+def test_retries_transient_status_then_succeeds():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503 if len(calls) < 3 else 200, text="ok")
+
+    manager = _manager(handler, max_retries=3)
+    response = asyncio.run(manager.get("https://shop.example/sofas"))
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+    stats = manager.stats()
+    assert stats["requests"] == 3 and stats["retries"] == 2
+
+
+def test_gives_up_after_max_retries():
+    manager = _manager(lambda request: httpx.Response(429), max_retries=2)
+    response = asyncio.run(manager.get("https://shop.example/sofas"))
+    assert response.status_code == 429
+    assert manager.stats()["requests"] == 3
+
+
+def test_transport_errors_are_retried_then_raised():
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    manager = _manager(handler, max_retries=1)
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(manager.get("https://shop.example/sofas"))
+    assert manager.stats()["errors"] == 1
+
+
+def test_per_host_connection_cap():
+    active = {"now": 0, "peak": 0}
+
+    async def handler(request):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.02)
+        active["now"] -= 1
+        return httpx.Response(200)
+
+    manager = _manager(handler, per_host_limit=2)
+
+    async def burst():
+        await asyncio.gather(*(manager.get("https://shop.example/p") for _ in range(8)))
+
+    asyncio.run(burst())
+    assert active["peak"] == 2
+
+
+def test_backoff_is_jittered_and_capped():
+    manager = HTTPClientManager(backoff_base=1, backoff_max=4)
+    delays = [manager._backoff(5) for _ in range(50)]
+    assert all(0 <= delay <= 4 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+# ===================================================================
+# 2. Sync session
+# ===================================================================
+def test_sync_request_retries_connection_errors():
+    manager = HTTPClientManager(backoff_base=0, max_retries=2)
+    ok = MagicMock(status_code=200)
+    with patch.object(manager.session, "request",
+                      side_effect=[requests.ConnectionError("reset"), ok]) as mock_request:
+        assert manager.get_sync("https://replicate.delivery/out.png") is ok
+    assert mock_request.call_count == 2
+    assert mock_request.call_args.kwargs["timeout"] == manager.sync_timeout
@@ -0,0 +1,104 @@
+import asyncio
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from ai_backend.services.image_preprocess import (
+    ImagePreprocessor, derivative_specs, preprocess_image, render_derivatives, sniff_image_format
+)
+from main import app
+
+client = TestClient(app)
+
+
+def _encode(image, image_format, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+# ===================================================================
+# 1. Format sniffing and preprocessing
+# ===================================================================
+def test_sniff_uses_magic_bytes():
+    image = Image.new("RGB", (8, 8))
+    assert sniff_image_format(_encode(image, "JPEG")) == "JPEG"
+    assert sniff_image_format(_encode(image, "PNG")) == "PNG"
+    assert sniff_image_format(_encode(image, "WEBP")) == "WEBP"
+    assert sniff_image_format(b"GIF89a....") is None
+    assert sniff_image_format(b"<html>") is None
+
+
+def test_large_jpeg_is_oriented_and_downscaled():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # orientation: rotate 90 degrees clockwise
+    photo = _encode(Image.new("RGB", (3000, 2000), (120, 90, 60)), "JPEG", quality=95, exif=exif)
+
+    body, info = preprocess_image(photo, max_side=1024, quality=85)
+
+    output = Image.open(io.BytesIO(body))
+    assert output.format == "JPEG"
+    assert output.size == (683, 1024)  # upright portrait, long side at model resolution
+    assert info["source_format"] == "JPEG"
+    assert info["source_size"] == [3000, 2000]
+    assert info["bytes_out"] == len(body) < info["bytes_in"]
+
+
+def test_transparent_png_is_flattened_to_rgb_jpeg():
+    png = _encode(Image.new("RGBA", (40, 20), (0, 0, 0, 0)), "PNG")
+    body, info = preprocess_image(png)
+    output = Image.open(io.BytesIO(body))
+    assert (output.mode, output.size) == ("RGB", (40, 20))
+    assert output.getpixel((5, 5))[0] > 240  # white background
+
+
+def test_invalid_images_are_rejected():
+    with pytest.raises(ValueError):
+        preprocess_image(b"not an image")
+    with pytest.raises(ValueError):
+        preprocess_image(b"\xff\xd8\xff" + b"\x00" * 100)  # JPEG header, corrupt body
+
+
+def test_process_pool_runs_preprocessing():
+    preprocessor = ImagePreprocessor(workers=1)
+    photo = _encode(Image.new("RGB", (2048, 1536)), "JPEG")
+    try:
+        body, info = preprocessor.preprocess(photo)
+        assert info["size"] == [1024, 768]
+        body_async, _ = asyncio.run(preprocessor.preprocess_async(photo))
+        assert body_async == body
+        with pytest.raises(ValueError):
+            preprocessor.preprocess(b"nope")
+    finally:
+        preprocessor.shutdown()
+
+    stats = preprocessor.stats()
+    assert (stats["images"], stats["failed"]) == (2, 1)
+
+
+def test_derivatives_are_progressive_and_never_upscaled():
+    specs = derivative_specs(sizes=(320, 640, 4096), webp_quality=75, jpeg_quality=80)
+    assert [spec["name"] for spec in specs[:2]] == ["w320-q75.webp", "w320-q80.jpg"]
+
+    rendered = dict(render_derivatives(_encode(Image.new("RGBA", (1200, 900)), "PNG"), specs))
+    assert set(rendered) == {spec["name"] for spec in specs}
+    for name, size in (("w320-q75.webp", (320, 240)), ("w640-q80.jpg", (640, 480)), ("w4096-q80.jpg", (1200, 900))):
+        output = Image.open(io.BytesIO(rendered[name]))
+        assert output.size == size
+    jpeg = Image.open(io.BytesIO(rendered["w640-q80.jpg"]))
+    assert jpeg.format == "JPEG" and jpeg.info.get("progressive")
+    assert Image.open(io.BytesIO(rendered["w320-q75.webp"])).format == "WEBP"
+    with pytest.raises(ValueError):
+        render_derivatives(b"nope", specs)
+
+
+# ===================================================================
+# 2. Endpoint
+# ===================================================================
+def test_generate_rejects_non_image_with_image_content_type():
+    data = {"prompt": "sofa", "theme": "MODERN LIVING", "furniture_links": "https://example.com/sofa"}
+    files = {"room_image": ("room.jpg", b"<?php echo 'hi'; ?>", "image/jpeg")}
+    response = client.post("/generation/generate", data=data, files=files)
+    assert response.status_code == 400
@@ -0,0 +1,59 @@
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from ai_backend.services import metrics
+from main import app
+
+client = TestClient(app)
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+# ===================================================================
+# 1. Recording helpers
+# ===================================================================
+def test_stage_timer_records_histogram_even_on_error():
+    before = _sample("room_designer_stage_seconds_count", pipeline="unit", stage="boom")
+    with pytest.raises(RuntimeError):
+        with metrics.stage_timer("unit", "boom"):
+            raise RuntimeError("x")
+    assert _sample("room_designer_stage_seconds_count", pipeline="unit", stage="boom") == before + 1
+
+
+def test_server_timing_header_merges_repeated_stages():
+    header = metrics.server_timing_header([("resolve", 0.001), ("check", 0.002), ("resolve", 0.003)], 0.01)
+    assert header == "resolve;dur=4.0, check;dur=2.0, total;dur=10.0"
+
+
+def test_gauge_sources_export_numeric_fields():
+    metrics.register_gauge_source("unit_pool", lambda: {"running": 3, "enabled": True, "by_host": {}})
+    assert _sample("room_designer_unit_pool_running") == 3
+    assert REGISTRY.get_sample_value("room_designer_unit_pool_enabled") is None
+
+
+# ===================================================================
+# 2. HTTP integration
+# ===================================================================
+def test_requests_carry_server_timing_with_pipeline_stages():
+    response = client.post("/room/fit-check", json={
+        "room": {"length": 20, "width": 15, "height": 9},
+        "furnitures": [{"type": "Sofa", "subtype": "3-Seater Sofa", "width": 7, "depth": 3}],
+    })
+    names = [part.split(";")[0] for part in response.headers["server-timing"].split(", ")]
+    assert names == ["resolve", "check", "total"]
+
+
+def test_metrics_endpoint_exposes_route_latency_and_errors():
+    client.get("/generation/jobs/unknown-id")
+    metrics.record_retry("http")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "server-timing" not in response.headers
+    body = response.text
+    assert 'route="/generation/jobs/{job_id}",status="404"' in body
+    assert 'room_designer_retries_total{service="http"}' in body
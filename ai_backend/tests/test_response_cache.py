@@ -0,0 +1,155 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_backend.models import FurnitureItem
+from ai_backend.services.response_cache import (
+    HIT, MISS, STALE, ResponseCache, bucket_price_range, reset_response_cache
+)
+from main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    reset_response_cache()
+    yield
+    reset_response_cache()
+
+
+# ===================================================================
+# 1. Cache core
+# ===================================================================
+def test_lru_is_bounded_by_bytes():
+    cache = ResponseCache(max_bytes=25, ttl_seconds=60)
+    cache.put("a", b"x" * 10)
+    cache.put("b", b"x" * 10)
+    cache.get("a")  # a becomes most recently used
+    cache.put("c", b"x" * 10)
+
+    assert cache.get("b") == (None, MISS)
+    assert cache.get("a")[1] == HIT and cache.get("c")[1] == HIT
+    stats = cache.stats()
+    assert stats["bytes"] == 20 and stats["evictions"] == 1
+    cache.put("huge", b"x" * 100)
+    assert cache.get("huge") == (None, MISS)
+
+
+def test_stale_while_revalidate_serves_old_value_and_refreshes_once():
+    cache = ResponseCache(ttl_seconds=1, stale_seconds=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def scenario():
+        assert await cache.get_or_compute("k", compute) == (1, MISS)
+        assert await cache.get_or_compute("k", compute) == (1, HIT)
+        cache._entries["k"].created_at -= 2  # age past the TTL
+        first, second = await asyncio.gather(
+            cache.get_or_compute("k", compute), cache.get_or_compute("k", compute)
+        )
+        assert first == second == (1, STALE)
+        await asyncio.sleep(0.05)
+        assert await cache.get_or_compute("k", compute) == (2, HIT)
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["stale_hits"], stats["misses"], stats["refreshes"]) == (2, 2, 1, 1)
+
+
+def test_concurrent_misses_share_one_computation():
+    cache = ResponseCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+
+    assert [value for value, _ in asyncio.run(scenario())] == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_price_bucketing():
+    assert bucket_price_range(512, 988) == (500, 1000)
+    assert bucket_price_range(500, 1000) == (500, 1000)
+
+
+# ===================================================================
+# 2. Endpoints
+# ===================================================================
+def _items(*prices):
+    return [
+        FurnitureItem(name=f"Sofa {p}", link=f"https://x.com/{p}", price=p, image_url="", dimensions={})
+        for p in prices
+    ]
+
+
+def test_search_reuses_cached_results_across_bucketed_ranges():
+    payload = {
+        "theme": "MINIMAL SCANDINAVIAN",
+        "room_type": "Living Room Furniture",
+        "furniture_types": ["Sofa", "Coffee Table"],
+        "price_range": {"min": 510, "max": 990}
+    }
+    with patch("ai_backend.api.furniture.search_furniture_async") as mock_search:
+        mock_search.return_value = _items(505, 600, 995)
+        first = client.post("/furniture/search", json=payload)
+
+        payload["furniture_types"] = ["Coffee Table", "Sofa"]
+        payload["price_range"] = {"min": 500, "max": 1000}
+        second = client.post("/furniture/search", json=payload)
+
+    assert mock_search.call_count == 1
+    assert mock_search.call_args.args[3].min == 500 and mock_search.call_args.args[3].max == 1000
+    assert mock_search.call_args.kwargs["limit"] is None  # whole bucket, filtered per request
+    assert first.headers["x-cache"] == "MISS" and second.headers["x-cache"] == "HIT"
+    assert [r["price"] for r in first.json()["results"]] == [600]
+    assert [r["price"] for r in second.json()["results"]] == [505, 600, 995]
+    assert "max-age" in first.headers["cache-control"]
+
+
+def test_search_mock_fallback_is_priced_for_the_exact_range():
+    payload = {
+        "theme": "MINIMAL SCANDINAVIAN",
+        "room_type": "Living Room Furniture",
+        "furniture_types": ["Sofa"],
+        "price_range": {"min": 510, "max": 600}  # bucket midpoint (750) is outside
+    }
+    with patch("ai_backend.api.furniture.search_furniture_async", return_value=[]) as mock_search:
+        response = client.post("/furniture/search", json=payload)
+
+    assert mock_search.call_args.kwargs["mock_fallback"] is False
+    assert [r["price"] for r in response.json()["results"]] == [555]
+
+
+def test_get_search_and_static_endpoints_revalidate_with_etag():
+    params = {
+        "theme": "MINIMAL SCANDINAVIAN", "room_type": "Living Room Furniture",
+        "furniture_types": "Sofa", "min_price": 500, "max_price": 1000
+    }
+    with patch("ai_backend.api.furniture.search_furniture_async") as mock_search:
+        mock_search.return_value = _items(700)
+        response = client.get("/furniture/search", params=params)
+        assert response.status_code == 200
+        again = client.get("/furniture/search", params=params, headers={"If-None-Match": response.headers["etag"]})
+    assert again.status_code == 304
+
+    for path in ("/", "/furniture/themes"):
+        response = client.get(path)
+        assert response.status_code == 200 and "etag" in response.headers
+        cached = client.get(path, headers={"If-None-Match": response.headers["etag"]})
+        assert cached.status_code == 304 and cached.headers["x-cache"] == "HIT"
+
+    assert client.get("/health").json()["response_cache"]["hits"] >= 2
@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+from ai_backend.config import THEMES
+from ai_backend.services.scraper_engine import run_scrapers, unique_domains, normalize_domain
+
+
+def _site(items, delay=0.0, error=None):
+    async def scrape():
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return items
+    return scrape
+
+
+def test_normalize_and_dedupe_domains():
+    assert normalize_domain("https://www.heals.com/") == "heals.com"
+    assert normalize_domain("https://www2.hm.com/") == "hm.com"
+    domains = unique_domains(THEMES["MODERN LIVING"])
+    assert domains.count("heals.com") == 1
+    assert len(domains) == len(THEMES["MODERN LIVING"]) - 1
+
+
+def test_sites_run_concurrently():
+    tasks = [(f"site{i}.com", _site([i], delay=0.2)) for i in range(10)]
+    start = time.perf_counter()
+    report = asyncio.run(run_scrapers(tasks, deadline=5, site_timeout=1))
+    assert time.perf_counter() - start < 1.0
+    assert sorted(report["results"]) == list(range(10))
+
+
+def test_slow_and_failing_sites_return_partial_results():
+    tasks = [
+        ("fast.com", _site(["fast"])),
+        ("slow.com", _site(["slow"], delay=2)),
+        ("broken.com", _site([], error=RuntimeError("boom"))),
+    ]
+    report = asyncio.run(run_scrapers(tasks, deadline=5, site_timeout=0.2))
+    assert report["results"] == ["fast"]
+    assert report["timed_out"] == ["slow.com"]
+    assert report["failed"] == ["broken.com"]
+
+
+def test_global_deadline_cancels_pending_sites():
+    tasks = [("fast.com", _site(["fast"])), ("slow.com", _site(["slow"], delay=2))]
+    start = time.perf_counter()
+    report = asyncio.run(run_scrapers(tasks, deadline=0.2, site_timeout=5))
+    assert time.perf_counter() - start < 1.0
+    assert report["results"] == ["fast"]
+    assert report["timed_out"] == ["slow.com"]
+
+
+def test_per_domain_concurrency_limit():
+    active = {"now": 0, "peak": 0}
+
+    async def scrape():
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.05)
+        active["now"] -= 1
+        return []
+
+    tasks = [("same.com", scrape) for _ in range(6)]
+    asyncio.run(run_scrapers(tasks, deadline=5, site_timeout=1, per_domain_limit=2))
+    assert active["peak"] == 2
@@ -0,0 +1,99 @@
+import io
+import hashlib
+import pytest
+from unittest.mock import patch, MagicMock
+
+from ai_backend.services import storage
+from ai_backend.services.ai_generator import generate_room_image
+
+
+# ===================================================================
+# 1. Streaming upload (Replicate URL -> S3, content-addressed)
+# ===================================================================
+def _mock_stream_response(body: bytes, content_type="image/png"):
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.headers = {"Content-Type": content_type, "Content-Length": str(len(body))}
+    response.raw = io.BytesIO(body)
+    return response
+
+
+def test_upload_from_url_streams_into_s3():
+    uploaded = {}
+
+    def fake_upload_fileobj(fileobj, object_name, content_type, make_public, **options):
+        uploaded["body"] = fileobj.read()
+        uploaded["key"] = object_name
+        uploaded["content_type"] = content_type
+        uploaded["make_public"] = make_public
+        uploaded.update(options)
+        return f"https://bucket.s3.amazonaws.com/{object_name}"
+
+    aws = MagicMock()
+    aws.head_file.return_value = None
+    aws.upload_fileobj.side_effect = fake_upload_fileobj
+
+    with patch("ai_backend.services.http_client.HTTPClientManager.get_sync") as mock_get, \
+         patch("ai_backend.services.aws_service.get_aws_service", return_value=aws):
+        mock_get.return_value = _mock_stream_response(b"png-bytes")
+        url = storage.upload_from_url("https://replicate.delivery/out")
+
+    digest = hashlib.sha256(b"png-bytes").hexdigest()
+    assert mock_get.call_args.kwargs["stream"] is True
+    assert uploaded["body"] == b"png-bytes"
+    assert uploaded["key"] == f"generated/{digest[:2]}/{digest[2:4]}/{digest}.png"
+    assert uploaded["content_type"] == "image/png"
+    assert uploaded["make_public"] is False
+    assert "immutable" in uploaded["cache_control"]
+    assert url.endswith(uploaded["key"])
+
+
+def test_upload_from_url_rejects_oversized_file():
+    response = _mock_stream_response(b"x")
+    response.headers["Content-Length"] = str(storage.MAX_UPLOAD_SIZE + 1)
+
+    with patch("ai_backend.services.http_client.HTTPClientManager.get_sync", return_value=response):
+        with pytest.raises(ValueError):
+            storage.upload_from_url("https://replicate.delivery/huge.jpg")
+
+
+def test_upload_from_url_caps_body_without_content_length():
+    response = _mock_stream_response(b"x" * 10)
+    del response.headers["Content-Length"]
+    aws = MagicMock()
+
+    with patch("ai_backend.services.http_client.HTTPClientManager.get_sync", return_value=response), \
+         patch("ai_backend.services.aws_service.get_aws_service", return_value=aws):
+        with pytest.raises(ValueError):
+            storage.upload_from_url("https://replicate.delivery/chunked.png", max_bytes=4)
+    aws.upload_fileobj.assert_not_called()
+
+
+def _fake_prediction(states):
+    """Prediction stub that walks through (status, logs) on each reload"""
+    prediction = MagicMock()
+    prediction.id = "pred-1"
+    prediction.output = ["https://replicate.delivery/out.png"]
+    prediction.error = None
+    prediction.progress = None
+    steps = iter(states)
+
+    def advance():
+        prediction.status, prediction.logs = next(steps)
+
+    advance()
+    prediction.reload.side_effect = advance
+    return prediction
+
+
+def test_generate_room_image_passes_file_object():
+    prediction = _fake_prediction([("starting", ""), ("succeeded", "done")])
+    with patch("ai_backend.services.ai_generator.REPLICATE_API_TOKEN", "token"), \
+         patch("ai_backend.services.ai_generator.REPLICATE_POLL_INTERVAL", 0), \
+         patch("ai_backend.services.ai_generator.replicate.predictions.create", return_value=prediction) as mock_create:
+        url = generate_room_image(b"room", "sofa left", "MODERN LIVING", ["https://x.com/sofa"])
+
+    assert url == "https://replicate.delivery/out.png"
+    image = mock_create.call_args.kwargs["input"]["image"]
+    assert isinstance(image, io.BytesIO)
+    assert image.closed
@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import io
+from functools import partial
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from ai_backend.utils.uploads import (
+    UploadSizeLimitMiddleware, UploadTooLargeError, ingest_upload
+)
+from main import app
+
+client = TestClient(app)
+
+
+class _FakeUpload:
+    """Async reader that records how much was requested"""
+
+    def __init__(self, body: bytes):
+        self._stream = io.BytesIO(body)
+        self.reads = 0
+        self.filename = "room.jpg"
+        self.content_type = "image/jpeg"
+
+    async def read(self, size=-1):
+        self.reads += 1
+        return self._stream.read(size)
+
+
+# ===================================================================
+# 1. Chunked ingestion
+# ===================================================================
+def test_ingest_hashes_and_spools_in_memory():
+    body = b"\xff\xd8\xff" + b"a" * 5000
+    upload = asyncio.run(ingest_upload(_FakeUpload(body), max_bytes=10_000, chunk_size=1024))
+    with upload:
+        assert upload.size == len(body)
+        assert upload.sha256 == hashlib.sha256(body).hexdigest()
+        assert upload.head == body[:32]
+        assert upload.in_memory
+        assert upload.read_bytes() == body
+
+
+def test_large_uploads_spill_to_disk():
+    body = b"b" * 50_000
+    upload = asyncio.run(ingest_upload(_FakeUpload(body), max_bytes=100_000, chunk_size=4096, spool_max_bytes=8192))
+    with upload:
+        assert not upload.in_memory
+        assert upload.read_bytes() == body
+
+
+def test_ingest_stops_reading_once_limit_is_passed():
+    source = _FakeUpload(b"c" * 1_000_000)
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(ingest_upload(source, max_bytes=10_000, chunk_size=1024))
+    assert source.reads == 10  # 10 KiB read, not 1 MB
+
+
+# ===================================================================
+# 2. Early rejection
+# ===================================================================
+def _limited_app(limit):
+    small = FastAPI()
+    small.add_middleware(UploadSizeLimitMiddleware, max_body_bytes=limit, paths=["/upload"])
+
+    @small.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return TestClient(small)
+
+
+def test_declared_content_length_over_limit_gets_413():
+    small = _limited_app(1000)
+    assert small.post("/upload", files={"file": ("a.bin", b"x" * 100)}).json() == {"size": 100}
+    response = small.post("/upload", files={"file": ("a.bin", b"x" * 5000)})
+    assert response.status_code == 413
+
+
+def test_chunked_body_is_cut_off_at_limit():
+    small = _limited_app(1000)
+
+    def body():
+        yield b'--xyz\r\nContent-Disposition: form-data; name="file"; filename="a.bin"\r\n\r\n'
+        for _ in range(50):
+            yield b"y" * 100
+
+    response = small.post("/upload", content=body(), headers={"Content-Type": "multipart/form-data; boundary=xyz"})
+    assert response.status_code == 413
+
+
+def test_generate_returns_413_for_oversized_image():
+    data = {"prompt": "sofa", "theme": "MODERN LIVING", "furniture_links": "https://example.com/sofa"}
+    files = {"room_image": ("room.jpg", b"\xff\xd8\xff" + b"z" * 5000, "image/jpeg")}
+    with patch("ai_backend.api.generation.ingest_upload", partial(ingest_upload, max_bytes=1000)):
+        response = client.post("/generation/generate", data=data, files=files)
+    assert response.status_code == 413
@@ -0,0 +1,170 @@
+# ai_backend/utils/uploads.py
+"""
+Streaming Upload Ingestion
+Reads uploads in fixed-size chunks instead of loading them whole
+
+Each chunk is hashed (SHA-256) and written to a spooled temporary file
+that stays in memory for small files and rolls over to disk for large
+ones. Reading stops as soon as the size limit is passed. A companion ASGI
+middleware rejects oversized request bodies before multipart parsing
+even starts.
+"""
+
+import os
+import hashlib
+import logging
+from tempfile import SpooledTemporaryFile
+from typing import Iterable, Optional
+
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Tunables (env overridable)
+MAX_IMAGE_UPLOAD_BYTES = int(os.getenv("MAX_IMAGE_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(256 * 1024)))
+UPLOAD_SPOOL_MAX_BYTES = int(os.getenv("UPLOAD_SPOOL_MAX_BYTES", str(2 * 1024 * 1024)))  # then disk
+
+# Room for multipart boundaries and the other form fields
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Bytes kept from the start of the file for format sniffing
+HEAD_BYTES = 32
+
+
+class UploadTooLargeError(ValueError):
+    """Upload exceeded the configured size limit"""
+
+
+class IngestedUpload:
+    """
+    A fully received upload: spooled content plus size and SHA-256
+
+    The spool is owned by this object (not by the request), so it can be
+    handed to background jobs. Call close() when done.
+    """
+
+    def __init__(self, file: SpooledTemporaryFile, size: int, sha256: str, head: bytes,
+                 filename: Optional[str] = None, content_type: Optional[str] = None):
+        self.file = file
+        self.size = size
+        self.sha256 = sha256
+        self.head = head
+        self.filename = filename
+        self.content_type = content_type
+
+    @property
+    def in_memory(self) -> bool:
+        return not getattr(self.file, "_rolled", False)
+
+    def read_bytes(self) -> bytes:
+        """Whole content (for consumers that need bytes, e.g. image decoding)"""
+        self.file.seek(0)
+        return self.file.read()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def ingest_upload(
+    upload,
+    max_bytes: int = MAX_IMAGE_UPLOAD_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+    spool_max_bytes: int = UPLOAD_SPOOL_MAX_BYTES
+) -> IngestedUpload:
+    """
+    Stream an UploadFile into an owned spool, hashing as it goes
+
+    Args:
+        upload: FastAPI UploadFile (anything with async read(size))
+        max_bytes: Size limit; reading stops as soon as it is passed
+        chunk_size: Bytes per read (bounds per-request memory)
+        spool_max_bytes: In-memory size before spilling to disk
+
+    Returns:
+        IngestedUpload rewound to the start
+
+    Raises:
+        UploadTooLargeError: If the upload is larger than max_bytes
+    """
+    spool = SpooledTemporaryFile(max_size=spool_max_bytes)
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(f"Upload exceeds {max_bytes // (1024 * 1024)}MB limit")
+            if len(head) < HEAD_BYTES:
+                head += chunk[:HEAD_BYTES - len(head)]
+            digest.update(chunk)
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+
+    spool.seek(0)
+    return IngestedUpload(
+        spool, size, digest.hexdigest(), head,
+        filename=getattr(upload, "filename", None),
+        content_type=getattr(upload, "content_type", None)
+    )
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject oversized request bodies on upload routes with 413
+
+    A declared Content-Length over the limit is refused before the body is
+    read; bodies without one (chunked) are counted as they arrive and cut
+    off once they pass the limit.
+    """
+
+    def __init__(self, app, max_body_bytes: int, paths: Iterable[str]):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.paths = tuple(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds {self.max_body_bytes // (1024 * 1024)}MB limit"
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    break
+                if declared > self.max_body_bytes:
+                    logger.warning(f"⚠️  Rejected {declared} byte upload to {scope['path']}")
+                    response = JSONResponse({"detail": detail}, status_code=413)
+                    await response(scope, receive, send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    # Surfaces through the route handler as a normal 413
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
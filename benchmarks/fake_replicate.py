@@ -0,0 +1,204 @@
+# benchmarks/fake_replicate.py
+"""
+Fake Replicate API
+Local stand-in for the predictions API with configurable latency
+
+Implements just what the generation pipeline uses:
+    POST /v1/predictions               create (status "starting")
+    GET  /v1/predictions/{id}          poll ("processing" with tqdm-style
+                                       step logs, then "succeeded")
+    POST /v1/predictions/{id}/cancel   cancel
+    GET  /files/{name}.png             the generated image
+
+Point the app at it with REPLICATE_BASE_URL (read by the replicate SDK).
+"""
+
+import io
+import json
+import time
+import uuid
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from PIL import Image
+
+STEPS = 30
+
+
+def _render_output(size: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), (180, 160, 140)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class FakeReplicate:
+    """
+    Threaded fake Replicate server
+
+    Args:
+        latency: Seconds from create until a prediction succeeds
+        jitter: Extra uniform random seconds added per prediction
+        failure_rate: Fraction of predictions that end as "failed"
+        output_size: Side of the square PNG returned as output
+    """
+
+    def __init__(self, latency: float = 2.0, jitter: float = 0.0, failure_rate: float = 0.0,
+                 output_size: int = 1024, host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.output = _render_output(output_size)
+        self.predictions = {}
+        self.lock = threading.Lock()
+        self.counters = {"created": 0, "polls": 0, "downloads": 0, "canceled": 0}
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeReplicate":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-replicate", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # -------------------------------------------------------------
+    # Prediction state
+    # -------------------------------------------------------------
+
+    def _create(self, body: dict) -> dict:
+        prediction_id = uuid.uuid4().hex
+        duration = self.latency + random.uniform(0, self.jitter)
+        with self.lock:
+            self.predictions[prediction_id] = {
+                "created": time.monotonic(),
+                "duration": duration,
+                "fail": random.random() < self.failure_rate,
+                "canceled": False,
+                "version": body.get("version", ""),
+            }
+            self.counters["created"] += 1
+        return self._render(prediction_id)
+
+    def _render(self, prediction_id: str) -> Optional[dict]:
+        with self.lock:
+            state = self.predictions.get(prediction_id)
+        if state is None:
+            return None
+
+        elapsed = time.monotonic() - state["created"]
+        fraction = min(1.0, elapsed / state["duration"]) if state["duration"] else 1.0
+        step = int(fraction * STEPS)
+        logs = "".join(
+            f"{int(done / STEPS * 100)}%|{'#' * (done // 3):<10}| {done}/{STEPS}\n"
+            for done in range(1, step + 1)
+        )
+
+        output, error = None, None
+        if state["canceled"]:
+            status = "canceled"
+        elif elapsed < 0.05 * state["duration"]:
+            status = "starting"
+        elif fraction < 1.0:
+            status = "processing"
+        elif state["fail"]:
+            status, error = "failed", "Simulated model failure"
+        else:
+            status, output = "succeeded", [f"{self.url}/files/{prediction_id}.png"]
+
+        return {
+            "id": prediction_id,
+            "model": "stability-ai/sdxl",
+            "version": state["version"],
+            "status": status,
+            "input": {},
+            "output": output,
+            "logs": logs,
+            "error": error,
+            "metrics": {},
+            "created_at": None,
+            "started_at": None,
+            "completed_at": None,
+            "urls": {
+                "get": f"{self.url}/v1/predictions/{prediction_id}",
+                "cancel": f"{self.url}/v1/predictions/{prediction_id}/cancel",
+            },
+        }
+
+    def _cancel(self, prediction_id: str) -> Optional[dict]:
+        with self.lock:
+            state = self.predictions.get(prediction_id)
+            if state is None:
+                return None
+            state["canceled"] = True
+            self.counters["canceled"] += 1
+        return self._render(prediction_id)
+
+    def _count(self, name: str):
+        with self.lock:
+            self.counters[name] += 1
+
+    # -------------------------------------------------------------
+    # HTTP
+    # -------------------------------------------------------------
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _json(self, payload: Optional[dict], status: int = 200):
+                if payload is None:
+                    self._send(404, b'{"detail": "Not found"}')
+                else:
+                    self._send(status, json.dumps(payload).encode("utf-8"))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b"{}"
+                parts = self.path.strip("/").split("/")
+                if parts == ["v1", "predictions"]:
+                    self._json(fake._create(json.loads(raw or b"{}")), status=201)
+                elif len(parts) == 4 and parts[:2] == ["v1", "predictions"] and parts[3] == "cancel":
+                    self._json(fake._cancel(parts[2]))
+                else:
+                    self._json(None)
+
+            def do_GET(self):
+                parts = self.path.strip("/").split("/")
+                if len(parts) == 3 and parts[:2] == ["v1", "predictions"]:
+                    fake._count("polls")
+                    self._json(fake._render(parts[2]))
+                elif len(parts) == 2 and parts[0] == "files":
+                    fake._count("downloads")
+                    self._send(200, fake.output, content_type="image/png")
+                else:
+                    self._json(None)
+
+        return Handler
@@ -0,0 +1,409 @@
+# benchmarks/run.py
+"""
+Offline Load Benchmark
+Runs the real app (uvicorn subprocess) against a fake Replicate server and
+a moto S3 server, drives each router at a fixed concurrency and writes
+latency percentiles, throughput and peak RSS as JSON.
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --requests 200 --concurrency 32 --replicate-latency 1.5
+    python -m benchmarks.run --scenarios health,fit_check --baseline benchmarks/results/<old>.json
+
+Generation latency is end to end: submit, then follow the job's SSE
+stream until the final event (S3 URL). Every generation request uses a
+distinct prompt so the generation cache never short-circuits it.
+"""
+
+import io
+import os
+import sys
+import json
+import math
+import time
+import socket
+import asyncio
+import logging
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import boto3
+import httpx
+from moto.server import ThreadedMotoServer
+from PIL import Image
+
+from benchmarks.fake_replicate import FakeReplicate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+BENCH_BUCKET = "room-designer-bench"
+SCENARIOS = ("health", "fit_check", "search", "generate")
+
+# Room in feet, furniture footprints in inches (as the API expects)
+FIT_CHECK_BODY = {
+    "room": {"length": 20, "width": 15, "height": 9},
+    "furnitures": [
+        {"type": "Sofa", "subtype": "3-Seater Sofa", "width": 84, "depth": 36},
+        {"type": "Coffee Table", "subtype": "Rectangular", "width": 48, "depth": 24},
+        {"type": "Armchair", "subtype": "Lounge Chair", "width": 32, "depth": 34},
+    ],
+}
+
+SEARCH_BODY = {
+    "theme": "MODERN LIVING",
+    "room_type": "Living Room",
+    "furniture_types": ["Sofa", "Coffee Table"],
+    "price_range": {"min": 100, "max": 2000},
+}
+
+
+# -------------------------------------------------------------
+# Stats
+# -------------------------------------------------------------
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], errors: int, wall_seconds: float) -> dict:
+    """Latency percentiles (ms), throughput and error count for one scenario"""
+    ordered = sorted(latencies)
+    count = len(ordered) + errors
+    return {
+        "requests": count,
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / wall_seconds, 2) if wall_seconds else 0.0,
+        "wall_seconds": round(wall_seconds, 3),
+        "latency_ms": {
+            "p50": round(percentile(ordered, 50) * 1000, 2),
+            "p95": round(percentile(ordered, 95) * 1000, 2),
+            "p99": round(percentile(ordered, 99) * 1000, 2),
+            "mean": round(sum(ordered) / len(ordered) * 1000, 2) if ordered else 0.0,
+            "max": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        },
+    }
+
+
+def compare(current: dict, baseline: dict) -> Dict[str, dict]:
+    """Relative change of p50/p95/p99 and throughput per scenario"""
+    deltas = {}
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        delta = {}
+        for key in ("p50", "p95", "p99"):
+            old = before["latency_ms"][key]
+            delta[key] = round((result["latency_ms"][key] - old) / old * 100, 1) if old else None
+        old_rps = before["throughput_rps"]
+        delta["throughput_rps"] = round((result["throughput_rps"] - old_rps) / old_rps * 100, 1) if old_rps else None
+        deltas[name] = delta
+    return deltas
+
+
+# -------------------------------------------------------------
+# Process helpers
+# -------------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _proc_kib(pid: int, field: str) -> Optional[int]:
+    """VmHWM / VmRSS of a process in KiB (Linux /proc only)"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _children(pid: int) -> List[int]:
+    """Direct child processes (of every thread, since pools start from worker threads)"""
+    found = []
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return found
+    for task in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as children:
+                found.extend(int(child) for child in children.read().split())
+        except OSError:
+            continue
+    return found
+
+
+def peak_rss(pid: int) -> dict:
+    """Peak RSS (MB) of the server and of its worker processes"""
+    server = _proc_kib(pid, "VmHWM")
+    workers = [_proc_kib(child, "VmHWM") or 0 for child in _children(pid)]
+    return {
+        "server_peak_rss_mb": round(server / 1024, 1) if server is not None else None,
+        "workers_peak_rss_mb": round(sum(workers) / 1024, 1),
+        "worker_processes": len(workers),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _jpeg_bytes(size=(1600, 1200)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (120, 110, 100)).save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+class BenchEnvironment:
+    """Fake Replicate + moto S3 + the app under uvicorn"""
+
+    def __init__(self, args):
+        self.args = args
+        self.replicate = FakeReplicate(latency=args.replicate_latency, jitter=args.replicate_jitter)
+        self.moto_port = _free_port()
+        self.moto = ThreadedMotoServer(ip_address="127.0.0.1", port=self.moto_port, verbose=False)
+        self.app_port = args.port or _free_port()
+        self.process: Optional[subprocess.Popen] = None
+        self._log = subprocess.DEVNULL
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.app_port}"
+
+    def __enter__(self):
+        self.replicate.start()
+        self.moto.start()
+        moto_url = f"http://127.0.0.1:{self.moto_port}"
+        boto3.client(
+            "s3", endpoint_url=moto_url, region_name="us-east-1",
+            aws_access_key_id="bench", aws_secret_access_key="bench"
+        ).create_bucket(Bucket=BENCH_BUCKET)
+
+        env = {
+            **os.environ,
+            "REPLICATE_API_TOKEN": "bench",
+            "REPLICATE_BASE_URL": self.replicate.url,
+            "REPLICATE_POLL_INTERVAL": str(self.args.poll_interval),
+            "AWS_ACCESS_KEY_ID": "bench",
+            "AWS_SECRET_ACCESS_KEY": "bench",
+            "AWS_S3_BUCKET": BENCH_BUCKET,
+            "AWS_REGION": "us-east-1",
+            "AWS_ENDPOINT_URL": moto_url,
+            "RESPONSE_CACHE_ENABLED": "true" if self.args.search_cache else "false",
+        }
+        # App logs go to --app-log (they would drown the report otherwise)
+        self._log = open(self.args.app_log, "w") if self.args.app_log else subprocess.DEVNULL
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+             "--port", str(self.app_port), "--log-level", "warning"],
+            cwd=ROOT, env=env, stdout=self._log, stderr=subprocess.STDOUT
+        )
+        self._wait_ready()
+        return self
+
+    def _wait_ready(self, timeout: float = 60.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"App exited during startup (code {self.process.returncode})")
+            try:
+                if httpx.get(f"{self.base_url}/health", timeout=1).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError("App did not become ready in time")
+
+    def __exit__(self, *exc):
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self._log is not subprocess.DEVNULL:
+            self._log.close()
+        self.moto.stop()
+        self.replicate.stop()
+
+
+# -------------------------------------------------------------
+# Scenarios
+# -------------------------------------------------------------
+
+async def _health(client: httpx.AsyncClient, index: int) -> bool:
+    return (await client.get("/health")).status_code == 200
+
+
+async def _fit_check(client: httpx.AsyncClient, index: int) -> bool:
+    return (await client.post("/room/fit-check", json=FIT_CHECK_BODY)).status_code == 200
+
+
+async def _search(client: httpx.AsyncClient, index: int) -> bool:
+    return (await client.post("/furniture/search", json=SEARCH_BODY)).status_code == 200
+
+
+def _make_generate(image: bytes) -> Callable[[httpx.AsyncClient, int], Awaitable[bool]]:
+    async def generate(client: httpx.AsyncClient, index: int) -> bool:
+        response = await client.post(
+            "/generation/generate",
+            files={"room_image": ("room.jpg", image, "image/jpeg")},
+            data={
+                "prompt": f"sofa on the left wall #{index}-{time.time_ns()}",
+                "theme": "MODERN LIVING",
+                "furniture_links": "https://example.com/sofa",
+            },
+        )
+        if response.status_code == 200:
+            return True  # served from the generation cache
+        if response.status_code != 202:
+            return False
+
+        final = None
+        async with client.stream("GET", response.json()["events_url"]) as events:
+            async for line in events.aiter_lines():
+                if line.startswith("data: "):
+                    final = json.loads(line[len("data: "):])
+        return final is not None and final.get("status") == "completed"
+
+    return generate
+
+
+async def run_scenario(base_url: str, scenario, requests: int, concurrency: int) -> dict:
+    """Fire requests calls with at most concurrency in flight"""
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300) as client:
+        async def one(index: int):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    ok = await scenario(client, index)
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        wall_started = time.perf_counter()
+        await asyncio.gather(*(one(index) for index in range(requests)))
+        wall = time.perf_counter() - wall_started
+
+    return summarize(latencies, errors, wall)
+
+
+def run(args) -> dict:
+    scenarios = {
+        "health": _health,
+        "fit_check": _fit_check,
+        "search": _search,
+        "generate": _make_generate(_jpeg_bytes()),
+    }
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in scenarios]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": {
+            "requests": args.requests,
+            "generate_requests": args.generate_requests,
+            "concurrency": args.concurrency,
+            "replicate_latency": args.replicate_latency,
+            "replicate_jitter": args.replicate_jitter,
+            "poll_interval": args.poll_interval,
+            "search_cache": args.search_cache,
+            "warmup": args.warmup,
+        },
+        "scenarios": {},
+    }
+
+    with BenchEnvironment(args) as env:
+        for name in selected:
+            count = args.generate_requests if name == "generate" else args.requests
+            if args.warmup and name != "generate":
+                asyncio.run(run_scenario(env.base_url, scenarios[name], args.warmup, args.concurrency))
+            result = asyncio.run(run_scenario(env.base_url, scenarios[name], count, args.concurrency))
+            report["scenarios"][name] = result
+            latency = result["latency_ms"]
+            print(
+                f"{name:<10} {result['requests']:>5} req  {result['errors']:>3} err  "
+                f"{result['throughput_rps']:>8.1f} req/s  "
+                f"p50 {latency['p50']:>8.1f}  p95 {latency['p95']:>8.1f}  p99 {latency['p99']:>8.1f} ms"
+            )
+        report["memory"] = peak_rss(env.process.pid)
+        report["replicate"] = dict(env.replicate.counters)
+
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load benchmark for the Room Designer API")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--generate-requests", type=int, default=40, help="Requests for the generate scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests before each scenario")
+    parser.add_argument("--replicate-latency", type=float, default=2.0, help="Seconds per fake prediction")
+    parser.add_argument("--replicate-jitter", type=float, default=0.5)
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="App's Replicate poll interval")
+    parser.add_argument("--search-cache", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--port", type=int, default=0, help="App port (default: any free port)")
+    parser.add_argument("--app-log", help="File for the app's own log output (default: discarded)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--baseline", help="Earlier result file to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)  # moto server access log
+    report = run(args)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            report["vs_baseline"] = compare(report, json.load(baseline_file))
+        for name, delta in report["vs_baseline"].items():
+            print(f"{name:<10} vs baseline: " + "  ".join(f"{key} {value:+}%" for key, value in delta.items() if value is not None))
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{report['commit'] or 'nocommit'}.json")
+    with open(output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Results written to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -22,10 +22,11 @@ Room Designer API - Complete FastAPI Application
 All endpoints are included via routers
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
+import asyncio
 import logging
 
 # Load environment variables first
@@ -33,7 +34,22 @@ load_dotenv()
 
 # Import routers (these contain all the endpoints)
 from ai_backend.api import room, furniture, generation
-from ai_backend.services.aws_service import init_aws_service
+from ai_backend.services import ai_generator, dimension
+from ai_backend.services.aws_service import init_aws_service_from_env
+from ai_backend.services.jobs import get_job_manager, shutdown_job_manager
+from ai_backend.services.generation_cache import get_generation_cache
+from ai_backend.services.catalog_index import start_catalog_refresh, stop_catalog_refresh
+from ai_backend.services.furniture_catalog import get_furniture_catalog
+from ai_backend.services.http_client import get_http_client, close_http_clients
+from ai_backend.services.response_cache import cached_response, get_response_cache, init_response_cache
+from ai_backend.utils.uploads import (
+    MAX_IMAGE_UPLOAD_BYTES, MULTIPART_OVERHEAD_BYTES, UploadSizeLimitMiddleware
+)
+from ai_backend.services.image_preprocess import get_image_preprocessor, shutdown_image_preprocessor
+from ai_backend.services.registry import get_service_registry, preload
+from ai_backend.services.storage import shutdown_derivative_pool
+from ai_backend.services.metrics import MetricsMiddleware, register_gauge_source, render_metrics
+from ai_backend.config import missing_env_variables
 
 # Setup logging
 logging.basicConfig(
@@ -42,6 +58,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Building heavy services at startup: "background" (serve immediately, build
+# in parallel threads), "blocking" (finish before serving) or "off" (first use)
+SERVICE_WARMUP = os.getenv("SERVICE_WARMUP", "background").lower()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Room Designer API",
@@ -60,31 +80,92 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Refuse oversized uploads before the multipart body is parsed
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_body_bytes=MAX_IMAGE_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+    paths=["/generation/generate"]
+)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_body_bytes=generation.GENERATION_BATCH_MAX_FILES * MAX_IMAGE_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+    paths=["/generation/batch"]
+)
+
+# Latency histograms + Server-Timing header (outermost, so it times everything)
+app.add_middleware(MetricsMiddleware)
+
+
+_warmup_future = None
+
+
+def register_services():
+    """
+    Register the heavy services (built on first use or by warm-up)
+    
+    Every factory is idempotent, so a request that needs a service before
+    warm-up reaches it simply builds it first.
+    """
+    registry = get_service_registry()
+    # AWS S3 client (boto3 import + client construction)
+    registry.register("aws", init_aws_service_from_env)
+    # Compiled furniture dimension catalog
+    registry.register("furniture_catalog", get_furniture_catalog)
+    # Shared outbound HTTP pools (scrapers, image downloads)
+    registry.register("http_clients", get_http_client)
+    # Generation worker pool, result cache and preprocessing processes
+    registry.register("job_manager", get_job_manager)
+    registry.register("generation_cache", get_generation_cache)
+    registry.register("image_preprocessor", lambda: get_image_preprocessor().start())
+    # Modules only needed once traffic arrives
+    registry.register("replicate", lambda: preload(ai_generator.replicate))
+    registry.register("numpy", lambda: preload(dimension.np))
+    return registry
+
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize services when app starts"""
+    """Register services and warm them up (the app is ready before that finishes)"""
+    global _warmup_future
     logger.info("🚀 Starting Room Designer API...")
     
-    try:
-        # Initialize AWS S3 service
-        init_aws_service(
-            access_key=os.getenv("AWS_ACCESS_KEY_ID"),
-            secret_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            bucket=os.getenv("AWS_S3_BUCKET"),
-            region=os.getenv("AWS_REGION", "eu-north-1")
-        )
-        logger.info("✅ AWS S3 service initialized")
-        
-    except Exception as e:
-        logger.error(f"❌ Failed to initialize AWS: {e}")
-        logger.warning("⚠️  App will run but image uploads may fail")
+    missing = missing_env_variables()
+    if missing:
+        logger.warning(f"⚠️  Missing environment variables: {', '.join(missing)}")
+    
+    # In-process cache for search results and static payloads
+    init_response_cache()
+    
+    registry = register_services()
+    if SERVICE_WARMUP == "blocking":
+        await asyncio.to_thread(registry.warm_up)
+    elif SERVICE_WARMUP == "background":
+        _warmup_future = asyncio.get_running_loop().run_in_executor(None, registry.warm_up)
+    
+    # Pool / queue gauges for /metrics (read from each service's stats())
+    register_gauge_source("generation_queue", lambda: get_job_manager().stats())
+    register_gauge_source("generation_cache", lambda: get_generation_cache().stats())
+    register_gauge_source("image_preprocessing", lambda: get_image_preprocessor().stats())
+    register_gauge_source("http_client", lambda: get_http_client().stats())
+    register_gauge_source("response_cache", lambda: get_response_cache().stats())
+    register_gauge_source("services", lambda: get_service_registry().stats())
+    
+    # Keep the local furniture catalog index fresh in the background
+    if start_catalog_refresh():
+        logger.info("✅ Catalog index refresh scheduled")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup when app shuts down"""
     logger.info("🛑 Shutting down Room Designer API...")
+    if _warmup_future is not None:
+        await _warmup_future
+    shutdown_job_manager()
+    shutdown_derivative_pool()
+    shutdown_image_preprocessor()
+    await stop_catalog_refresh()
+    await close_http_clients()
 
 
 # =====================================================
@@ -117,35 +198,52 @@ app.include_router(
 # ROOT ENDPOINTS (Health checks)
 # =====================================================
 
-@app.get("/", tags=["Root"])
-def root():
-    """
-    Root endpoint - API status check
-    
-    Returns:
-        API status and available endpoints
-    """
+def _root_info() -> dict:
     return {
         "status": "online",
         "message": "Room Designer API is running!",
         "version": "1.0.0",
         "docs": "/docs",
         "redoc": "/redoc",
+        "metrics": "/metrics",
         "endpoints": {
             "room_dimensions": {
                 "set": "POST /room/dimensions",
-                "fit_check": "POST /room/fit-check"
+                "fit_check": "POST /room/fit-check",
+                "fit_check_batch": "POST /room/fit-check/batch",
+                "layout_check": "POST /room/layout-check"
             },
             "furniture": {
-                "search": "POST /furniture/search"
+                "search": "POST /furniture/search",
+                "search_get": "GET /furniture/search",
+                "themes": "GET /furniture/themes",
+                "catalog": "GET /furniture/catalog"
             },
             "generation": {
-                "generate": "POST /generation/generate"
+                "upload_url": "POST /generation/uploads",
+                "generate": "POST /generation/generate",
+                "batch": "POST /generation/batch",
+                "job_status": "GET /generation/jobs/{job_id}",
+                "job_events": "GET /generation/jobs/{job_id}/events",
+                "job_result": "GET /generation/jobs/{job_id}/result",
+                "assets_info": "POST /generation/assets/info"
             }
         }
     }
 
 
+@app.get("/", tags=["Root"])
+def root(request: Request):
+    """
+    Root endpoint - API status check
+    
+    Returns:
+        API status and available endpoints
+    """
+    body, state = get_response_cache().get_or_build("static:root", _root_info)
+    return cached_response(request, body, max_age=60, stale_seconds=0, state=state)
+
+
 @app.get("/health", tags=["Root"])
 def health_check():
     """
@@ -161,6 +259,12 @@ def health_check():
             "aws_s3": "configured" if os.getenv("AWS_S3_BUCKET") else "not configured",
             "replicate_ai": "configured" if os.getenv("REPLICATE_API_TOKEN") else "not configured"
         },
+        "generation_queue": get_job_manager().stats(),
+        "generation_cache": get_generation_cache().stats(),
+        "image_preprocessing": get_image_preprocessor().stats(),
+        "http_clients": get_http_client().stats(),
+        "response_cache": get_response_cache().stats(),
+        "startup": get_service_registry().stats(),
         "environment": {
             "aws_region": os.getenv("AWS_REGION", "not set"),
             "aws_bucket": os.getenv("AWS_S3_BUCKET", "not set")
@@ -168,6 +272,13 @@ def health_check():
     }
 
 
+@app.get("/metrics", tags=["Root"], include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 # =====================================================
 # RUN APPLICATION
 # =====================================================